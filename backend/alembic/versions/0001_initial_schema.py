@@ -0,0 +1,85 @@
+"""Initial schema: users, expenses, investments
+
+Databases created earlier by Base.metadata.create_all already have these
+tables; mark them as migrated with `alembic stamp 0001` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'expenses',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('amount', sa.Numeric(10, 2), nullable=False),
+        sa.Column('category', sa.String(50), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('payment_method', sa.String(50), nullable=True),
+        sa.Column('notes', sa.String(500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_expenses_id', 'expenses', ['id'])
+
+    op.create_table(
+        'investments',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('asset_type', sa.String(50), nullable=False),
+        sa.Column('asset_name', sa.String(200), nullable=False),
+        sa.Column('symbol', sa.String(20), nullable=True),
+        sa.Column('quantity', sa.Numeric(20, 8), nullable=False),
+        sa.Column('purchase_price', sa.Numeric(15, 2), nullable=False),
+        sa.Column('current_price', sa.Numeric(15, 2), nullable=False),
+        sa.Column('purchase_date', sa.Date(), nullable=False),
+        sa.Column('maturity_date', sa.Date(), nullable=True),
+        sa.Column('platform', sa.String(100), nullable=True),
+        sa.Column('interest_rate', sa.Numeric(5, 2), nullable=True),
+        sa.Column('notes', sa.String(500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint('quantity > 0', name='check_quantity_positive'),
+        sa.CheckConstraint('purchase_price > 0', name='check_purchase_price_positive'),
+        sa.CheckConstraint('current_price >= 0', name='check_current_price_non_negative'),
+    )
+    op.create_index('ix_investments_id', 'investments', ['id'])
+    op.create_index('ix_investments_user_id', 'investments', ['user_id'])
+    op.create_index('ix_investments_asset_type', 'investments', ['asset_type'])
+    op.create_index('ix_investments_purchase_date', 'investments', ['purchase_date'])
+
+
+def downgrade() -> None:
+    op.drop_table('investments')
+    op.drop_table('expenses')
+    op.drop_table('users')
@@ -0,0 +1,31 @@
+"""Index investments on (user_id, percentage gain)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Must match Investment.percentage_gain's SQL expression for the planner to use it
+    op.create_index(
+        'ix_investments_user_gain_pct',
+        'investments',
+        ['user_id', sa.text('(((current_price - purchase_price) * 100) / CAST(purchase_price AS NUMERIC(15, 2)))')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_investments_user_gain_pct', table_name='investments')
@@ -0,0 +1,45 @@
+"""Add portfolio_aggregates and backfill it from investments
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'portfolio_aggregates',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('asset_type', sa.String(50), primary_key=True),
+        sa.Column('platform', sa.String(100), primary_key=True),
+        sa.Column('investment_count', sa.Integer(), nullable=False),
+        sa.Column('invested_amount', sa.Numeric(30, 10), nullable=False),
+        sa.Column('current_value', sa.Numeric(30, 10), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO portfolio_aggregates
+            (user_id, asset_type, platform, investment_count, invested_amount, current_value)
+        SELECT user_id, asset_type, COALESCE(platform, ''), COUNT(id),
+               SUM(quantity * purchase_price), SUM(quantity * current_price)
+        FROM investments
+        GROUP BY user_id, asset_type, COALESCE(platform, '')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('portfolio_aggregates')
@@ -0,0 +1,42 @@
+"""Add price_history and seed it with each holding's current price
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_history',
+        sa.Column('investment_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('investments.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('price_date', sa.Date(), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('price', sa.Numeric(15, 2), nullable=False),
+    )
+    op.create_index('ix_price_history_user_date', 'price_history', ['user_id', 'price_date'])
+    op.execute(
+        """
+        INSERT INTO price_history (investment_id, price_date, user_id, price)
+        SELECT id, CAST(COALESCE(updated_at, created_at, CURRENT_TIMESTAMP) AS DATE), user_id, current_price
+        FROM investments
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_history_user_date', table_name='price_history')
+    op.drop_table('price_history')
@@ -0,0 +1,57 @@
+"""Add instruments and instrument_prices; link investments to instruments
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'instruments',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('symbol', sa.String(20), nullable=False, unique=True),
+        sa.Column('asset_type', sa.String(50), nullable=False),
+        sa.Column('last_price', sa.Numeric(15, 2), nullable=True),
+        sa.Column('price_ts', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        'instrument_prices',
+        sa.Column('instrument_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('instruments.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('price_date', sa.Date(), primary_key=True),
+        sa.Column('price', sa.Numeric(15, 2), nullable=False),
+    )
+    op.add_column(
+        'investments',
+        sa.Column('instrument_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('instruments.id', ondelete='SET NULL'), nullable=True)
+    )
+    op.create_index('ix_investments_instrument_id', 'investments', ['instrument_id'])
+    # percentage_gain now reads the instrument price through a join, so the
+    # expression index on the holding's own columns can no longer be used
+    op.drop_index('ix_investments_user_gain_pct', table_name='investments')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_investments_user_gain_pct',
+        'investments',
+        ['user_id', sa.text('(((current_price - purchase_price) * 100) / CAST(purchase_price AS NUMERIC(15, 2)))')]
+    )
+    op.drop_index('ix_investments_instrument_id', table_name='investments')
+    op.drop_column('investments', 'instrument_id')
+    op.drop_table('instrument_prices')
+    op.drop_table('instruments')
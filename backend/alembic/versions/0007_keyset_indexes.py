@@ -0,0 +1,28 @@
+"""Index expenses and investments for newest-first keyset pagination
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Match the (date DESC, id DESC) listing order; a cursor seeks with (date, id) < (:date, :id)
+    op.create_index('ix_expenses_user_date_id', 'expenses', ['user_id', 'date', 'id'])
+    op.create_index('ix_investments_user_purchase_date_id', 'investments', ['user_id', 'purchase_date', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_investments_user_purchase_date_id', table_name='investments')
+    op.drop_index('ix_expenses_user_date_id', table_name='expenses')
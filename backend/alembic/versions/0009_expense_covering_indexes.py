@@ -0,0 +1,37 @@
+"""Covering composite indexes for the expense access paths
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A btree is scanned backwards for the (date DESC, id DESC) listing, so the key
+    # stays ascending; the INCLUDE columns let sums and per-category counts skip the heap
+    op.drop_index('ix_expenses_user_date_id', table_name='expenses')
+    op.create_index(
+        'ix_expenses_user_date_id', 'expenses', ['user_id', 'date', 'id'],
+        postgresql_include=['amount', 'category']
+    )
+    op.create_index(
+        'ix_expenses_user_category_date', 'expenses', ['user_id', 'category', 'date'],
+        postgresql_include=['amount', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_expenses_user_category_date', table_name='expenses')
+    op.drop_index('ix_expenses_user_date_id', table_name='expenses')
+    op.create_index('ix_expenses_user_date_id', 'expenses', ['user_id', 'date', 'id'])
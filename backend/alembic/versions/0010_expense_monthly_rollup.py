@@ -0,0 +1,42 @@
+"""Add expense_monthly_rollup with per-(user, month, category) totals
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'expense_monthly_rollup',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('year_month', sa.Date(), primary_key=True),
+        sa.Column('category', sa.String(50), primary_key=True),
+        sa.Column('total', sa.Numeric(20, 2), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO expense_monthly_rollup (user_id, year_month, category, total, count)
+        SELECT user_id, date_trunc('month', date)::date, category, SUM(amount), COUNT(id)
+        FROM expenses
+        GROUP BY user_id, date_trunc('month', date)::date, category
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('expense_monthly_rollup')
@@ -0,0 +1,38 @@
+"""Index top/worst performers again: manual gains, and linked lots per instrument
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Must match Investment.manual_percentage_gain's SQL expression for the planner to use it
+    op.create_index(
+        'ix_investments_user_manual_gain_pct',
+        'investments',
+        ['user_id', sa.text('(((current_price - purchase_price) * 100) / CAST(purchase_price AS NUMERIC(15, 2)))')],
+        postgresql_where=sa.text('instrument_id IS NULL')
+    )
+    op.create_index(
+        'ix_investments_user_instrument_purchase_price',
+        'investments',
+        ['user_id', 'instrument_id', 'purchase_price']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_investments_user_instrument_purchase_price', table_name='investments')
+    op.drop_index('ix_investments_user_manual_gain_pct', table_name='investments')
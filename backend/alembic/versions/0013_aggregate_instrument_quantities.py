@@ -0,0 +1,80 @@
+"""Aggregate linked holdings by instrument quantity; add instruments.price_version
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NO_INSTRUMENT = '00000000-0000-0000-0000-000000000000'
+
+
+def upgrade() -> None:
+    op.add_column(
+        'instruments',
+        sa.Column('price_version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Regrouped by instrument: rebuild from investments rather than migrating rows
+    op.drop_table('portfolio_aggregates')
+    op.create_table(
+        'portfolio_aggregates',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('asset_type', sa.String(50), primary_key=True),
+        sa.Column('platform', sa.String(100), primary_key=True),
+        sa.Column('instrument_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('investment_count', sa.Integer(), nullable=False),
+        sa.Column('invested_amount', sa.Numeric(30, 10), nullable=False),
+        sa.Column('quantity', sa.Numeric(30, 10), nullable=False),
+        sa.Column('manual_value', sa.Numeric(30, 10), nullable=False),
+    )
+    op.execute(
+        f"""
+        INSERT INTO portfolio_aggregates
+            (user_id, asset_type, platform, instrument_id,
+             investment_count, invested_amount, quantity, manual_value)
+        SELECT user_id, asset_type, COALESCE(platform, ''), COALESCE(instrument_id, '{NO_INSTRUMENT}'),
+               COUNT(id), SUM(quantity * purchase_price), SUM(quantity), SUM(quantity * current_price)
+        FROM investments
+        GROUP BY user_id, asset_type, COALESCE(platform, ''), COALESCE(instrument_id, '{NO_INSTRUMENT}')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('portfolio_aggregates')
+    op.create_table(
+        'portfolio_aggregates',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('asset_type', sa.String(50), primary_key=True),
+        sa.Column('platform', sa.String(100), primary_key=True),
+        sa.Column('investment_count', sa.Integer(), nullable=False),
+        sa.Column('invested_amount', sa.Numeric(30, 10), nullable=False),
+        sa.Column('current_value', sa.Numeric(30, 10), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO portfolio_aggregates
+            (user_id, asset_type, platform, investment_count, invested_amount, current_value)
+        SELECT i.user_id, i.asset_type, COALESCE(i.platform, ''), COUNT(i.id),
+               SUM(i.quantity * i.purchase_price),
+               SUM(i.quantity * COALESCE(n.last_price, i.current_price))
+        FROM investments i
+        LEFT JOIN instruments n ON n.id = i.instrument_id
+        GROUP BY i.user_id, i.asset_type, COALESCE(i.platform, '')
+        """
+    )
+
+    op.drop_column('instruments', 'price_version')
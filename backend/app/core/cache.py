@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import threading
+import time
+
+from app.core.config import settings
+
+
+class VersionedLRUCache:
+    """
+    In-process LRU cache with TTL expiry, where every entry is tagged with the
+    data version it was computed from.
+
+    A lookup only hits when the caller's current version matches the stored
+    one, so bumping the version on write makes stale entries unreachable
+    without having to find and delete them.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        """Return the cached value for key at this version, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, expires_at, value = entry
+                if entry_version == version and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, version: Any, value: Any):
+        """Store value for key at this version, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": float(self.hits / lookups * 100) if lookups else 0.0
+            }
+
+
+# Portfolio summary per user, keyed by users.portfolio_version and the held instruments' price versions
+portfolio_summary_cache = VersionedLRUCache(
+    "portfolio_summary",
+    maxsize=settings.PORTFOLIO_CACHE_SIZE,
+    ttl=settings.PORTFOLIO_CACHE_TTL_SECONDS
+)
+
+# Risk metrics per (user, as_of_date, ...), keyed like the portfolio summary
+risk_metrics_cache = VersionedLRUCache(
+    "risk_metrics",
+    maxsize=settings.RISK_CACHE_SIZE,
+    ttl=settings.RISK_CACHE_TTL_SECONDS
+)
+
+# Dashboard and health-score payloads per (user, kind), keyed by User.data_version, the price version and the day
+dashboard_cache = VersionedLRUCache(
+    "dashboard",
+    maxsize=settings.DASHBOARD_CACHE_SIZE,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS
+)
+
+# Expense rollup groups of every month before the current one, per (user, current month),
+# keyed by users.closed_months_version (bumped only by backdated expense writes)
+closed_months_cache = VersionedLRUCache(
+    "closed_months",
+    maxsize=settings.CLOSED_MONTHS_CACHE_SIZE,
+    ttl=settings.CLOSED_MONTHS_CACHE_TTL_SECONDS
+)
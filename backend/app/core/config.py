@@ -1,5 +1,4 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
 
 class Settings(BaseSettings):
     # App
@@ -8,12 +7,39 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Create missing tables at startup, for a fresh dev/test database only (see README)
+    CREATE_TABLES_ON_STARTUP: bool = False
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Caching
+    PORTFOLIO_CACHE_SIZE: int = 1024
+    PORTFOLIO_CACHE_TTL_SECONDS: int = 300
+    RISK_CACHE_SIZE: int = 256
+    RISK_CACHE_TTL_SECONDS: int = 3600
+    DASHBOARD_CACHE_SIZE: int = 2048
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    CLOSED_MONTHS_CACHE_SIZE: int = 1024
+    CLOSED_MONTHS_CACHE_TTL_SECONDS: int = 3600
+    
+    # Risk metrics: annual risk-free rate for the Sharpe ratio
+    RISK_FREE_RATE_PERCENT: float = 6.5
+    
+    # Price history: keep daily points this long, then one point per month
+    PRICE_HISTORY_DAILY_RETENTION_DAYS: int = 400
+    
+    # Price feed ingestion: quotes per batched upsert/commit
+    PRICE_FEED_CHUNK_SIZE: int = 5000
+    
+    # Exports: rows fetched (server-side cursor) and encoded per chunk
+    EXPORT_CHUNK_SIZE: int = 2000
+    
+    # Parquet exports: rows per row group (chunks are buffered as Arrow columns until one fills)
+    EXPORT_ROW_GROUP_SIZE: int = 100000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
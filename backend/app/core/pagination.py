@@ -0,0 +1,28 @@
+from typing import Optional
+from datetime import date
+import base64
+import uuid
+
+
+def encode_cursor(on: date, row_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for the (date, id) of the last row of a page"""
+    raw = f"{on.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(date, id) from a cursor made by encode_cursor; ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        on, row_id = raw.split("|")
+        return date.fromisoformat(on), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def next_cursor(rows: list, limit: int, date_attr: str) -> Optional[str]:
+    """Cursor for the page after rows, or None when the page was not full"""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, date_attr), last.id)
@@ -1,9 +1,14 @@
-from sqlalchemy import create_engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, func, cast, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
-# Create engine
+# Create engine (sync: scripts, Alembic, and routes that stay on the threadpool)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Verify connections before using
@@ -13,6 +18,23 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async driver for the same database: postgresql:// -> asyncpg, sqlite:// -> aiosqlite
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+# Async engine for the routes: queries await the driver instead of blocking the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG
+)
+
+# Objects stay readable after commit: in async code an expired attribute cannot lazy-load
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -22,4 +44,36 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for async routes; run the sync service methods with await db.run_sync(Service.method, ...)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# For CPU-heavy service methods (Python loops over every holding, XIRR, NumPy):
+# run fn(db, *args) on the threadpool instead of the event loop, on a sync session
+# opened and closed on that thread. Nothing is left for a dependency to clean up
+# on another thread, so a thread waiting for a pooled connection never waits on
+# one that cannot be returned (the get_db stall under load).
+async def run_in_session(fn, *args):
+    def call():
+        with SessionLocal() as db:
+            return fn(db, *args)
+    return await run_in_threadpool(call)
+
+# Dialect-specific INSERT that supports on_conflict_do_update (PostgreSQL; SQLite for local runs)
+def upsert(db: Session, model):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+
+# Rows as a PostgreSQL derived table built from one array parameter per column,
+# unnest(:a, :b, ...). Unlike a VALUES list, the statement has a fixed number
+# of parameters, so it compiles once whatever the batch size.
+def unnest_rows(name: str, columns: list, rows: list):
+    arrays = [
+        cast(bindparam(f"{name}_{column}", [row[i] for row in rows], type_=ARRAY(type_)), ARRAY(type_))
+        for i, (column, type_) in enumerate(columns)
+    ]
+    return func.unnest(*arrays).table_valued(*[column for column, _ in columns]).render_derived(name=name)
@@ -1,8 +1,8 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.utils.security import decode_access_token
 from app.services.auth_service import AuthService
@@ -12,7 +12,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user from token"""
     
@@ -32,7 +32,7 @@ async def get_current_user(
         raise credentials_exception
     
     # Get user from database
-    user = AuthService.get_user_by_email(db, email=email)
+    user = await AuthService.get_user_by_email_async(db, email=email)
     if user is None:
         raise credentials_exception
     
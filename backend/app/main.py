@@ -1,6 +1,7 @@
 # Open backend/app/main.py
 # Add investments router
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -8,19 +9,29 @@ from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.database import engine, Base
+from app.core.cache import portfolio_summary_cache, risk_metrics_cache, dashboard_cache, closed_months_cache
+from app.database import engine, async_engine, Base
 from app.routes import auth, expenses, investments,dashboard
-from app.models import User, Expense, Investment
+from app.models import User, Expense, Instrument, InstrumentPrice, Investment, PortfolioAggregate, PriceHistory
 from app.routes import export as export
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.CREATE_TABLES_ON_STARTUP:
+        # Fresh development/test databases only (SQLite, which the migrations do not
+        # support). Elsewhere the schema comes from `alembic upgrade head`, which
+        # also backfills the derived tables (portfolio aggregates, expense rollup).
+        Base.metadata.create_all(bind=engine)
+    yield
+    # Async engine connections belong to this event loop; close them with it
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     description="Personal Wealth Management System - Track Expenses & Investments",
-    version="2.0.0"  # Update version
+    version="2.0.0",  # Update version
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -88,5 +99,11 @@ def health_check():
     return {
         "status": "healthy",
         "version": "2.0.0",
-        "database": "connected"
+        "database": "connected",
+        "caches": {
+            "portfolio_summary": portfolio_summary_cache.stats(),
+            "risk_metrics": risk_metrics_cache.stats(),
+            "dashboard": dashboard_cache.stats(),
+            "closed_months": closed_months_cache.stats()
+        }
     }
\ No newline at end of file
@@ -2,6 +2,10 @@
 
 from app.models.user import User
 from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseMonthlyRollup
+from app.models.instrument import Instrument, InstrumentPrice
 from app.models.investment import Investment
+from app.models.portfolio_aggregate import PortfolioAggregate
+from app.models.price_history import PriceHistory
 
-__all__ = ["User", "Expense", "Investment"]
\ No newline at end of file
+__all__ = ["User", "Expense", "ExpenseMonthlyRollup", "Instrument", "InstrumentPrice", "Investment", "PortfolioAggregate", "PriceHistory"]
\ No newline at end of file
@@ -1,6 +1,6 @@
 # Open backend/app/models/expense.py
 
-from sqlalchemy import Column, String, Numeric, Date, ForeignKey, DateTime
+from sqlalchemy import Column, String, Numeric, Date, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -24,5 +24,13 @@ class Expense(Base):
     # Relationship
     user = relationship("User", back_populates="expenses")
     
+    __table_args__ = (
+        # Newest-first listing and keyset pagination by (date, id); amount and
+        # category ride along so date-range totals and category summaries are index-only
+        Index('ix_expenses_user_date_id', 'user_id', 'date', 'id', postgresql_include=['amount', 'category']),
+        # Category-filtered listings and totals
+        Index('ix_expenses_user_category_date', 'user_id', 'category', 'date', postgresql_include=['amount', 'id']),
+    )
+    
     def __repr__(self):
         return f"<Expense {self.title}: ₹{self.amount}>"
\ No newline at end of file
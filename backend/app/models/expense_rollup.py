@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Numeric, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class ExpenseMonthlyRollup(Base):
+    """
+    Running totals of a user's expenses per (month, category).
+    
+    Maintained by ExpenseService in the same transaction as every expense
+    write, so monthly and category summaries read one row per month and
+    category instead of every expense.
+    """
+    __tablename__ = "expense_monthly_rollup"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    year_month = Column(Date, primary_key=True)  # first day of the month
+    category = Column(String(50), primary_key=True)
+    
+    total = Column(Numeric(20, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ExpenseMonthlyRollup {self.year_month:%Y-%m}/{self.category}: {self.count} expenses>"
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Numeric, Integer, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+class Instrument(Base):
+    """
+    One row per market-traded symbol, shared by every holding of it.
+
+    A price tick writes last_price here once; linked holdings are valued
+    through the join instead of carrying their own copy of the price.
+    """
+    __tablename__ = "instruments"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    symbol = Column(String(20), nullable=False, unique=True)
+    asset_type = Column(String(50), nullable=False)
+    last_price = Column(Numeric(15, 2), nullable=True)  # None until the first tick
+    price_ts = Column(DateTime(timezone=True), nullable=True)
+    price_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every tick; keys holders' caches
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<Instrument {self.symbol}: ₹{self.last_price}>"
+
+
+class InstrumentPrice(Base):
+    """Daily closing price of an instrument (price history of linked holdings)"""
+    __tablename__ = "instrument_prices"
+
+    instrument_id = Column(UUID(as_uuid=True), ForeignKey("instruments.id", ondelete="CASCADE"), primary_key=True)
+    price_date = Column(Date, primary_key=True)
+    price = Column(Numeric(15, 2), nullable=False)
+
+    def __repr__(self):
+        return f"<InstrumentPrice {self.instrument_id} {self.price_date}: ₹{self.price}>"
@@ -1,13 +1,15 @@
 # Open backend/app/models/investment.py
 
-from sqlalchemy import Column, String, Numeric, Date, ForeignKey, DateTime, CheckConstraint
+from sqlalchemy import Column, String, Numeric, Date, ForeignKey, DateTime, CheckConstraint, Index, literal_column
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 from datetime import date
 from decimal import Decimal
 from app.database import Base
+from app.models.instrument import Instrument
 
 class Investment(Base):
     __tablename__ = "investments"
@@ -19,11 +21,12 @@ class Investment(Base):
     asset_type = Column(String(50), nullable=False, index=True)
     asset_name = Column(String(200), nullable=False)
     symbol = Column(String(20), nullable=True)  # Stock/Crypto ticker symbol
+    instrument_id = Column(UUID(as_uuid=True), ForeignKey("instruments.id", ondelete="SET NULL"), nullable=True, index=True)
     
     # Quantity & Pricing
     quantity = Column(Numeric(20, 8), nullable=False)  # Support crypto decimals (e.g., 0.00123456 BTC)
     purchase_price = Column(Numeric(15, 2), nullable=False)  # Price per unit
-    current_price = Column(Numeric(15, 2), nullable=False)   # Current price per unit
+    current_price = Column(Numeric(15, 2), nullable=False)   # Manual price per unit (used unless the instrument is priced)
     
     # Dates
     purchase_date = Column(Date, nullable=False, index=True)
@@ -40,12 +43,15 @@ class Investment(Base):
     
     # Relationships
     user = relationship("User", back_populates="investments")
+    instrument = relationship("Instrument", lazy="joined")
     
     # Constraints
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_quantity_positive'),
         CheckConstraint('purchase_price > 0', name='check_purchase_price_positive'),
         CheckConstraint('current_price >= 0', name='check_current_price_non_negative'),
+        # Newest-first listing and keyset pagination by (purchase_date, id)
+        Index('ix_investments_user_purchase_date_id', 'user_id', 'purchase_date', 'id'),
     )
     
     def __repr__(self):
@@ -57,23 +63,53 @@ class Investment(Base):
         """Total amount invested (quantity × purchase_price)"""
         return Decimal(str(self.quantity)) * Decimal(str(self.purchase_price))
     
+    @hybrid_property
+    def effective_price(self) -> Decimal:
+        """Instrument price for linked holdings once priced, else the manual current_price"""
+        if self.instrument is not None and self.instrument.last_price is not None:
+            return self.instrument.last_price
+        return self.current_price
+    
+    @effective_price.inplace.expression
+    @classmethod
+    def _effective_price_expression(cls):
+        """SQL form of effective_price; the query must outer join Investment.instrument"""
+        return func.coalesce(Instrument.last_price, cls.current_price)
+    
     @property
     def current_value(self) -> Decimal:
-        """Current market value (quantity × current_price)"""
-        return Decimal(str(self.quantity)) * Decimal(str(self.current_price))
+        """Current market value (quantity × effective_price)"""
+        return Decimal(str(self.quantity)) * Decimal(str(self.effective_price))
     
     @property
     def absolute_gain(self) -> Decimal:
         """Absolute gain/loss (current_value - invested_amount)"""
         return self.current_value - self.invested_amount
     
-    @property
+    @hybrid_property
     def percentage_gain(self) -> float:
         """Percentage gain/loss"""
         if self.invested_amount == 0:
             return 0.0
         return float((self.absolute_gain / self.invested_amount) * 100)
     
+    @percentage_gain.inplace.expression
+    @classmethod
+    def _percentage_gain_expression(cls):
+        """SQL form of percentage_gain (quantity cancels out); needs the instrument join"""
+        return (cls.effective_price - cls.purchase_price) * literal_column('100') / cls.purchase_price
+    
+    @hybrid_property
+    def manual_percentage_gain(self) -> float:
+        """Percentage gain at the holding's own current_price (its percentage_gain unless an instrument prices it)"""
+        return float((self.current_price - self.purchase_price) * 100 / self.purchase_price)
+    
+    @manual_percentage_gain.inplace.expression
+    @classmethod
+    def _manual_percentage_gain_expression(cls):
+        """SQL form of manual_percentage_gain, indexed per user for holdings without an instrument"""
+        return (cls.current_price - cls.purchase_price) * literal_column('100') / cls.purchase_price
+    
     @property
     def days_held(self) -> int:
         """Number of days investment is held"""
@@ -84,4 +120,15 @@ class Investment(Base):
         """Check if investment has matured (for FDs, Bonds)"""
         if self.maturity_date:
             return date.today() >= self.maturity_date
-        return False
\ No newline at end of file
+        return False
+
+# Serve top/worst performers without ranking every holding (InvestmentService._ranked):
+# manually priced holdings by their own gain, and linked lots per instrument by
+# purchase_price (lots valued at the same instrument price rank by what was paid)
+Index(
+    'ix_investments_user_manual_gain_pct',
+    Investment.user_id,
+    Investment.manual_percentage_gain,
+    postgresql_where=Investment.instrument_id.is_(None)
+)
+Index('ix_investments_user_instrument_purchase_price', Investment.user_id, Investment.instrument_id, Investment.purchase_price)
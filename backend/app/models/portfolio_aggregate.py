@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Numeric, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from app.database import Base
+
+# instrument_id of the group of manually priced holdings (no instrument linked)
+NO_INSTRUMENT = uuid.UUID(int=0)
+
+class PortfolioAggregate(Base):
+    """
+    Running totals of a user's holdings per (asset_type, platform, instrument).
+    
+    Maintained by InvestmentService in the same transaction as every holding
+    write, so portfolio views read one row per group instead of every lot.
+    Linked holdings store their quantity and are valued at the instrument's
+    last_price when read, so a price tick never touches this table.
+    """
+    __tablename__ = "portfolio_aggregates"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    asset_type = Column(String(50), primary_key=True)
+    platform = Column(String(100), primary_key=True, default="")  # "" when the holding has no platform
+    instrument_id = Column(UUID(as_uuid=True), primary_key=True, default=NO_INSTRUMENT)
+    
+    investment_count = Column(Integer, nullable=False, default=0)
+    invested_amount = Column(Numeric(30, 10), nullable=False, default=0)
+    quantity = Column(Numeric(30, 10), nullable=False, default=0)
+    manual_value = Column(Numeric(30, 10), nullable=False, default=0)  # sum of quantity * current_price
+    
+    def __repr__(self):
+        return f"<PortfolioAggregate {self.asset_type}/{self.platform or '-'}: {self.investment_count} holdings>"
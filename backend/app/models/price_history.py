@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Numeric, Date, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class PriceHistory(Base):
+    """
+    Append-only price observations, at most one row per holding per day.
+    
+    The primary key (investment_id, price_date) serves per-holding range scans;
+    ix_price_history_user_date serves portfolio-wide range scans.
+    """
+    __tablename__ = "price_history"
+    
+    investment_id = Column(UUID(as_uuid=True), ForeignKey("investments.id", ondelete="CASCADE"), primary_key=True)
+    price_date = Column(Date, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    price = Column(Numeric(15, 2), nullable=False)
+    
+    __table_args__ = (
+        Index('ix_price_history_user_date', 'user_id', 'price_date'),
+    )
+    
+    def __repr__(self):
+        return f"<PriceHistory {self.investment_id} {self.price_date}: ₹{self.price}>"
@@ -1,7 +1,7 @@
 # Open backend/app/models/user.py
 # Add investment relationship
 
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -20,9 +20,21 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Bumped on every investment write; with the held instruments' price_version, keys the portfolio summary cache
+    portfolio_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped on every expense write; with portfolio_version, keys the dashboard cache
+    expense_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped only by expense writes dated before the current month; keys the closed-month cache
+    closed_months_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relationships
     expenses = relationship("Expense", back_populates="user", cascade="all, delete-orphan")
     investments = relationship("Investment", back_populates="user", cascade="all, delete-orphan")
     
+    @property
+    def data_version(self) -> tuple:
+        """Changes whenever any of the user's expenses or investments change"""
+        return (self.portfolio_version, self.expense_version)
+    
     def __repr__(self):
         return f"<User {self.email}>"
\ No newline at end of file
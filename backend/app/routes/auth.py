@@ -16,6 +16,7 @@ from app.models.user import User
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+# register and login stay sync: bcrypt is CPU-bound and runs on the threadpool, off the event loop
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
@@ -53,6 +54,6 @@ def login(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """Get current user information"""
     return current_user
\ No newline at end of file
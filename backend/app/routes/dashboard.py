@@ -1,29 +1,61 @@
 # Create file: backend/app/routes/dashboard.py
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import date
 
-from app.database import get_db
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database import get_async_db, run_in_session
 from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.services.dashboard_service import DashboardService
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
 @router.get("/")
-def get_dashboard(
+async def get_dashboard(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get complete financial dashboard"""
-    dashboard_data = DashboardService.get_complete_dashboard(db, current_user.id)
+    version = await db.run_sync(DashboardService.cache_version, current_user, date.today())
+    etag = DashboardService.etag("dashboard", current_user.id, version)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    timings = {}
+    dashboard_data = await DashboardService.get_cached_dashboard_async(current_user.id, version, timings)
+    response.headers["ETag"] = etag
+    if settings.DEBUG and timings:
+        # Per-section latency, shown by browser dev tools: Server-Timing: expenses;dur=12.3, ...
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+        )
     return dashboard_data
 
 @router.get("/health-score")
-def get_financial_health_score(
+async def get_financial_health_score(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get financial health score and recommendations"""
-    health_score = DashboardService.get_financial_health_score(db, current_user.id)
-    return health_score
\ No newline at end of file
+    version = await db.run_sync(DashboardService.cache_version, current_user, date.today())
+    etag = DashboardService.etag("health_score", current_user.id, version)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    health_score = await run_in_session(DashboardService.get_cached_health_score, current_user.id, version)
+    response.headers["ETag"] = etag
+    return health_score
@@ -1,66 +1,67 @@
 # Open backend/app/routes/expenses.py
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from datetime import date
 import uuid
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseListResponse
 from app.services.expense_service import ExpenseService
+from app.core.pagination import next_cursor
 
 router = APIRouter(prefix="/api/expenses", tags=["Expenses"])
 
 @router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
-def create_expense(
+async def create_expense(
     expense_data: ExpenseCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new expense"""
-    expense = ExpenseService.create_expense(db, expense_data, current_user.id)
+    expense = await db.run_sync(ExpenseService.create_expense, expense_data, current_user.id)
     return expense
 
 @router.get("/", response_model=ExpenseListResponse)
-def get_expenses(
+async def get_expenses(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     category: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of expenses with optional filters"""
-    expenses = ExpenseService.get_expenses(
-        db, current_user.id, skip, limit, category, start_date, end_date
-    )
-    
-    total_count = ExpenseService.get_expense_count(
-        db, current_user.id, category, start_date, end_date
-    )
-    
-    total_amount = ExpenseService.get_total_amount(
-        db, current_user.id, category, start_date, end_date
-    )
+    try:
+        expenses, total_count, total_amount = await db.run_sync(
+            ExpenseService.get_expense_page, current_user.id, skip, limit, category, start_date, end_date, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return {
         "expenses": expenses,
         "total_count": total_count,
-        "total_amount": total_amount
+        "total_amount": total_amount,
+        "next_cursor": next_cursor(expenses, limit, "date")
     }
 
 @router.get("/{expense_id}", response_model=ExpenseResponse)
-def get_expense(
+async def get_expense(
     expense_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a single expense by ID"""
-    expense = ExpenseService.get_expense_by_id(db, expense_id, current_user.id)
+    expense = await db.run_sync(ExpenseService.get_expense_by_id, expense_id, current_user.id)
     
     if not expense:
         raise HTTPException(
@@ -71,14 +72,14 @@ def get_expense(
     return expense
 
 @router.put("/{expense_id}", response_model=ExpenseResponse)
-def update_expense(
+async def update_expense(
     expense_id: uuid.UUID,
     expense_data: ExpenseUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an expense"""
-    expense = ExpenseService.update_expense(db, expense_id, current_user.id, expense_data)
+    expense = await db.run_sync(ExpenseService.update_expense, expense_id, current_user.id, expense_data)
     
     if not expense:
         raise HTTPException(
@@ -89,13 +90,13 @@ def update_expense(
     return expense
 
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(
+async def delete_expense(
     expense_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an expense"""
-    success = ExpenseService.delete_expense(db, expense_id, current_user.id)
+    success = await db.run_sync(ExpenseService.delete_expense, expense_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -106,24 +107,24 @@ def delete_expense(
     return None
 
 @router.get("/summary/by-category", response_model=List[dict])
-def get_category_summary(
+async def get_category_summary(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get expense summary by category"""
-    summary = ExpenseService.get_category_summary(
-        db, current_user.id, start_date, end_date
+    summary = await db.run_sync(
+        ExpenseService.get_category_summary, current_user.id, start_date, end_date
     )
     return summary
 
 @router.get("/summary/by-month", response_model=List[dict])
-def get_monthly_summary(
+async def get_monthly_summary(
     year: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get monthly expense summary"""
-    summary = ExpenseService.get_monthly_summary(db, current_user.id, year)
+    summary = await db.run_sync(ExpenseService.get_monthly_summary, current_user.id, year)
     return summary
\ No newline at end of file
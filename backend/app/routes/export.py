@@ -2,49 +2,66 @@
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-import io
 
-from app.database import get_db
 from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.services.export_service import ExportService
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
+# The export bodies are generators with their own sessions: they run after the
+# route returns (and its dependencies close), on the threadpool, chunk by chunk
+
 @router.get("/expenses/csv")
-def export_expenses_csv(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def export_expenses_csv(
+    current_user: User = Depends(get_current_active_user)
 ):
     """Export all expenses as CSV"""
-    csv_data = ExportService.export_expenses_csv(db, current_user.id)
-    
     return StreamingResponse(
-        io.StringIO(csv_data),
+        ExportService.export_expenses_csv(current_user.id),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=expenses.csv"}
     )
 
 @router.get("/investments/csv")
-def export_investments_csv(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def export_investments_csv(
+    current_user: User = Depends(get_current_active_user)
 ):
     """Export all investments as CSV"""
-    csv_data = ExportService.export_investments_csv(db, current_user.id)
-    
     return StreamingResponse(
-        io.StringIO(csv_data),
+        ExportService.export_investments_csv(current_user.id),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=investments.csv"}
     )
 
+@router.get("/expenses/parquet")
+async def export_expenses_parquet(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Export all expenses as Parquet (typed columns, for analytics tools)"""
+    return StreamingResponse(
+        ExportService.export_expenses_parquet(current_user.id),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": "attachment; filename=expenses.parquet"}
+    )
+
+@router.get("/investments/parquet")
+async def export_investments_parquet(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Export all investments as Parquet (typed columns, for analytics tools)"""
+    return StreamingResponse(
+        ExportService.export_investments_parquet(current_user.id),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": "attachment; filename=investments.parquet"}
+    )
+
 @router.get("/complete")
-def export_complete_data(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def export_complete_data(
+    current_user: User = Depends(get_current_active_user)
 ):
     """Export complete financial data as JSON"""
-    data = ExportService.export_complete_portfolio(db, current_user.id)
-    return data
\ No newline at end of file
+    return StreamingResponse(
+        ExportService.export_complete_portfolio(current_user.id),
+        media_type="application/json"
+    )
@@ -1,12 +1,13 @@
 # Create file: backend/app/routes/investments.py
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from pydantic import BaseModel
+from datetime import date
 import uuid
 
-from app.database import get_db
+from app.database import get_async_db, run_in_session
 from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.schemas.investment import (
@@ -18,6 +19,10 @@ from app.schemas.investment import (
     ASSET_TYPES
 )
 from app.services.investment_service import InvestmentService
+from app.services.price_history_service import PriceHistoryService
+from app.services.returns_service import ReturnsService
+from app.services.risk_service import RiskService
+from app.core.pagination import next_cursor
 
 
 class BulkPriceUpdate(BaseModel):
@@ -26,49 +31,58 @@ class BulkPriceUpdate(BaseModel):
 router = APIRouter(prefix="/api/investments", tags=["Investments"])
 
 @router.post("/", response_model=InvestmentResponse, status_code=status.HTTP_201_CREATED)
-def create_investment(
+async def create_investment(
     investment_data: InvestmentCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new investment"""
-    investment = InvestmentService.create_investment(db, investment_data, current_user.id)
+    investment = await db.run_sync(InvestmentService.create_investment, investment_data, current_user.id)
     return investment
 
 @router.get("/", response_model=InvestmentListResponse)
-def get_investments(
+async def get_investments(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     asset_type: Optional[str] = Query(None, description=f"Filter by asset type: {', '.join(ASSET_TYPES)}"),
     platform: Optional[str] = None,
+    min_gain: Optional[float] = Query(None, description="Minimum percentage gain"),
+    max_gain: Optional[float] = Query(None, description="Maximum percentage gain"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_summary: bool = Query(True, description="Include portfolio_summary (of the filtered holdings when filters are set)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of investments with optional filters"""
-    investments = InvestmentService.get_investments(
-        db, current_user.id, skip, limit, asset_type, platform
-    )
+    try:
+        investments = await db.run_sync(
+            InvestmentService.get_investments, current_user.id, skip, limit, asset_type, platform, min_gain, max_gain, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    total_count = InvestmentService.get_investment_count(
-        db, current_user.id, asset_type, platform
+    total_count, portfolio_summary = await db.run_sync(
+        InvestmentService.get_list_totals, current_user.id, asset_type, platform, min_gain, max_gain, include_summary
     )
     
-    portfolio_summary = InvestmentService.calculate_portfolio_summary(db, current_user.id)
-    
     return {
         "investments": investments,
         "total_count": total_count,
-        "portfolio_summary": portfolio_summary
+        "portfolio_summary": portfolio_summary,
+        "next_cursor": next_cursor(investments, limit, "purchase_date")
     }
 
 @router.get("/{investment_id}", response_model=InvestmentResponse)
-def get_investment(
+async def get_investment(
     investment_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a single investment by ID"""
-    investment = InvestmentService.get_investment_by_id(db, investment_id, current_user.id)
+    investment = await db.run_sync(InvestmentService.get_investment_by_id, investment_id, current_user.id)
     
     if not investment:
         raise HTTPException(
@@ -78,17 +92,48 @@ def get_investment(
     
     return investment
 
+@router.get("/{investment_id}/price-history", response_model=List[dict])
+async def get_price_history(
+    investment_id: uuid.UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get recorded prices of an investment"""
+    investment = await db.run_sync(InvestmentService.get_investment_by_id, investment_id, current_user.id)
+    
+    if not investment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Investment not found"
+        )
+    
+    history = await db.run_sync(
+        PriceHistoryService.get_price_history, investment_id, current_user.id, start_date, end_date
+    )
+    return [
+        {"date": point.price_date.isoformat(), "price": float(point.price)}
+        for point in history
+    ]
+
 @router.put("/{investment_id}", response_model=InvestmentResponse)
-def update_investment(
+async def update_investment(
     investment_id: uuid.UUID,
     investment_data: InvestmentUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an investment"""
-    investment = InvestmentService.update_investment(
-        db, investment_id, current_user.id, investment_data
-    )
+    try:
+        investment = await db.run_sync(
+            InvestmentService.update_investment, investment_id, current_user.id, investment_data
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     if not investment:
         raise HTTPException(
@@ -99,16 +144,22 @@ def update_investment(
     return investment
 
 @router.patch("/{investment_id}/price", response_model=InvestmentResponse)
-def update_investment_price(
+async def update_investment_price(
     investment_id: uuid.UUID,
     price_data: PriceUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Quick update of investment price"""
-    investment = InvestmentService.update_price(
-        db, investment_id, current_user.id, price_data.current_price
-    )
+    try:
+        investment = await db.run_sync(
+            InvestmentService.update_price, investment_id, current_user.id, price_data.current_price
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     if not investment:
         raise HTTPException(
@@ -119,13 +170,13 @@ def update_investment_price(
     return investment
 
 @router.delete("/{investment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_investment(
+async def delete_investment(
     investment_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an investment"""
-    success = InvestmentService.delete_investment(db, investment_id, current_user.id)
+    success = await db.run_sync(InvestmentService.delete_investment, investment_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -138,82 +189,100 @@ def delete_investment(
 # Analytics endpoints
 
 @router.get("/analytics/asset-allocation", response_model=List[dict])
-def get_asset_allocation(
+async def get_asset_allocation(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get asset allocation breakdown"""
-    allocation = InvestmentService.get_asset_allocation(db, current_user.id)
+    allocation = await db.run_sync(InvestmentService.get_asset_allocation, current_user.id)
     return allocation
 
 @router.get("/analytics/top-performers", response_model=List[InvestmentResponse])
-def get_top_performers(
+async def get_top_performers(
     limit: int = Query(5, ge=1, le=20),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get top performing investments"""
-    performers = InvestmentService.get_top_performers(db, current_user.id, limit)
+    performers = await db.run_sync(InvestmentService.get_top_performers, current_user.id, limit)
     return performers
 
 @router.get("/analytics/worst-performers", response_model=List[InvestmentResponse])
-def get_worst_performers(
+async def get_worst_performers(
     limit: int = Query(5, ge=1, le=20),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get worst performing investments"""
-    performers = InvestmentService.get_worst_performers(db, current_user.id, limit)
+    performers = await db.run_sync(InvestmentService.get_worst_performers, current_user.id, limit)
     return performers
 
 @router.get("/analytics/maturing-soon", response_model=List[InvestmentResponse])
-def get_maturing_soon(
+async def get_maturing_soon(
     days: int = Query(30, ge=1, le=365, description="Number of days to look ahead"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get investments maturing within specified days"""
-    investments = InvestmentService.get_maturing_soon(db, current_user.id, days)
+    investments = await db.run_sync(InvestmentService.get_maturing_soon, current_user.id, days)
     return investments
 
 @router.get("/analytics/platform-summary", response_model=List[dict])
-def get_platform_summary(
+async def get_platform_summary(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get investment summary grouped by platform"""
-    summary = InvestmentService.get_platform_summary(db, current_user.id)
+    summary = await db.run_sync(InvestmentService.get_platform_summary, current_user.id)
     return summary
 
 # Bulk Update
 
 @router.post("/bulk-update-prices")
-def bulk_update_prices(
+async def bulk_update_prices(
     price_updates: BulkPriceUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Bulk update prices for multiple investments"""
-    result = InvestmentService.bulk_update_prices(db, current_user.id, price_updates.updates)
+    result = await db.run_sync(InvestmentService.bulk_update_prices, current_user.id, price_updates.updates)
     return result
 
 #statistics
+# Computed in Python over every holding: off the event loop, on the threadpool
 
 @router.get("/analytics/trends")
-def get_performance_trends(
+async def get_performance_trends(
     days: int = Query(30, ge=7, le=365, description="Number of days to analyze"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user)
 ):
     """Get investment performance trends over time"""
-    trends = InvestmentService.get_performance_trends(db, current_user.id, days)
+    trends = await run_in_session(InvestmentService.get_performance_trends, current_user.id, days)
     return trends
 
 @router.get("/analytics/statistics")
-def get_investment_statistics(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def get_investment_statistics(
+    current_user: User = Depends(get_current_active_user)
 ):
     """Get detailed investment statistics"""
-    statistics = InvestmentService.get_investment_statistics(db, current_user.id)
-    return statistics
\ No newline at end of file
+    statistics = await run_in_session(InvestmentService.get_investment_statistics, current_user.id)
+    return statistics
+
+@router.get("/analytics/returns")
+async def get_returns(
+    limit: int = Query(20, ge=1, le=500, description="Number of holdings to list, best CAGR first"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get annualized returns: portfolio and asset-type XIRR, holding CAGR"""
+    returns = await run_in_session(ReturnsService.get_returns, current_user.id, limit)
+    return returns
+
+@router.get("/analytics/risk")
+async def get_risk_metrics(
+    days: int = Query(365, ge=30, le=1825, description="Lookback period in days"),
+    window: int = Query(30, ge=5, le=180, description="Rolling volatility window in returns (days with daily prices)"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get volatility, max drawdown and Sharpe ratio per holding and for the portfolio"""
+    risk = await run_in_session(RiskService.get_risk_metrics, current_user.id, days, window)
+    return risk
\ No newline at end of file
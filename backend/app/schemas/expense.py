@@ -3,6 +3,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import date, datetime
+import datetime as dt
 from decimal import Decimal
 import uuid
 
@@ -24,7 +25,7 @@ class ExpenseUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     amount: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
     category: Optional[str] = Field(None, min_length=1, max_length=50)
-    date: Optional[date] = None # pyright: ignore[reportInvalidTypeForm]
+    date: Optional[dt.date] = None  # dt.date: a bare `date` here would resolve to this field's default
     payment_method: Optional[str] = Field(None, max_length=50)
     notes: Optional[str] = Field(None, max_length=500)
 
@@ -42,4 +43,5 @@ class ExpenseResponse(ExpenseBase):
 class ExpenseListResponse(BaseModel):
     expenses: list[ExpenseResponse]
     total_count: int
-    total_amount: Decimal
\ No newline at end of file
+    total_amount: Decimal
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -1,6 +1,6 @@
 # Open backend/app/schemas/investment.py
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, AliasChoices
 from typing import Optional
 from datetime import date, datetime
 from decimal import Decimal
@@ -60,6 +60,9 @@ class InvestmentUpdate(BaseModel):
 class InvestmentResponse(InvestmentBase):
     id: uuid.UUID
     user_id: uuid.UUID
+    instrument_id: Optional[uuid.UUID] = None
+    # Holdings linked to a priced instrument report the instrument's price
+    current_price: Decimal = Field(..., validation_alias=AliasChoices("effective_price", "current_price"))
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -91,4 +94,5 @@ class PortfolioSummary(BaseModel):
 class InvestmentListResponse(BaseModel):
     investments: list[InvestmentResponse]
     total_count: int
-    portfolio_summary: PortfolioSummary
\ No newline at end of file
+    portfolio_summary: Optional[PortfolioSummary] = None
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Apply the price history retention policy: keep daily points for
+PRICE_HISTORY_DAILY_RETENTION_DAYS, then only the last point of each month.
+
+Usage:
+    python -m app.scripts.compact_price_history
+    python -m app.scripts.compact_price_history --days 180
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.services.price_history_service import PriceHistoryService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Downsample old price history to monthly points")
+    parser.add_argument("--days", type=int, help="Daily retention window (default from settings)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        deleted = PriceHistoryService.compact(db, args.days)
+        print(f"✅ Removed {deleted} superseded price point(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Stream a quote file (CSV or JSONL) into the database in batched upserts.
+
+Market feed, one quote per symbol (updates the instruments table):
+    symbol,price[,asset_type,price_ts]      asset_type is required for new symbols
+
+One user's holdings, the file form of POST /api/investments/bulk-update-prices:
+    id,current_price                        with --user
+
+Usage:
+    python -m app.scripts.ingest_prices quotes.csv
+    python -m app.scripts.ingest_prices quotes.jsonl --chunk-size 10000
+    python -m app.scripts.ingest_prices prices.csv --user you@example.com
+    zcat quotes.jsonl.gz | python -m app.scripts.ingest_prices - --format jsonl
+
+Rejected lines are written to stderr as they are found.
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.services.auth_service import AuthService
+from app.services.price_feed_service import PriceFeedService
+
+
+def report_reject(line_number, error):
+    where = f"line {line_number}" if line_number is not None else "quote"
+    print(f"❌ {where}: {error}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest a price feed file")
+    parser.add_argument("path", help="Quote file, or - for stdin")
+    parser.add_argument("--format", choices=PriceFeedService.FORMATS, help="Input format (default from extension)")
+    parser.add_argument("--user", help="Apply id,current_price rows to this user's holdings (email)")
+    parser.add_argument("--chunk-size", type=int, help="Quotes per batch (default from settings)")
+    args = parser.parse_args(argv)
+
+    try:
+        fmt = args.format or PriceFeedService.detect_format(args.path)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    db = SessionLocal()
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    try:
+        user_id = None
+        if args.user:
+            user = AuthService.get_user_by_email(db, args.user)
+            if user is None:
+                print(f"❌ User not found: {args.user}")
+                return 1
+            user_id = user.id
+
+        stats = PriceFeedService.ingest(
+            db, stream, fmt,
+            user_id=user_id,
+            chunk_size=args.chunk_size,
+            on_reject=report_reject
+        )
+        print(
+            f"✅ Ingested {stats['rows']} row(s) in {stats['seconds']:.1f}s "
+            f"({stats['rows_per_second']:,.0f} rows/s): {stats['updated']} updated, "
+            f"{stats['created']} new instrument(s), {stats['rejected']} rejected"
+        )
+        return 0
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Rebuild the expense_monthly_rollup table from expenses.
+
+Usage:
+    python -m app.scripts.rebuild_expense_rollup            # all users
+    python -m app.scripts.rebuild_expense_rollup --user a@b.com
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.services.auth_service import AuthService
+from app.services.expense_rollup_service import ExpenseRollupService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the monthly expense rollup to repair drift")
+    parser.add_argument("--user", help="Only rebuild this user (email)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = None
+        if args.user:
+            user = AuthService.get_user_by_email(db, args.user)
+            if user is None:
+                print(f"❌ User not found: {args.user}")
+                return 1
+            user_ids = [user.id]
+
+        groups = ExpenseRollupService.rebuild(db, user_ids)
+        print(f"✅ Rebuilt {groups} monthly expense rollup group(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Rebuild the portfolio_aggregates table from investments.
+
+Usage:
+    python -m app.scripts.rebuild_portfolio_aggregates            # all users
+    python -m app.scripts.rebuild_portfolio_aggregates --user a@b.com
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.services.auth_service import AuthService
+from app.services.portfolio_aggregate_service import PortfolioAggregateService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild portfolio aggregates to repair drift")
+    parser.add_argument("--user", help="Only rebuild this user (email)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = None
+        if args.user:
+            user = AuthService.get_user_by_email(db, args.user)
+            if user is None:
+                print(f"❌ User not found: {args.user}")
+                return 1
+            user_ids = [user.id]
+
+        groups = PortfolioAggregateService.rebuild(db, user_ids)
+        print(f"✅ Rebuilt {groups} portfolio aggregate group(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Record today's price of every holding and instrument (run once a day, after
+the price feed), so risk metrics have a daily price series to work from.
+
+Usage:
+    python -m app.scripts.snapshot_prices
+    python -m app.scripts.snapshot_prices --date 2026-01-31
+"""
+
+import argparse
+import sys
+from datetime import date
+
+from app.database import SessionLocal
+from app.services.price_history_service import PriceHistoryService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot the day's prices into price history")
+    parser.add_argument("--date", type=date.fromisoformat, help="Snapshot date (default today)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        written = PriceHistoryService.snapshot(db, args.date)
+        print(f"✅ Recorded {written} price point(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
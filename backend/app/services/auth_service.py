@@ -1,5 +1,7 @@
 # Open backend/app/services/auth_service.py
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate
@@ -48,6 +50,12 @@ class AuthService:
         """Get user by email"""
         return db.query(User).filter(User.email == email).first()
     
+    @staticmethod
+    async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+        """Get user by email without blocking the event loop (authenticates every request)"""
+        result = await db.execute(select(User).filter(User.email == email))
+        return result.scalars().first()
+    
     @staticmethod
     def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
         """Get user by ID"""
@@ -1,60 +1,89 @@
 # Create file: backend/app/services/dashboard_service.py
 
 from sqlalchemy.orm import Session
+from app.core.cache import dashboard_cache
+from app.database import run_in_session
+from app.models.user import User
 from app.services.expense_service import ExpenseService
 from app.services.investment_service import InvestmentService
+from app.services.portfolio_aggregate_service import PortfolioAggregateService
+from typing import Optional
 from datetime import date, timedelta
-from decimal import Decimal
+import asyncio
+import hashlib
+import time
 import uuid
 
 class DashboardService:
     
     @staticmethod
-    def get_complete_dashboard(db: Session, user_id: uuid.UUID) -> dict:
-        """Get complete financial dashboard data"""
-        
-        # Current month date range
+    def cache_version(db: Session, user: User, today: date) -> tuple:
+        """
+        What a cached payload depends on: the user's data version, the price version
+        of the instruments they hold and the day (month-to-date figures roll over)
+        """
+        return user.data_version + (PortfolioAggregateService.price_version(db, user.id), today.isoformat())
+    
+    @staticmethod
+    def etag(kind: str, user_id: uuid.UUID, version: tuple) -> str:
+        """Weak ETag for a payload at this version, known before the payload is built"""
+        digest = hashlib.sha1(f"{kind}|{user_id}|{version}".encode()).hexdigest()[:20]
+        return f'W/"{digest}"'
+    
+    @staticmethod
+    async def get_cached_dashboard_async(
+        user_id: uuid.UUID,
+        version: tuple,
+        timings: Optional[dict] = None
+    ) -> dict:
+        """get_complete_dashboard_async, served from the dashboard cache while version is current"""
+        key = (user_id, "dashboard")
+        dashboard = dashboard_cache.get(key, version)
+        if dashboard is None:
+            dashboard = await DashboardService.get_complete_dashboard_async(user_id, timings)
+            dashboard_cache.set(key, version, dashboard)
+        return dashboard
+    
+    @staticmethod
+    def get_cached_health_score(db: Session, user_id: uuid.UUID, version: tuple) -> dict:
+        """get_financial_health_score, served from the dashboard cache while version is current"""
+        key = (user_id, "health_score")
+        health_score = dashboard_cache.get(key, version)
+        if health_score is None:
+            health_score = DashboardService.get_financial_health_score(db, user_id)
+            dashboard_cache.set(key, version, health_score)
+        return health_score
+    
+    @staticmethod
+    async def get_complete_dashboard_async(user_id: uuid.UUID, timings: Optional[dict] = None) -> dict:
+        """
+        Get complete financial dashboard data
+        The expense and investment sections are awaited together, each on a
+        threadpool thread with its own session (and pooled connection), so
+        latency is about that of the slower section and their Python work
+        stays off the event loop. timings, if given, receives the seconds
+        spent per section and in total.
+        """
+        timings = {} if timings is None else timings
+        started = time.perf_counter()
         today = date.today()
-        first_day_of_month = today.replace(day=1)
-        
-        # Last month date range
-        if today.month == 1:
-            last_month = 12
-            last_month_year = today.year - 1
-        else:
-            last_month = today.month - 1
-            last_month_year = today.year
-        
-        first_day_last_month = date(last_month_year, last_month, 1)
-        last_day_last_month = first_day_of_month - timedelta(days=1)
-        
-        # === EXPENSES DATA ===
-        # Current month expenses
-        current_month_total = ExpenseService.get_total_amount(
-            db, user_id, start_date=first_day_of_month, end_date=today
-        )
-        current_month_count = ExpenseService.get_expense_count(
-            db, user_id, start_date=first_day_of_month, end_date=today
-        )
-        
-        # Last month expenses
-        last_month_total = ExpenseService.get_total_amount(
-            db, user_id, start_date=first_day_last_month, end_date=last_day_last_month
-        )
         
-        # All time expenses
-        total_expenses_all_time = ExpenseService.get_total_amount(db, user_id)
-        total_expense_count = ExpenseService.get_expense_count(db, user_id)
-        
-        # Category breakdown
-        expense_categories = ExpenseService.get_category_summary(
-            db, user_id, start_date=first_day_of_month
+        expenses, investments = await asyncio.gather(
+            run_in_session(
+                DashboardService._timed_on, timings, "expenses", DashboardService._expense_section, user_id, today
+            ),
+            run_in_session(
+                DashboardService._timed_on, timings, "investments", DashboardService._investment_section, user_id
+            )
         )
-        
-        # === INVESTMENTS DATA ===
-        portfolio = InvestmentService.calculate_portfolio_summary(db, user_id)
-        asset_allocation = InvestmentService.get_asset_allocation(db, user_id)
-        top_performers = InvestmentService.get_top_performers(db, user_id, limit=5)
+        timings["total"] = time.perf_counter() - started
+        return DashboardService._assemble(today, expenses, investments)
+    
+    @staticmethod
+    def _assemble(today: date, expenses: dict, investments: dict) -> dict:
+        portfolio = investments["portfolio"]
+        current_month_total = expenses["current_month_total"]
+        last_month_total = expenses["last_month_total"]
         
         # === COMBINED METRICS ===
         # Net worth (investments - doesn't include cash)
@@ -81,32 +110,22 @@ class DashboardService:
                 "last_month_expenses": float(last_month_total),
                 "expense_change_percentage": expense_change_percentage,
                 "total_investments": portfolio.total_investments,
-                "total_expenses_count": total_expense_count,
+                "total_expenses_count": expenses["total_expense_count"],
             },
             "expenses": {
                 "current_month_total": float(current_month_total),
-                "current_month_count": current_month_count,
-                "all_time_total": float(total_expenses_all_time),
-                "all_time_count": total_expense_count,
-                "top_categories": expense_categories[:5],  # Top 5 categories
+                "current_month_count": expenses["current_month_count"],
+                "all_time_total": float(expenses["total_expenses_all_time"]),
+                "all_time_count": expenses["total_expense_count"],
+                "top_categories": expenses["expense_categories"][:5],  # Top 5 categories
             },
             "investments": {
                 "portfolio_value": float(portfolio.total_current_value),
                 "total_invested": float(portfolio.total_invested),
                 "total_gains": float(portfolio.total_gain_loss),
                 "gains_percentage": portfolio.total_gain_loss_percentage,
-                "asset_allocation": asset_allocation,
-                "top_performers": [
-                    {
-                        "id": str(inv.id),
-                        "asset_name": inv.asset_name,
-                        "asset_type": inv.asset_type,
-                        "percentage_gain": inv.percentage_gain,
-                        "absolute_gain": float(inv.absolute_gain),
-                        "current_value": float(inv.current_value)
-                    }
-                    for inv in top_performers
-                ]
+                "asset_allocation": investments["asset_allocation"],
+                "top_performers": investments["top_performers"]
             },
             "month_overview": {
                 "current_month": today.strftime("%B %Y"),
@@ -115,6 +134,79 @@ class DashboardService:
             }
         }
     
+    @staticmethod
+    def _timed(timings: dict, name: str, section, *args):
+        """section(*args), recording its duration in timings[name]"""
+        started = time.perf_counter()
+        try:
+            return section(*args)
+        finally:
+            timings[name] = time.perf_counter() - started
+    
+    @staticmethod
+    def _timed_on(db: Session, timings: dict, name: str, section, *args):
+        """_timed(section(db, *args)) in the argument order of run_in_session"""
+        return DashboardService._timed(timings, name, section, db, *args)
+    
+    @staticmethod
+    def _expense_periods(today: date) -> dict:
+        """The dashboard's expense periods: {"name": (start_date or None, end_date or None)}"""
+        # Current month date range
+        first_day_of_month = today.replace(day=1)
+        
+        # Last month date range
+        if today.month == 1:
+            last_month = 12
+            last_month_year = today.year - 1
+        else:
+            last_month = today.month - 1
+            last_month_year = today.year
+        
+        first_day_last_month = date(last_month_year, last_month, 1)
+        last_day_last_month = first_day_of_month - timedelta(days=1)
+        
+        return {
+            "current_month": (first_day_of_month, today),
+            "last_month": (first_day_last_month, last_day_last_month),
+            "all_time": (None, None)
+        }
+    
+    @staticmethod
+    def _expense_section(db: Session, user_id: uuid.UUID, today: date) -> dict:
+        totals = ExpenseService.get_period_totals(db, user_id, DashboardService._expense_periods(today))
+        
+        return {
+            "current_month_total": totals["current_month"][0],
+            "current_month_count": totals["current_month"][1],
+            "last_month_total": totals["last_month"][0],
+            "total_expenses_all_time": totals["all_time"][0],
+            "total_expense_count": totals["all_time"][1],
+            # Category breakdown
+            "expense_categories": ExpenseService.get_category_summary(
+                db, user_id, start_date=today.replace(day=1)
+            )
+        }
+    
+    @staticmethod
+    def _investment_section(db: Session, user_id: uuid.UUID) -> dict:
+        top_performers = InvestmentService.get_top_performers(db, user_id, limit=5)
+        return {
+            "portfolio": InvestmentService.calculate_portfolio_summary(db, user_id),
+            "asset_allocation": InvestmentService.get_asset_allocation(db, user_id),
+            "top_performers": [DashboardService._performer(inv) for inv in top_performers]
+        }
+    
+    @staticmethod
+    def _performer(inv) -> dict:
+        return {
+            "id": str(inv.id),
+            "asset_name": inv.asset_name,
+            "asset_type": inv.asset_type,
+            "percentage_gain": inv.percentage_gain,
+            "absolute_gain": float(inv.absolute_gain),
+            "current_value": float(inv.current_value)
+        }
+    
     @staticmethod
     def get_financial_health_score(db: Session, user_id: uuid.UUID) -> dict:
         """Calculate financial health score (0-100)"""
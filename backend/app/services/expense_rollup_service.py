@@ -0,0 +1,250 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, delete, select, extract, insert, and_, true
+from app.core.cache import closed_months_cache
+from app.database import upsert
+from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseMonthlyRollup
+from app.models.user import User
+from typing import Optional, List, Iterable, Tuple, Dict
+from datetime import date, timedelta
+from decimal import Decimal
+import uuid
+
+class ExpenseRollupService:
+    """Incremental maintenance of the expense_monthly_rollup table"""
+
+    @staticmethod
+    def month_of(day: date) -> date:
+        return day.replace(day=1)
+
+    @staticmethod
+    def snapshot(expense: Expense) -> tuple:
+        """Group key and amount an expense contributes: (year_month, category, amount)"""
+        return (ExpenseRollupService.month_of(expense.date), expense.category, expense.amount)
+
+    @staticmethod
+    def apply_delta(
+        db: Session,
+        user_id: uuid.UUID,
+        year_month: date,
+        category: str,
+        count: int,
+        amount: Decimal
+    ):
+        """Add a delta to one group with an atomic upsert (call before commit)"""
+        if year_month < ExpenseRollupService.month_of(date.today()):
+            # A backdated write: cached closed months of this user are stale
+            db.query(User).filter(User.id == user_id).update(
+                {
+                    User.closed_months_version: User.closed_months_version + 1,
+                    User.updated_at: User.updated_at
+                },
+                synchronize_session=False
+            )
+        
+        stmt = upsert(db, ExpenseMonthlyRollup).values(
+            user_id=user_id,
+            year_month=year_month,
+            category=category,
+            total=amount,
+            count=count
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                ExpenseMonthlyRollup.user_id,
+                ExpenseMonthlyRollup.year_month,
+                ExpenseMonthlyRollup.category
+            ],
+            set_={
+                "total": ExpenseMonthlyRollup.total + stmt.excluded.total,
+                "count": ExpenseMonthlyRollup.count + stmt.excluded.count
+            }
+        )
+        db.execute(stmt)
+
+        if count < 0:
+            db.execute(
+                delete(ExpenseMonthlyRollup).where(
+                    ExpenseMonthlyRollup.user_id == user_id,
+                    ExpenseMonthlyRollup.year_month == year_month,
+                    ExpenseMonthlyRollup.category == category,
+                    ExpenseMonthlyRollup.count <= 0
+                )
+            )
+
+    @staticmethod
+    def add(db: Session, user_id: uuid.UUID, snapshot: tuple):
+        year_month, category, amount = snapshot
+        ExpenseRollupService.apply_delta(db, user_id, year_month, category, 1, amount)
+
+    @staticmethod
+    def remove(db: Session, user_id: uuid.UUID, snapshot: tuple):
+        year_month, category, amount = snapshot
+        ExpenseRollupService.apply_delta(db, user_id, year_month, category, -1, -amount)
+
+    @staticmethod
+    def replace(db: Session, user_id: uuid.UUID, old: tuple, new: tuple):
+        """Move an expense's contribution from its old snapshot to its new one (month and category may change)"""
+        if old[:2] == new[:2]:
+            if old[2] != new[2]:
+                ExpenseRollupService.apply_delta(db, user_id, new[0], new[1], 0, new[2] - old[2])
+        else:
+            ExpenseRollupService.remove(db, user_id, old)
+            ExpenseRollupService.add(db, user_id, new)
+
+    @staticmethod
+    def split_range(
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> Tuple[Optional[tuple], List[tuple]]:
+        """
+        Split [start_date, end_date] (None = open) into the whole months the rollup
+        can answer, (first_month, last_month) by month start (None ends stay open;
+        None if there are none), and the partial months [(start, end)] that must
+        be read from expenses.
+        """
+        month_of = ExpenseRollupService.month_of
+        if start_date and end_date and start_date > end_date:
+            return None, []
+        if start_date and end_date and month_of(start_date) == month_of(end_date):
+            if start_date.day == 1 and (end_date + timedelta(days=1)).day == 1:
+                return (start_date, start_date), []
+            return None, [(start_date, end_date)]
+
+        edges = []
+        first_month = last_month = None
+        if start_date:
+            first_month = month_of(start_date)
+            if start_date.day != 1:
+                first_month = month_of(first_month + timedelta(days=31))
+                edges.append((start_date, first_month - timedelta(days=1)))
+        if end_date:
+            last_month = month_of(end_date)
+            if (end_date + timedelta(days=1)).day != 1:
+                edges.append((last_month, end_date))
+                last_month = month_of(last_month - timedelta(days=1))
+
+        if first_month and last_month and first_month > last_month:
+            return None, edges
+        return (first_month, last_month), edges
+
+    @staticmethod
+    def in_months(months: tuple):
+        """Condition for rollup rows within months (first_month, last_month), either end open"""
+        first_month, last_month = months
+        return and_(
+            true(),
+            *([ExpenseMonthlyRollup.year_month >= first_month] if first_month else []),
+            *([ExpenseMonthlyRollup.year_month <= last_month] if last_month else [])
+        )
+
+    @staticmethod
+    def covers(months: tuple, year_month: date) -> bool:
+        """Whether months (first_month, last_month), either end open, include year_month"""
+        first_month, last_month = months
+        return (first_month is None or year_month >= first_month) and (last_month is None or year_month <= last_month)
+
+    @staticmethod
+    def filtered(query, user_id: uuid.UUID, months: tuple):
+        """Rollup rows of user_id within months"""
+        return query.filter(ExpenseMonthlyRollup.user_id == user_id, ExpenseRollupService.in_months(months))
+
+    @staticmethod
+    def closed_months(db: Session, user_id: uuid.UUID, current_month: date) -> Dict[date, Dict[str, tuple]]:
+        """
+        {year_month: {category: (total, count)}} for every month before current_month.
+        Closed months only change through backdated writes, which bump
+        users.closed_months_version, so the history is cached until one happens.
+        """
+        user = db.get(User, user_id)
+        version = user.closed_months_version if user else 0
+        key = (user_id, current_month)
+        months = closed_months_cache.get(key, version)
+        if months is None:
+            months = {}
+            rows = db.query(
+                ExpenseMonthlyRollup.year_month,
+                ExpenseMonthlyRollup.category,
+                ExpenseMonthlyRollup.total,
+                ExpenseMonthlyRollup.count
+            ).filter(
+                ExpenseMonthlyRollup.user_id == user_id,
+                ExpenseMonthlyRollup.year_month < current_month
+            )
+            for year_month, category, total, count in rows:
+                months.setdefault(year_month, {})[category] = (total, count)
+            closed_months_cache.set(key, version, months)
+        return months
+
+    @staticmethod
+    def month_groups(db: Session, user_id: uuid.UUID, months: tuple) -> Dict[date, Dict[str, tuple]]:
+        """
+        Rollup groups within months (first_month, last_month), either end open:
+        closed months from the cache, the current (and any future) month from one query
+        """
+        first_month, last_month = months
+        current_month = ExpenseRollupService.month_of(date.today())
+        groups = {
+            year_month: categories
+            for year_month, categories in ExpenseRollupService.closed_months(db, user_id, current_month).items()
+            if ExpenseRollupService.covers(months, year_month)
+        }
+        if last_month is None or last_month >= current_month:
+            open_months = (max(first_month, current_month) if first_month else current_month, last_month)
+            rows = ExpenseRollupService.filtered(
+                db.query(
+                    ExpenseMonthlyRollup.year_month,
+                    ExpenseMonthlyRollup.category,
+                    ExpenseMonthlyRollup.total,
+                    ExpenseMonthlyRollup.count
+                ),
+                user_id, open_months
+            )
+            for year_month, category, total, count in rows:
+                groups.setdefault(year_month, {})[category] = (total, count)
+        return groups
+
+    @staticmethod
+    def rebuild(db: Session, user_ids: Optional[Iterable[uuid.UUID]] = None) -> int:
+        """
+        Recompute the rollup from the expenses table, repairing any drift.
+        Rebuilds every user when user_ids is None. Returns the number of groups written.
+        """
+        year = extract("year", Expense.date)
+        month = extract("month", Expense.date)
+        source = select(
+            Expense.user_id, year, month, Expense.category,
+            func.sum(Expense.amount), func.count(Expense.id)
+        ).group_by(Expense.user_id, year, month, Expense.category)
+
+        clear = delete(ExpenseMonthlyRollup)
+        bump = User.__table__.update().values(
+            expense_version=User.expense_version + 1,
+            closed_months_version=User.closed_months_version + 1,
+            updated_at=User.updated_at
+        )
+
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            source = source.where(Expense.user_id.in_(user_ids))
+            clear = clear.where(ExpenseMonthlyRollup.user_id.in_(user_ids))
+            bump = bump.where(User.id.in_(user_ids))
+
+        # Months are rebuilt as dates here rather than in SQL (date_trunc is PostgreSQL-only)
+        rows = [
+            {
+                "user_id": user_id,
+                "year_month": date(int(year), int(month), 1),
+                "category": category,
+                "total": total,
+                "count": count
+            }
+            for user_id, year, month, category, total, count in db.execute(source)
+        ]
+        db.execute(clear)
+        if rows:
+            db.execute(insert(ExpenseMonthlyRollup), rows)
+        # Cached dashboards may have been built from drifted totals
+        db.execute(bump)
+        db.commit()
+        return len(rows)
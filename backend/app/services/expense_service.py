@@ -1,16 +1,30 @@
 # Create new file: backend/app/services/expense_service.py
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, tuple_, case, or_, false, true
+from app.core.pagination import decode_cursor
 from app.models.expense import Expense
+from app.models.user import User
+from app.services.expense_rollup_service import ExpenseRollupService
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import date
 import uuid
 from decimal import Decimal
 
 class ExpenseService:
     
+    @staticmethod
+    def _mark_expenses_changed(db: Session, user_id: uuid.UUID):
+        """Bump the user's expense version in the current transaction (call before commit)"""
+        db.query(User).filter(User.id == user_id).update(
+            {
+                User.expense_version: User.expense_version + 1,
+                User.updated_at: User.updated_at
+            },
+            synchronize_session=False
+        )
+    
     @staticmethod
     def create_expense(db: Session, expense_data: ExpenseCreate, user_id: uuid.UUID) -> Expense:
         """Create a new expense"""
@@ -19,6 +33,8 @@ class ExpenseService:
             user_id=user_id
         )
         db.add(db_expense)
+        ExpenseRollupService.add(db, user_id, ExpenseRollupService.snapshot(db_expense))
+        ExpenseService._mark_expenses_changed(db, user_id)
         db.commit()
         db.refresh(db_expense)
         return db_expense
@@ -32,29 +48,86 @@ class ExpenseService:
         ).first()
     
     @staticmethod
-    def get_expenses(
-        db: Session,
+    def _filtered(
+        query,
         user_id: uuid.UUID,
-        skip: int = 0,
-        limit: int = 100,
         category: Optional[str] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> List[Expense]:
-        """Get list of expenses with filters"""
-        query = db.query(Expense).filter(Expense.user_id == user_id)
-        
-        # Apply filters
+    ):
+        """Restrict an expenses query to one user's filtered rows (shared by the list, count and total)"""
+        query = query.filter(Expense.user_id == user_id)
         if category:
             query = query.filter(Expense.category == category)
         if start_date:
             query = query.filter(Expense.date >= start_date)
         if end_date:
             query = query.filter(Expense.date <= end_date)
+        return query
+    
+    @staticmethod
+    def _paginated(query, entity, skip: int, limit: int, cursor: Optional[str]):
+        """Newest first (id breaks ties), after cursor if given, then skip/limit"""
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            query = query.filter(tuple_(entity.date, entity.id) < tuple_(after_date, after_id))
+        return query.order_by(entity.date.desc(), entity.id.desc()).offset(skip).limit(limit)
+    
+    @staticmethod
+    def get_expenses(
+        db: Session,
+        user_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None
+    ) -> List[Expense]:
+        """
+        Get list of expenses with filters, newest first
+        cursor (from the previous page) seeks past that row on the
+        (user_id, date, id) index instead of skipping; ValueError if malformed
+        """
+        query = ExpenseService._filtered(db.query(Expense), user_id, category, start_date, end_date)
+        return ExpenseService._paginated(query, Expense, skip, limit, cursor).all()
+    
+    @staticmethod
+    def get_expense_page(
+        db: Session,
+        user_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Expense], int, Decimal]:
+        """
+        One page of expenses with the count and total of every filtered row,
+        in one query: the keyset page (an index walk stopped by LIMIT) is
+        left-joined to a one-row count/sum of the filtered rows, which the
+        covering index answers without the heap. The join keeps that row
+        when the page is empty.
+        """
+        totals = ExpenseService._filtered(
+            db.query(
+                func.count(Expense.id).label("total_count"),
+                func.sum(Expense.amount).label("total_amount")
+            ),
+            user_id, category, start_date, end_date
+        ).subquery()
+        page = ExpenseService._paginated(
+            ExpenseService._filtered(db.query(Expense), user_id, category, start_date, end_date),
+            Expense, skip, limit, cursor
+        ).subquery()
+        page_expense = aliased(Expense, page)
+        rows = db.query(page_expense, totals.c.total_count, totals.c.total_amount).select_from(
+            totals
+        ).outerjoin(page, true()).order_by(page_expense.date.desc(), page_expense.id.desc()).all()
         
-        # Order by date descending and apply pagination
-        expenses = query.order_by(Expense.date.desc()).offset(skip).limit(limit).all()
-        return expenses
+        expenses = [row[0] for row in rows if row[0] is not None]
+        return expenses, rows[0].total_count, rows[0].total_amount or Decimal('0.00')
     
     @staticmethod
     def get_total_amount(
@@ -65,15 +138,9 @@ class ExpenseService:
         end_date: Optional[date] = None
     ) -> Decimal:
         """Get total amount of expenses"""
-        query = db.query(func.sum(Expense.amount)).filter(Expense.user_id == user_id)
-        
-        if category:
-            query = query.filter(Expense.category == category)
-        if start_date:
-            query = query.filter(Expense.date >= start_date)
-        if end_date:
-            query = query.filter(Expense.date <= end_date)
-        
+        query = ExpenseService._filtered(
+            db.query(func.sum(Expense.amount)), user_id, category, start_date, end_date
+        )
         total = query.scalar()
         return total if total else Decimal('0.00')
     
@@ -86,16 +153,57 @@ class ExpenseService:
         end_date: Optional[date] = None
     ) -> int:
         """Get count of expenses"""
-        query = db.query(func.count(Expense.id)).filter(Expense.user_id == user_id)
+        query = ExpenseService._filtered(
+            db.query(func.count(Expense.id)), user_id, category, start_date, end_date
+        )
+        return query.scalar()
+    
+    @staticmethod
+    def _in_edges(edges: List[tuple]):
+        """Condition for expenses dated within any of the (start, end) ranges"""
+        return or_(false(), *[Expense.date.between(start, end) for start, end in edges])
+    
+    @staticmethod
+    def get_period_totals(db: Session, user_id: uuid.UUID, periods: dict) -> dict:
+        """
+        Total amount and count per named period
+        periods: {"name": (start_date or None, end_date or None)}
+        Returns {"name": (total_amount, count)}
+        Whole months come from the monthly rollup (closed months cached), partial
+        months at the ends of the periods from one index range scan of expenses.
+        """
+        splits = [ExpenseRollupService.split_range(start, end) for start, end in periods.values()]
+        whole = [months for months, _ in splits if months]
+        groups = {}
+        if whole:
+            # One read covering every period's whole months
+            groups = ExpenseRollupService.month_groups(db, user_id, (
+                None if any(first is None for first, _ in whole) else min(first for first, _ in whole),
+                None if any(last is None for _, last in whole) else max(last for _, last in whole)
+            ))
         
-        if category:
-            query = query.filter(Expense.category == category)
-        if start_date:
-            query = query.filter(Expense.date >= start_date)
-        if end_date:
-            query = query.filter(Expense.date <= end_date)
+        expense_columns, all_edges = [], []
+        for _, edges in splits:
+            in_edges = ExpenseService._in_edges(edges)
+            expense_columns.append(func.sum(case((in_edges, Expense.amount))))
+            expense_columns.append(func.count(case((in_edges, Expense.id))))
+            all_edges.extend(edges)
         
-        return query.scalar()
+        partial = [None] * len(expense_columns)
+        if all_edges:
+            partial = ExpenseService._filtered(db.query(*expense_columns), user_id).filter(
+                ExpenseService._in_edges(all_edges)
+            ).one()
+        
+        totals = {}
+        for i, (name, (months, _)) in enumerate(zip(periods, splits)):
+            total, count = partial[2 * i] or 0, partial[2 * i + 1] or 0
+            for year_month, categories in groups.items():
+                if months and ExpenseRollupService.covers(months, year_month):
+                    total += sum(group_total for group_total, _ in categories.values())
+                    count += sum(group_count for _, group_count in categories.values())
+            totals[name] = (total if total else Decimal('0.00'), int(count))
+        return totals
     
     @staticmethod
     def update_expense(
@@ -110,11 +218,15 @@ class ExpenseService:
         if not db_expense:
             return None
         
+        old_snapshot = ExpenseRollupService.snapshot(db_expense)
+        
         # Update only provided fields
         update_data = expense_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_expense, field, value)
         
+        ExpenseRollupService.replace(db, user_id, old_snapshot, ExpenseRollupService.snapshot(db_expense))
+        ExpenseService._mark_expenses_changed(db, user_id)
         db.commit()
         db.refresh(db_expense)
         return db_expense
@@ -127,7 +239,9 @@ class ExpenseService:
         if not db_expense:
             return False
         
+        ExpenseRollupService.remove(db, user_id, ExpenseRollupService.snapshot(db_expense))
         db.delete(db_expense)
+        ExpenseService._mark_expenses_changed(db, user_id)
         db.commit()
         return True
     
@@ -138,27 +252,40 @@ class ExpenseService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
     ) -> List[dict]:
-        """Get spending summary by category"""
-        query = db.query(
-            Expense.category,
-            func.sum(Expense.amount).label('total'),
-            func.count(Expense.id).label('count')
-        ).filter(Expense.user_id == user_id)
+        """
+        Get spending summary by category, largest first
+        Whole months are read from the monthly rollup (closed months cached); only
+        partial months at the ends of the range are summed from expenses.
+        """
+        months, edges = ExpenseRollupService.split_range(start_date, end_date)
+        totals = {}
         
-        if start_date:
-            query = query.filter(Expense.date >= start_date)
-        if end_date:
-            query = query.filter(Expense.date <= end_date)
+        def add(rows):
+            for category, total, count in rows:
+                previous_total, previous_count = totals.get(category, (0, 0))
+                totals[category] = (previous_total + total, previous_count + count)
         
-        results = query.group_by(Expense.category).all()
+        if months:
+            for categories in ExpenseRollupService.month_groups(db, user_id, months).values():
+                add((category, total, count) for category, (total, count) in categories.items())
+        if edges:
+            add(ExpenseService._filtered(
+                db.query(Expense.category, func.sum(Expense.amount), func.count(Expense.id)),
+                user_id
+            ).filter(ExpenseService._in_edges(edges)).group_by(Expense.category).all())
         
+        return ExpenseService._category_rows(totals)
+    
+    @staticmethod
+    def _category_rows(totals: dict) -> List[dict]:
+        """Summary rows, largest first, from {category: (total, count)}"""
         return [
             {
                 "category": category,
                 "total_amount": float(total),
-                "expense_count": count
+                "expense_count": int(count)
             }
-            for category, total, count in results
+            for category, (total, count) in sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
         ]
     
     @staticmethod
@@ -167,25 +294,23 @@ class ExpenseService:
         user_id: uuid.UUID,
         year: Optional[int] = None
     ) -> List[dict]:
-        """Get monthly spending summary"""
-        query = db.query(
-            extract('year', Expense.date).label('year'),
-            extract('month', Expense.date).label('month'),
-            func.sum(Expense.amount).label('total'),
-            func.count(Expense.id).label('count')
-        ).filter(Expense.user_id == user_id)
-        
-        if year:
-            query = query.filter(extract('year', Expense.date) == year)
-        
-        results = query.group_by('year', 'month').order_by('year', 'month').all()
+        """Get monthly spending summary (from the monthly rollup, closed months cached)"""
+        months = (date(year, 1, 1), date(year, 12, 1)) if year else (None, None)
+        results = [
+            (
+                year_month,
+                sum(total for total, _ in categories.values()),
+                sum(count for _, count in categories.values())
+            )
+            for year_month, categories in sorted(ExpenseRollupService.month_groups(db, user_id, months).items())
+        ]
         
         return [
             {
-                "year": int(year),
-                "month": int(month),
+                "year": year_month.year,
+                "month": year_month.month,
                 "total_amount": float(total),
-                "expense_count": count
+                "expense_count": int(count)
             }
-            for year, month, total, count in results
-        ]
\ No newline at end of file
+            for year_month, total, count in results
+        ]
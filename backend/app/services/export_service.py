@@ -1,121 +1,309 @@
 # Create file: backend/app/services/export_service.py
 
-from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal
 from app.models import Expense, Investment
+from app.services.dashboard_service import DashboardService
+from app.services.expense_service import ExpenseService
+from app.services.investment_service import InvestmentService
+from typing import Iterable, Iterator
 from datetime import date
+from decimal import Decimal
 import csv
+import functools
+import heapq
 import io
+import itertools
+import json
 import uuid
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Compact JSON, as FastAPI's JSONResponse renders it
+_dumps = functools.partial(json.dumps, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+# Parquet exports have the CSV columns, typed as in the database: exact decimals
+# and dates, not floats and strings. quantity (20, 8) x price (15, 2) fits (38, 10).
+EXPENSE_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("title", pa.string()),
+    ("amount", pa.decimal128(10, 2)),
+    ("category", pa.string()),
+    ("payment_method", pa.string()),
+    ("notes", pa.string())
+])
+
+INVESTMENT_SCHEMA = pa.schema([
+    ("asset_type", pa.string()),
+    ("asset_name", pa.string()),
+    ("symbol", pa.string()),
+    ("quantity", pa.decimal128(20, 8)),
+    ("purchase_price", pa.decimal128(15, 2)),
+    ("current_price", pa.decimal128(15, 2)),
+    ("purchase_date", pa.date32()),
+    ("invested_amount", pa.decimal128(38, 10)),
+    ("current_value", pa.decimal128(38, 10)),
+    ("absolute_gain", pa.decimal128(38, 10)),
+    ("percentage_gain", pa.float64()),
+    ("days_held", pa.int32()),
+    ("platform", pa.string()),
+    ("notes", pa.string())
+])
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that keeps what was written until drained (the Parquet writer's output)"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
 
 class ExportService:
     
     @staticmethod
-    def export_expenses_csv(db: Session, user_id: uuid.UUID) -> str:
-        """Export expenses to CSV format"""
-        expenses = db.query(Expense).filter(Expense.user_id == user_id).order_by(Expense.date.desc()).all()
-        
+    def _csv_chunks(header: list, rows: Iterable[list]) -> Iterator[str]:
+        """Encode rows as CSV, yielding the text of every EXPORT_CHUNK_SIZE rows as it fills"""
         output = io.StringIO()
         writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            "Date", "Title", "Amount", "Category", "Payment Method", "Notes"
-        ])
-        
-        # Write data
-        for expense in expenses:
-            writer.writerow([
-                expense.date.strftime("%Y-%m-%d"),
-                expense.title,
-                float(expense.amount),
-                expense.category,
-                expense.payment_method or "",
-                expense.notes or ""
-            ])
-        
-        return output.getvalue()
+        writer.writerow(header)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % settings.EXPORT_CHUNK_SIZE == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        yield output.getvalue()
     
     @staticmethod
-    def export_investments_csv(db: Session, user_id: uuid.UUID) -> str:
-        """Export investments to CSV format"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).order_by(Investment.purchase_date.desc()).all()
-        
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            "Asset Type", "Asset Name", "Symbol", "Quantity", "Purchase Price",
-            "Current Price", "Purchase Date", "Invested Amount", "Current Value",
-            "Absolute Gain", "Percentage Gain", "Days Held", "Platform", "Notes"
-        ])
-        
-        # Write data
-        for inv in investments:
-            writer.writerow([
-                inv.asset_type,
-                inv.asset_name,
-                inv.symbol or "",
-                float(inv.quantity),
-                float(inv.purchase_price),
-                float(inv.current_price),
-                inv.purchase_date.strftime("%Y-%m-%d"),
-                float(inv.invested_amount),
-                float(inv.current_value),
-                float(inv.absolute_gain),
-                inv.percentage_gain,
-                inv.days_held,
-                inv.platform or "",
-                inv.notes or ""
-            ])
-        
-        return output.getvalue()
+    def export_expenses_csv(user_id: uuid.UUID) -> Iterator[str]:
+        """
+        Export expenses to CSV format, as a stream of chunks
+        The generator owns its session, so it can outlive the request's
+        dependencies; rows come from a server-side cursor EXPORT_CHUNK_SIZE
+        at a time, so memory does not grow with the number of expenses.
+        """
+        with SessionLocal() as db:
+            expenses = db.query(
+                Expense.date, Expense.title, Expense.amount, Expense.category,
+                Expense.payment_method, Expense.notes
+            ).filter(
+                Expense.user_id == user_id
+            ).order_by(
+                Expense.date.desc(), Expense.id.desc()  # the (user_id, date, id) index order; no sort
+            ).yield_per(settings.EXPORT_CHUNK_SIZE)
+            
+            yield from ExportService._csv_chunks(
+                ["Date", "Title", "Amount", "Category", "Payment Method", "Notes"],
+                (
+                    [
+                        expense_date.strftime("%Y-%m-%d"),
+                        title,
+                        float(amount),
+                        category,
+                        payment_method or "",
+                        notes or ""
+                    ]
+                    for expense_date, title, amount, category, payment_method, notes in expenses
+                )
+            )
     
     @staticmethod
-    def export_complete_portfolio(db: Session, user_id: uuid.UUID) -> dict:
-        """Export complete financial data as JSON"""
-        from app.services.expense_service import ExpenseService
-        from app.services.investment_service import InvestmentService
-        from app.services.dashboard_service import DashboardService
+    def export_investments_csv(user_id: uuid.UUID) -> Iterator[str]:
+        """Export investments to CSV format, as a stream of chunks (see export_expenses_csv)"""
+        with SessionLocal() as db:
+            investments = InvestmentService._holdings_query(db, user_id).order_by(
+                Investment.purchase_date.desc(), Investment.id.desc()
+            ).yield_per(settings.EXPORT_CHUNK_SIZE)
+            
+            yield from ExportService._csv_chunks(
+                [
+                    "Asset Type", "Asset Name", "Symbol", "Quantity", "Purchase Price",
+                    "Current Price", "Purchase Date", "Invested Amount", "Current Value",
+                    "Absolute Gain", "Percentage Gain", "Days Held", "Platform", "Notes"
+                ],
+                (
+                    [
+                        inv.asset_type,
+                        inv.asset_name,
+                        inv.symbol or "",
+                        float(inv.quantity),
+                        float(inv.purchase_price),
+                        float(inv.effective_price),
+                        inv.purchase_date.strftime("%Y-%m-%d"),
+                        float(inv.invested_amount),
+                        float(inv.current_value),
+                        float(inv.absolute_gain),
+                        inv.percentage_gain,
+                        inv.days_held,
+                        inv.platform or "",
+                        inv.notes or ""
+                    ]
+                    for inv in investments
+                )
+            )
+    
+    @staticmethod
+    def _parquet_chunks(schema: pa.Schema, rows: Iterable[tuple]) -> Iterator[bytes]:
+        """
+        Encode rows (tuples in schema order) as a Parquet file, yielding its bytes as they are written
+        Every EXPORT_CHUNK_SIZE rows become an Arrow record batch; once EXPORT_ROW_GROUP_SIZE
+        rows are buffered they are written out as one row group. The footer comes last.
+        """
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        buffered, buffered_rows = [], 0
         
-        # Get all data
-        expenses = db.query(Expense).filter(Expense.user_id == user_id).all()
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
+        def write_row_group():
+            table = pa.Table.from_batches(buffered, schema=schema)
+            writer.write_table(table, row_group_size=table.num_rows)
         
-        # Get summaries
-        expense_summary = {
-            "total_amount": float(ExpenseService.get_total_amount(db, user_id)),
-            "total_count": ExpenseService.get_expense_count(db, user_id),
-            "by_category": ExpenseService.get_category_summary(db, user_id)
-        }
-        
-        portfolio_summary = InvestmentService.calculate_portfolio_summary(db, user_id)
-        dashboard_data = DashboardService.get_complete_dashboard(db, user_id)
+        rows = iter(rows)
+        while chunk := list(itertools.islice(rows, settings.EXPORT_CHUNK_SIZE)):
+            columns = zip(*chunk)
+            buffered.append(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            buffered_rows += len(chunk)
+            if buffered_rows >= settings.EXPORT_ROW_GROUP_SIZE:
+                write_row_group()
+                buffered, buffered_rows = [], 0
+                yield sink.drain()
+        if buffered:
+            write_row_group()
+        writer.close()
+        yield sink.drain()
+    
+    @staticmethod
+    def export_expenses_parquet(user_id: uuid.UUID) -> Iterator[bytes]:
+        """Export expenses as a Parquet file, as a stream of chunks (read as in export_expenses_csv)"""
+        with SessionLocal() as db:
+            expenses = db.query(
+                Expense.date, Expense.title, Expense.amount, Expense.category,
+                Expense.payment_method, Expense.notes
+            ).filter(
+                Expense.user_id == user_id
+            ).order_by(Expense.date.desc(), Expense.id.desc()).yield_per(settings.EXPORT_CHUNK_SIZE)
+            
+            yield from ExportService._parquet_chunks(EXPENSE_SCHEMA, expenses)
+    
+    @staticmethod
+    def export_investments_parquet(user_id: uuid.UUID) -> Iterator[bytes]:
+        """Export investments as a Parquet file, as a stream of chunks (read as in export_investments_csv)"""
+        with SessionLocal() as db:
+            investments = InvestmentService._holdings_query(db, user_id).order_by(
+                Investment.purchase_date.desc(), Investment.id.desc()
+            ).yield_per(settings.EXPORT_CHUNK_SIZE)
+            
+            yield from ExportService._parquet_chunks(
+                INVESTMENT_SCHEMA,
+                (
+                    (
+                        inv.asset_type,
+                        inv.asset_name,
+                        inv.symbol,
+                        inv.quantity,
+                        inv.purchase_price,
+                        inv.effective_price,
+                        inv.purchase_date,
+                        inv.invested_amount,
+                        inv.current_value,
+                        inv.absolute_gain,
+                        inv.percentage_gain,
+                        inv.days_held,
+                        inv.platform,
+                        inv.notes
+                    )
+                    for inv in investments
+                )
+            )
+    
+    @staticmethod
+    def _json_array(items: Iterable) -> Iterator[str]:
+        """Encode items as a JSON array, yielding the text of every EXPORT_CHUNK_SIZE items"""
+        chunk = []
+        separator = "["
+        for item in items:
+            chunk.append(separator + _dumps(item))
+            separator = ","
+            if len(chunk) == settings.EXPORT_CHUNK_SIZE:
+                yield "".join(chunk)
+                chunk = []
+        chunk.append("[]" if separator == "[" else "]")
+        yield "".join(chunk)
+    
+    @staticmethod
+    def _expense_records(rows: Iterable, periods: dict, totals: dict) -> Iterator[dict]:
+        """
+        Expense export records from (id, date, title, amount, category, payment_method, notes)
+        rows, adding each to totals["periods"][name] (amount, count) for the periods it falls in,
+        and to the all-time and current-month per-category totals
+        """
+        def add(groups: dict, key, amount: Decimal):
+            total, count = groups.get(key, (0, 0))
+            groups[key] = (total + amount, count + 1)
         
-        # Format expenses
-        expense_list = [
-            {
-                "id": str(exp.id),
-                "date": exp.date.isoformat(),
-                "title": exp.title,
-                "amount": float(exp.amount),
-                "category": exp.category,
-                "payment_method": exp.payment_method,
-                "notes": exp.notes
+        month_start = periods["current_month"][0]
+        for expense_id, expense_date, title, amount, category, payment_method, notes in rows:
+            for name, (start_date, end_date) in periods.items():
+                if (start_date is None or expense_date >= start_date) and (end_date is None or expense_date <= end_date):
+                    add(totals["periods"], name, amount)
+            add(totals["by_category"], category, amount)
+            if expense_date >= month_start:
+                add(totals["month_by_category"], category, amount)
+            yield {
+                "id": str(expense_id),
+                "date": expense_date.isoformat(),
+                "title": title,
+                "amount": float(amount),
+                "category": category,
+                "payment_method": payment_method,
+                "notes": notes
             }
-            for exp in expenses
-        ]
-        
-        # Format investments
-        investment_list = [
-            {
+    
+    @staticmethod
+    def _investment_records(investments: Iterable[Investment], totals: dict) -> Iterator[dict]:
+        """
+        Investment export records, adding each holding to totals["asset_types"] and keeping
+        the five best percentage gains in the totals["top"] heap
+        """
+        for sequence, inv in enumerate(investments):
+            asset_type = totals["asset_types"].setdefault(
+                inv.asset_type, {"count": 0, "invested": Decimal("0"), "current_value": Decimal("0")}
+            )
+            asset_type["count"] += 1
+            asset_type["invested"] += inv.invested_amount
+            asset_type["current_value"] += inv.current_value
+            
+            heapq.heappush(totals["top"], (inv.percentage_gain, -sequence, DashboardService._performer(inv)))
+            if len(totals["top"]) > 5:
+                heapq.heappop(totals["top"])
+            
+            yield {
                 "id": str(inv.id),
                 "asset_type": inv.asset_type,
                 "asset_name": inv.asset_name,
                 "symbol": inv.symbol,
                 "quantity": float(inv.quantity),
                 "purchase_price": float(inv.purchase_price),
-                "current_price": float(inv.current_price),
+                "current_price": float(inv.effective_price),
                 "purchase_date": inv.purchase_date.isoformat(),
                 "maturity_date": inv.maturity_date.isoformat() if inv.maturity_date else None,
                 "invested_amount": float(inv.invested_amount),
@@ -127,26 +315,74 @@ class ExportService:
                 "interest_rate": float(inv.interest_rate) if inv.interest_rate else None,
                 "notes": inv.notes
             }
-            for inv in investments
-        ]
+    
+    @staticmethod
+    def export_complete_portfolio(user_id: uuid.UUID) -> Iterator[str]:
+        """
+        Export complete financial data as JSON, as a stream of chunks
+        Each table is read once, through a server-side cursor (see
+        export_expenses_csv); the summaries and the dashboard are totalled
+        from the same rows as they stream by, so each section's "data"
+        array comes before its "summary".
+        """
+        today = date.today()
+        periods = DashboardService._expense_periods(today)
+        expense_totals = {
+            "periods": {name: (Decimal("0"), 0) for name in periods},
+            "by_category": {},
+            "month_by_category": {}
+        }
+        investment_totals = {"asset_types": {}, "top": []}
         
-        return {
-            "export_date": date.today().isoformat(),
-            "user_id": str(user_id),
-            "expenses": {
-                "summary": expense_summary,
-                "data": expense_list
-            },
-            "investments": {
-                "summary": {
-                    "total_invested": float(portfolio_summary.total_invested),
-                    "total_current_value": float(portfolio_summary.total_current_value),
-                    "total_gain_loss": float(portfolio_summary.total_gain_loss),
-                    "gain_loss_percentage": portfolio_summary.total_gain_loss_percentage,
-                    "total_investments": portfolio_summary.total_investments,
-                    "asset_allocation": portfolio_summary.asset_type_breakdown
-                },
-                "data": investment_list
+        with SessionLocal() as db:
+            yield '{"export_date":' + _dumps(today.isoformat()) + ',"user_id":' + _dumps(str(user_id))
+            
+            expenses = db.query(
+                Expense.id, Expense.date, Expense.title, Expense.amount, Expense.category,
+                Expense.payment_method, Expense.notes
+            ).filter(
+                Expense.user_id == user_id
+            ).order_by(Expense.date.desc(), Expense.id.desc()).yield_per(settings.EXPORT_CHUNK_SIZE)
+            
+            yield ',"expenses":{"data":'
+            yield from ExportService._json_array(ExportService._expense_records(expenses, periods, expense_totals))
+            all_time_total, all_time_count = expense_totals["periods"]["all_time"]
+            yield ',"summary":' + _dumps({
+                "total_amount": float(all_time_total),
+                "total_count": all_time_count,
+                "by_category": ExpenseService._category_rows(expense_totals["by_category"])
+            }) + "}"
+            
+            investments = InvestmentService._holdings_query(db, user_id).order_by(
+                Investment.purchase_date.desc(), Investment.id.desc()
+            ).yield_per(settings.EXPORT_CHUNK_SIZE)
+            
+            yield ',"investments":{"data":'
+            yield from ExportService._json_array(ExportService._investment_records(investments, investment_totals))
+            portfolio_summary = InvestmentService._summarize(investment_totals["asset_types"])
+            yield ',"summary":' + _dumps({
+                "total_invested": float(portfolio_summary.total_invested),
+                "total_current_value": float(portfolio_summary.total_current_value),
+                "total_gain_loss": float(portfolio_summary.total_gain_loss),
+                "gain_loss_percentage": portfolio_summary.total_gain_loss_percentage,
+                "total_investments": portfolio_summary.total_investments,
+                "asset_allocation": portfolio_summary.asset_type_breakdown
+            }) + "}"
+        
+        dashboard = DashboardService._assemble(
+            today,
+            {
+                "current_month_total": expense_totals["periods"]["current_month"][0],
+                "current_month_count": expense_totals["periods"]["current_month"][1],
+                "last_month_total": expense_totals["periods"]["last_month"][0],
+                "total_expenses_all_time": all_time_total,
+                "total_expense_count": all_time_count,
+                "expense_categories": ExpenseService._category_rows(expense_totals["month_by_category"])
             },
-            "dashboard": dashboard_data
-        }
\ No newline at end of file
+            {
+                "portfolio": portfolio_summary,
+                "asset_allocation": InvestmentService._allocation(investment_totals["asset_types"]),
+                "top_performers": [performer for *_, performer in sorted(investment_totals["top"], reverse=True)]
+            }
+        )
+        yield ',"dashboard":' + _dumps(dashboard) + "}"
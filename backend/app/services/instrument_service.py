@@ -0,0 +1,199 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update, insert, bindparam, Numeric, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database import upsert, unnest_rows
+from app.models.instrument import Instrument, InstrumentPrice
+from app.models.investment import Investment
+from app.models.user import User
+from app.schemas.investment import ASSET_TYPES
+from app.services.portfolio_aggregate_service import PortfolioAggregateService
+from typing import Optional, Iterable
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+class InstrumentService:
+    """Shared market prices: one instruments row per symbol, referenced by holdings"""
+
+    @staticmethod
+    def find_for_holding(db: Session, symbol: Optional[str], asset_type: str) -> Optional[Instrument]:
+        """Instrument a holding with this symbol and asset type should follow, if any"""
+        if not symbol:
+            return None
+        return db.query(Instrument).filter(
+            Instrument.symbol == symbol,
+            Instrument.asset_type == asset_type
+        ).first()
+
+    @staticmethod
+    def update_prices(db: Session, quotes: Iterable[dict], on: Optional[date] = None) -> dict:
+        """
+        Apply a batch of price ticks
+        quotes format: [{"symbol": "RELIANCE", "price": 2950.5, "asset_type": "Stock"}, ...]
+
+        Each tick writes one instruments row whatever the number of holders:
+        portfolio aggregates value linked holdings at last_price when read, and
+        holders' caches key on the instrument's price_version. Unknown symbols
+        create an instrument (asset_type required) and link the existing
+        holdings of that symbol, moving their aggregate groups set-wise.
+        """
+        on = on or date.today()
+        failed = []
+        ticks = {}  # symbol -> (price, asset_type, price_ts); a repeated symbol keeps its last tick
+
+        for quote in quotes:
+            try:
+                symbol = str(quote["symbol"]).strip()
+                if not symbol:
+                    raise ValueError("Symbol is required")
+                price = Decimal(str(quote["price"]))
+                if price < 0:
+                    raise ValueError("Price must be non-negative")
+                asset_type = quote.get("asset_type")
+                if asset_type is not None and asset_type not in ASSET_TYPES:
+                    raise ValueError(f'Asset type must be one of: {", ".join(ASSET_TYPES)}')
+                ticks[symbol] = (price, asset_type, quote.get("price_ts") or datetime.now(timezone.utc))
+            except Exception as e:
+                failed.append({
+                    "symbol": quote.get("symbol", "unknown") if isinstance(quote, dict) else "unknown",
+                    "error": str(e)
+                })
+
+        if not ticks:
+            return {"updated_count": 0, "created_count": 0, "failed_count": len(failed), "failed_updates": failed}
+
+        known = {
+            row.symbol: row
+            for row in db.query(Instrument.id, Instrument.symbol).filter(
+                Instrument.symbol.in_(list(ticks))
+            )
+        }
+
+        # New symbols: create the instrument, then link holdings that match it
+        new_rows = []
+        for symbol, (price, asset_type, _) in ticks.items():
+            if symbol in known:
+                continue
+            if asset_type is None:
+                failed.append({"symbol": symbol, "error": "asset_type is required for a new symbol"})
+            else:
+                new_rows.append({"symbol": symbol, "asset_type": asset_type})
+
+        if new_rows:
+            db.execute(insert(Instrument), new_rows)
+            new_symbols = [row["symbol"] for row in new_rows]
+            InstrumentService._move_linked_aggregates(db, new_symbols)
+            matching = select(Instrument.id).where(
+                Instrument.symbol == Investment.symbol,
+                Instrument.asset_type == Investment.asset_type
+            ).scalar_subquery()
+            db.execute(
+                update(Investment).where(
+                    Investment.instrument_id.is_(None),
+                    Investment.symbol.in_(new_symbols)
+                ).values(instrument_id=matching).execution_options(synchronize_session=False)
+            )
+            for row in db.query(Instrument.id, Instrument.symbol).filter(
+                Instrument.symbol.in_(new_symbols)
+            ):
+                known[row.symbol] = row
+
+        priced = {known[symbol].id: symbol for symbol in ticks if symbol in known}
+        if priced:
+            InstrumentService._apply_ticks(db, [
+                (instrument_id, ticks[symbol][0], ticks[symbol][2])
+                for instrument_id, symbol in priced.items()
+            ])
+
+            history = upsert(db, InstrumentPrice)
+            history = history.on_conflict_do_update(
+                index_elements=[InstrumentPrice.instrument_id, InstrumentPrice.price_date],
+                set_={"price": history.excluded.price}
+            )
+            db.execute(history, [
+                {"instrument_id": instrument_id, "price_date": on, "price": ticks[symbol][0]}
+                for instrument_id, symbol in priced.items()
+            ])
+
+        db.commit()
+
+        return {
+            "updated_count": len(priced),
+            "created_count": len(new_rows),
+            "failed_count": len(failed),
+            "failed_updates": failed
+        }
+
+    @staticmethod
+    def _apply_ticks(db: Session, ticks: list):
+        """
+        Set last_price/price_ts and bump price_version for [(instrument_id, price, price_ts)]
+        in one statement (call before commit)
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            new_prices = unnest_rows("new_prices", [
+                ("id", PG_UUID(as_uuid=True)),
+                ("price", Numeric(15, 2)),
+                ("price_ts", DateTime(timezone=True))
+            ], ticks)
+            db.execute(
+                update(Instrument).where(Instrument.id == new_prices.c.id).values(
+                    last_price=new_prices.c.price,
+                    price_ts=new_prices.c.price_ts,
+                    price_version=Instrument.price_version + 1
+                ).execution_options(synchronize_session=False)
+            )
+        else:
+            # Other dialects (SQLite for local runs): one executemany UPDATE by id
+            db.execute(
+                Instrument.__table__.update().where(Instrument.id == bindparam("tick_id")).values(
+                    last_price=bindparam("tick_price"),
+                    price_ts=bindparam("tick_ts"),
+                    price_version=Instrument.price_version + 1
+                ),
+                [
+                    {"tick_id": instrument_id, "tick_price": price, "tick_ts": price_ts}
+                    for instrument_id, price, price_ts in ticks
+                ]
+            )
+
+    @staticmethod
+    def _move_linked_aggregates(db: Session, new_symbols: list):
+        """
+        Move the aggregate groups of unlinked holdings of new_symbols to their new
+        instruments and bump those holders' portfolio versions (call before linking)
+        """
+        platform = func.coalesce(Investment.platform, "")
+        groups = db.query(
+            Investment.user_id,
+            Investment.asset_type,
+            platform,
+            Instrument.id,
+            func.count(Investment.id),
+            func.sum(Investment.quantity * Investment.purchase_price),
+            func.sum(Investment.quantity),
+            func.sum(Investment.quantity * Investment.current_price)
+        ).join(
+            Instrument,
+            (Instrument.symbol == Investment.symbol) & (Instrument.asset_type == Investment.asset_type)
+        ).filter(
+            Investment.instrument_id.is_(None),
+            Instrument.symbol.in_(new_symbols)
+        ).group_by(
+            Investment.user_id, Investment.asset_type, platform, Instrument.id
+        ).all()
+        if not groups:
+            return
+
+        deltas = []
+        for user_id, asset_type, group_platform, instrument_id, count, invested, quantity, manual_value in groups:
+            invested, quantity, manual_value = Decimal(invested), Decimal(quantity), Decimal(manual_value)
+            deltas.append((user_id, asset_type, group_platform, None, -count, -invested, -quantity, -manual_value))
+            deltas.append((user_id, asset_type, group_platform, instrument_id, count, invested, quantity, manual_value))
+        PortfolioAggregateService.apply_deltas(db, deltas)
+
+        db.execute(
+            update(User).where(User.id.in_({group[0] for group in groups})).values(
+                portfolio_version=User.portfolio_version + 1,
+                updated_at=User.updated_at
+            ).execution_options(synchronize_session=False)
+        )
@@ -1,15 +1,61 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Session, aliased, contains_eager
+from sqlalchemy import func, desc, update, tuple_, Numeric, literal_column, select, true, union_all
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database import unnest_rows
+from app.models.instrument import Instrument
 from app.models.investment import Investment
+from app.models.user import User
 from app.schemas.investment import InvestmentCreate, InvestmentUpdate, PortfolioSummary
-from typing import Optional, List
+from app.services.portfolio_analytics import PortfolioAnalytics
+from app.services.portfolio_aggregate_service import PortfolioAggregateService
+from app.services.price_history_service import PriceHistoryService
+from app.services.instrument_service import InstrumentService
+from app.core.cache import portfolio_summary_cache
+from app.core.pagination import decode_cursor
+from typing import Optional, List, Tuple
 from datetime import date, timedelta, datetime
 from decimal import Decimal
-from collections import defaultdict
 import uuid
 
 class InvestmentService:
     
+    @staticmethod
+    def _mark_portfolio_changed(db: Session, user_id: uuid.UUID):
+        """Bump the user's portfolio version in the current transaction (call before commit)"""
+        db.query(User).filter(User.id == user_id).update(
+            {
+                User.portfolio_version: User.portfolio_version + 1,
+                User.updated_at: User.updated_at
+            },
+            synchronize_session=False
+        )
+        PortfolioAnalytics.invalidate(db, user_id)
+    
+    @staticmethod
+    def get_portfolio_version(db: Session, user_id: uuid.UUID) -> tuple:
+        """
+        Current portfolio version: the user's holdings version (served from the
+        identity map when the user is loaded) and the price version of the
+        instruments they hold, which price ticks advance
+        """
+        user = db.get(User, user_id)
+        if user is None:
+            return (0, 0)
+        return (user.portfolio_version, PortfolioAggregateService.price_version(db, user_id))
+    
+    @staticmethod
+    def _holdings_query(db: Session, user_id: uuid.UUID):
+        """A user's holdings joined to their instruments, for filters/ordering on effective_price"""
+        return db.query(Investment).outerjoin(Investment.instrument).options(
+            contains_eager(Investment.instrument)
+        ).filter(Investment.user_id == user_id)
+    
+    @staticmethod
+    def _check_manual_price(instrument: Optional[Instrument]):
+        """Holdings that follow a priced instrument do not take manual price updates"""
+        if instrument is not None and instrument.last_price is not None:
+            raise ValueError(f"Price of {instrument.symbol} comes from the market price feed")
+    
     @staticmethod
     def create_investment(db: Session, investment_data: InvestmentCreate, user_id: uuid.UUID) -> Investment:
         """Create a new investment"""
@@ -17,7 +63,15 @@ class InvestmentService:
             **investment_data.model_dump(),
             user_id=user_id
         )
+        db_investment.instrument = InstrumentService.find_for_holding(
+            db, db_investment.symbol, db_investment.asset_type
+        )
         db.add(db_investment)
+        db.flush()
+        PortfolioAggregateService.add(db, user_id, PortfolioAggregateService.snapshot(db_investment))
+        # A holding that follows a priced instrument is valued (and charted) at the instrument's price
+        PriceHistoryService.record_prices(db, user_id, [(db_investment.id, db_investment.effective_price)])
+        InvestmentService._mark_portfolio_changed(db, user_id)
         db.commit()
         db.refresh(db_investment)
         return db_investment
@@ -37,17 +91,26 @@ class InvestmentService:
         skip: int = 0,
         limit: int = 100,
         asset_type: Optional[str] = None,
-        platform: Optional[str] = None
+        platform: Optional[str] = None,
+        min_gain: Optional[float] = None,
+        max_gain: Optional[float] = None,
+        cursor: Optional[str] = None
     ) -> List[Investment]:
-        """Get list of investments with filters"""
-        query = db.query(Investment).filter(Investment.user_id == user_id)
-        
-        if asset_type:
-            query = query.filter(Investment.asset_type == asset_type)
-        if platform:
-            query = query.filter(Investment.platform == platform)
+        """
+        Get list of investments with filters, newest purchase first
+        cursor (from the previous page) seeks past that row on the
+        (user_id, purchase_date, id) index instead of skipping; ValueError if malformed
+        """
+        query = InvestmentService._filtered(
+            InvestmentService._holdings_query(db, user_id), asset_type, platform, min_gain, max_gain
+        )
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Investment.purchase_date, Investment.id) < tuple_(after_date, after_id))
         
-        investments = query.order_by(desc(Investment.purchase_date)).offset(skip).limit(limit).all()
+        investments = query.order_by(
+            desc(Investment.purchase_date), desc(Investment.id)
+        ).offset(skip).limit(limit).all()
         return investments
     
     @staticmethod
@@ -57,16 +120,35 @@ class InvestmentService:
         user_id: uuid.UUID,
         investment_data: InvestmentUpdate
     ) -> Optional[Investment]:
-        """Update an investment"""
+        """Update an investment (ValueError for a current_price on a holding priced by an instrument)"""
         db_investment = InvestmentService.get_investment_by_id(db, investment_id, user_id)
         
         if not db_investment:
             return None
         
         update_data = investment_data.model_dump(exclude_unset=True)
+        relinked = "symbol" in update_data or "asset_type" in update_data
+        instrument = db_investment.instrument
+        if relinked:
+            instrument = InstrumentService.find_for_holding(
+                db,
+                update_data.get("symbol", db_investment.symbol),
+                update_data.get("asset_type", db_investment.asset_type)
+            )
+        if "current_price" in update_data:
+            InvestmentService._check_manual_price(instrument)
+        
+        old_snapshot = PortfolioAggregateService.snapshot(db_investment)
         for field, value in update_data.items():
             setattr(db_investment, field, value)
+        db_investment.instrument = instrument
         
+        PortfolioAggregateService.replace(
+            db, user_id, old_snapshot, PortfolioAggregateService.snapshot(db_investment)
+        )
+        if "current_price" in update_data or relinked:
+            PriceHistoryService.record_prices(db, user_id, [(db_investment.id, db_investment.effective_price)])
+        InvestmentService._mark_portfolio_changed(db, user_id)
         db.commit()
         db.refresh(db_investment)
         return db_investment
@@ -78,13 +160,20 @@ class InvestmentService:
         user_id: uuid.UUID,
         new_price: Decimal
     ) -> Optional[Investment]:
-        """Quick update of current price"""
+        """Quick update of current price (ValueError for holdings priced by an instrument)"""
         db_investment = InvestmentService.get_investment_by_id(db, investment_id, user_id)
         
         if not db_investment:
             return None
         
+        InvestmentService._check_manual_price(db_investment.instrument)
+        old_snapshot = PortfolioAggregateService.snapshot(db_investment)
         db_investment.current_price = new_price
+        PortfolioAggregateService.replace(
+            db, user_id, old_snapshot, PortfolioAggregateService.snapshot(db_investment)
+        )
+        PriceHistoryService.record_prices(db, user_id, [(investment_id, new_price)])
+        InvestmentService._mark_portfolio_changed(db, user_id)
         db.commit()
         db.refresh(db_investment)
         return db_investment
@@ -97,33 +186,109 @@ class InvestmentService:
         if not db_investment:
             return False
         
+        PortfolioAggregateService.remove(db, user_id, PortfolioAggregateService.snapshot(db_investment))
         db.delete(db_investment)
+        InvestmentService._mark_portfolio_changed(db, user_id)
         db.commit()
         return True
     
+    @staticmethod
+    def _filtered(
+        query,
+        asset_type: Optional[str] = None,
+        platform: Optional[str] = None,
+        min_gain: Optional[float] = None,
+        max_gain: Optional[float] = None
+    ):
+        """Apply the list filters (shared by the list, count and filtered summary; needs the instrument join)"""
+        if asset_type:
+            query = query.filter(Investment.asset_type == asset_type)
+        if platform:
+            query = query.filter(Investment.platform == platform)
+        # Gain ranges compare each holding at its joined price: no index serves them
+        if min_gain is not None:
+            query = query.filter(Investment.percentage_gain >= min_gain)
+        if max_gain is not None:
+            query = query.filter(Investment.percentage_gain <= max_gain)
+        return query
+    
     @staticmethod
     def get_investment_count(
         db: Session,
         user_id: uuid.UUID,
         asset_type: Optional[str] = None,
-        platform: Optional[str] = None
+        platform: Optional[str] = None,
+        min_gain: Optional[float] = None,
+        max_gain: Optional[float] = None
     ) -> int:
         """Get count of investments"""
-        query = db.query(func.count(Investment.id)).filter(Investment.user_id == user_id)
-        
-        if asset_type:
-            query = query.filter(Investment.asset_type == asset_type)
-        if platform:
-            query = query.filter(Investment.platform == platform)
-        
-        return query.scalar()
+        query = db.query(func.count(Investment.id)).outerjoin(Investment.instrument).filter(
+            Investment.user_id == user_id
+        )
+        return InvestmentService._filtered(query, asset_type, platform, min_gain, max_gain).scalar()
+    
+    @staticmethod
+    def get_list_totals(
+        db: Session,
+        user_id: uuid.UUID,
+        asset_type: Optional[str] = None,
+        platform: Optional[str] = None,
+        min_gain: Optional[float] = None,
+        max_gain: Optional[float] = None,
+        include_summary: bool = True
+    ) -> Tuple[int, Optional[PortfolioSummary]]:
+        """
+        total_count and portfolio_summary for the investment list
+        Without filters the cached portfolio summary carries the count. With
+        filters one grouped query gives both the count and a summary of just
+        the matching holdings. Without the summary only the count is run.
+        """
+        if not include_summary:
+            return InvestmentService.get_investment_count(db, user_id, asset_type, platform, min_gain, max_gain), None
+        
+        if not (asset_type or platform or min_gain is not None or max_gain is not None):
+            summary = InvestmentService.calculate_portfolio_summary(db, user_id)
+            return summary.total_investments, summary
+        
+        query = db.query(
+            Investment.asset_type,
+            func.count(Investment.id),
+            func.sum(Investment.quantity * Investment.purchase_price),
+            func.sum(Investment.quantity * Investment.effective_price)
+        ).outerjoin(Investment.instrument).filter(Investment.user_id == user_id)
+        rows = InvestmentService._filtered(
+            query, asset_type, platform, min_gain, max_gain
+        ).group_by(Investment.asset_type).all()
+        
+        summary = InvestmentService._summarize({
+            row_asset_type: {
+                "count": count,
+                "invested": Decimal(invested),
+                "current_value": Decimal(current_value)
+            }
+            for row_asset_type, count, invested, current_value in rows
+        })
+        return summary.total_investments, summary
     
     @staticmethod
     def calculate_portfolio_summary(db: Session, user_id: uuid.UUID) -> PortfolioSummary:
-        """Calculate complete portfolio summary"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
-        
-        if not investments:
+        """Calculate complete portfolio summary (cached per user and portfolio version)"""
+        version = InvestmentService.get_portfolio_version(db, user_id)
+        summary = portfolio_summary_cache.get(user_id, version)
+        if summary is None:
+            summary = InvestmentService._build_portfolio_summary(db, user_id)
+            portfolio_summary_cache.set(user_id, version, summary)
+        return summary
+    
+    @staticmethod
+    def _build_portfolio_summary(db: Session, user_id: uuid.UUID) -> PortfolioSummary:
+        return InvestmentService._summarize(PortfolioAnalytics.for_user(db, user_id).asset_types)
+    
+    @staticmethod
+    def _summarize(asset_types: dict) -> PortfolioSummary:
+        """PortfolioSummary from per-asset-type count, invested and current_value"""
+        count = sum(data["count"] for data in asset_types.values())
+        if not count:
             return PortfolioSummary(
                 total_invested=Decimal("0.00"),
                 total_current_value=Decimal("0.00"),
@@ -133,40 +298,28 @@ class InvestmentService:
                 asset_type_breakdown=[]
             )
         
-        total_invested = sum(inv.invested_amount for inv in investments)
-        total_current_value = sum(inv.current_value for inv in investments)
+        total_invested = sum((data["invested"] for data in asset_types.values()), Decimal("0"))
+        total_current_value = sum((data["current_value"] for data in asset_types.values()), Decimal("0"))
         total_gain_loss = total_current_value - total_invested
         
         total_gain_loss_percentage = float((total_gain_loss / total_invested) * 100) if total_invested > 0 else 0.0
         
-        asset_breakdown = {}
-        for inv in investments:
-            if inv.asset_type not in asset_breakdown:
-                asset_breakdown[inv.asset_type] = {
-                    "asset_type": inv.asset_type,
-                    "count": 0,
-                    "invested": Decimal("0.00"),
-                    "current_value": Decimal("0.00"),
-                    "gain_loss": Decimal("0.00"),
-                    "percentage_of_portfolio": 0.0
-                }
-            
-            asset_breakdown[inv.asset_type]["count"] += 1
-            asset_breakdown[inv.asset_type]["invested"] += inv.invested_amount
-            asset_breakdown[inv.asset_type]["current_value"] += inv.current_value
-            asset_breakdown[inv.asset_type]["gain_loss"] += inv.absolute_gain
-        
-        for asset_data in asset_breakdown.values():
+        asset_type_breakdown = []
+        for asset_type, data in asset_types.items():
+            percentage_of_portfolio = 0.0
             if total_current_value > 0:
-                asset_data["percentage_of_portfolio"] = float(
-                    (asset_data["current_value"] / total_current_value) * 100
-                )
+                percentage_of_portfolio = float((data["current_value"] / total_current_value) * 100)
+            
+            asset_type_breakdown.append({
+                "asset_type": asset_type,
+                "count": data["count"],
+                "invested": data["invested"],
+                "current_value": data["current_value"],
+                "gain_loss": data["current_value"] - data["invested"],
+                "percentage_of_portfolio": percentage_of_portfolio
+            })
         
-        asset_type_breakdown = sorted(
-            asset_breakdown.values(),
-            key=lambda x: x["current_value"],
-            reverse=True
-        )
+        asset_type_breakdown.sort(key=lambda x: x["current_value"], reverse=True)
         
         for asset in asset_type_breakdown:
             asset["invested"] = float(asset["invested"])
@@ -178,28 +331,26 @@ class InvestmentService:
             total_current_value=total_current_value,
             total_gain_loss=total_gain_loss,
             total_gain_loss_percentage=total_gain_loss_percentage,
-            total_investments=len(investments),
+            total_investments=count,
             asset_type_breakdown=asset_type_breakdown
         )
     
     @staticmethod
     def get_asset_allocation(db: Session, user_id: uuid.UUID) -> List[dict]:
         """Get asset allocation breakdown"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
-        
-        if not investments:
+        return InvestmentService._allocation(PortfolioAnalytics.for_user(db, user_id).asset_types)
+    
+    @staticmethod
+    def _allocation(asset_types: dict) -> List[dict]:
+        """Allocation rows, largest first, from per-asset-type current_value"""
+        if not sum(data["count"] for data in asset_types.values()):
             return []
         
-        total_value = sum(inv.current_value for inv in investments)
-        
-        allocation = {}
-        for inv in investments:
-            if inv.asset_type not in allocation:
-                allocation[inv.asset_type] = Decimal("0.00")
-            allocation[inv.asset_type] += inv.current_value
+        total_value = sum((data["current_value"] for data in asset_types.values()), Decimal("0"))
         
         result = []
-        for asset_type, value in allocation.items():
+        for asset_type, data in asset_types.items():
+            value = data["current_value"]
             percentage = float((value / total_value) * 100) if total_value > 0 else 0.0
             result.append({
                 "asset_type": asset_type,
@@ -213,27 +364,73 @@ class InvestmentService:
     @staticmethod
     def get_top_performers(db: Session, user_id: uuid.UUID, limit: int = 5) -> List[Investment]:
         """Get top performing investments by percentage gain"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
-        
-        sorted_investments = sorted(
-            investments,
-            key=lambda x: x.percentage_gain,
-            reverse=True
-        )
-        
-        return sorted_investments[:limit]
+        return InvestmentService._ranked(db, user_id, limit, best=True)
     
     @staticmethod
     def get_worst_performers(db: Session, user_id: uuid.UUID, limit: int = 5) -> List[Investment]:
         """Get worst performing investments by percentage gain"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
-        
-        sorted_investments = sorted(
-            investments,
-            key=lambda x: x.percentage_gain
+        return InvestmentService._ranked(db, user_id, limit, best=False)
+    
+    @staticmethod
+    def _ranked(db: Session, user_id: uuid.UUID, limit: int, best: bool) -> List[Investment]:
+        """The limit holdings with the highest (best) or lowest percentage_gain"""
+        order = Investment.percentage_gain.desc() if best else Investment.percentage_gain.asc()
+        query = InvestmentService._holdings_query(db, user_id)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.filter(Investment.id.in_(InvestmentService._ranking_candidates(user_id, limit, best)))
+        return query.order_by(order).limit(limit).all()
+    
+    @staticmethod
+    def _ranking_candidates(user_id: uuid.UUID, limit: int, best: bool):
+        """
+        Ids of the limit best (or worst) holdings, ranked from indexes rather
+        than over every holding: the limit manually priced ones from
+        ix_investments_user_manual_gain_pct, and per instrument held, the limit
+        lots paid least (or most) for from ix_investments_user_instrument_purchase_price
+        (which also lists the instruments held).
+        Lots of an instrument that is not priced yet rank by their manual price.
+        """
+        lot = aliased(Investment)
+        instrument = aliased(Instrument)
+        manual_gain = lot.manual_percentage_gain
+        priced_gain = (instrument.last_price - lot.purchase_price) * literal_column('100') / lot.purchase_price
+        
+        def ranked(query, gain):
+            return query.order_by(gain.desc() if best else gain.asc()).limit(limit)
+        
+        manual = ranked(select(lot.id, manual_gain.label("gain")).where(
+            lot.user_id == user_id,
+            lot.instrument_id.is_(None)
+        ), manual_gain)
+        
+        # Instruments held, one index probe each (a skip scan) instead of reading every lot
+        def held_after(instrument_id):
+            query = select(lot.instrument_id).where(lot.user_id == user_id, lot.instrument_id.isnot(None))
+            if instrument_id is not None:
+                query = query.where(lot.instrument_id > instrument_id)
+            return query.order_by(lot.instrument_id).limit(1).scalar_subquery()
+        
+        held = select(held_after(None).label("instrument_id")).cte("held", recursive=True)
+        held = held.union_all(select(held_after(held.c.instrument_id)).where(held.c.instrument_id.isnot(None)))
+        per_instrument = union_all(
+            # One price for every lot: the least paid for gained the most
+            select(lot.id, priced_gain.label("gain")).where(
+                lot.user_id == user_id,
+                lot.instrument_id == instrument.id,
+                instrument.last_price.isnot(None)
+            ).order_by(lot.purchase_price.asc() if best else lot.purchase_price.desc()).limit(limit),
+            ranked(select(lot.id, manual_gain.label("gain")).where(
+                lot.user_id == user_id,
+                lot.instrument_id == instrument.id,
+                instrument.last_price.is_(None)
+            ), manual_gain)
+        ).subquery().lateral()
+        linked = select(per_instrument.c.id, per_instrument.c.gain).select_from(
+            held.join(instrument, instrument.id == held.c.instrument_id).join(per_instrument, true())
         )
         
-        return sorted_investments[:limit]
+        candidates = union_all(manual, linked).subquery()
+        return ranked(select(candidates.c.id), candidates.c.gain)
     
     @staticmethod
     def get_maturing_soon(db: Session, user_id: uuid.UUID, days: int = 30) -> List[Investment]:
@@ -253,41 +450,24 @@ class InvestmentService:
     @staticmethod
     def get_platform_summary(db: Session, user_id: uuid.UUID) -> List[dict]:
         """Get investment summary grouped by platform"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
+        analytics = PortfolioAnalytics.for_user(db, user_id)
         
-        if not investments:
+        if not analytics.count:
             return []
         
-        platform_data = {}
-        for inv in investments:
-            platform = inv.platform or "Unknown"
-            
-            if platform not in platform_data:
-                platform_data[platform] = {
-                    "platform": platform,
-                    "count": 0,
-                    "total_invested": Decimal("0.00"),
-                    "total_current_value": Decimal("0.00"),
-                    "total_gain_loss": Decimal("0.00")
-                }
-            
-            platform_data[platform]["count"] += 1
-            platform_data[platform]["total_invested"] += inv.invested_amount
-            platform_data[platform]["total_current_value"] += inv.current_value
-            platform_data[platform]["total_gain_loss"] += inv.absolute_gain
-        
         result = []
-        for platform, data in platform_data.items():
+        for platform, data in analytics.platforms.items():
+            total_gain_loss = data["current_value"] - data["invested"]
             gain_loss_pct = float(
-                (data["total_gain_loss"] / data["total_invested"] * 100)
-                if data["total_invested"] > 0 else 0
+                (total_gain_loss / data["invested"] * 100)
+                if data["invested"] > 0 else 0
             )
             result.append({
                 "platform": platform,
                 "count": data["count"],
-                "total_invested": float(data["total_invested"]),
-                "total_current_value": float(data["total_current_value"]),
-                "total_gain_loss": float(data["total_gain_loss"]),
+                "total_invested": float(data["invested"]),
+                "total_current_value": float(data["current_value"]),
+                "total_gain_loss": float(total_gain_loss),
                 "gain_loss_percentage": gain_loss_pct
             })
         
@@ -299,166 +479,253 @@ class InvestmentService:
         """
         Bulk update prices for multiple investments
         price_updates format: [{"id": "uuid", "current_price": 123.45}, ...]
+        
+        Ownership is checked with one SELECT and every price is applied with one
+        UPDATE ... FROM unnest(...), all in a single transaction.
         """
-        updated_count = 0
-        failed_updates = []
+        failed = []  # (position in payload, failure)
+        parsed = []  # (position, payload id, investment_id)
+        new_prices = {}  # investment_id -> price; a repeated id keeps its last price
         
-        for update in price_updates:
+        for position, update in enumerate(price_updates):
             try:
                 investment_id = uuid.UUID(update["id"])
                 new_price = Decimal(str(update["current_price"]))
-                
-                investment = InvestmentService.update_price(db, investment_id, user_id, new_price)
-                
-                if investment:
-                    updated_count += 1
-                else:
-                    failed_updates.append({
-                        "id": update["id"],
-                        "error": "Investment not found"
-                    })
+                if new_price < 0:
+                    raise ValueError("Price must be non-negative")
+                parsed.append((position, update["id"], investment_id))
+                new_prices[investment_id] = new_price
             except Exception as e:
-                failed_updates.append({
-                    "id": update.get("id", "unknown"),
+                failed.append((position, {
+                    "id": update.get("id", "unknown") if isinstance(update, dict) else "unknown",
                     "error": str(e)
-                })
+                }))
+        
+        holdings = []
+        if new_prices:
+            holdings = db.query(
+                Investment.id,
+                Investment.asset_type,
+                Investment.platform,
+                Investment.instrument_id,
+                Investment.quantity,
+                Investment.current_price,
+                Instrument.symbol,
+                Instrument.last_price
+            ).outerjoin(Investment.instrument).filter(
+                Investment.user_id == user_id,
+                Investment.id.in_(list(new_prices))
+            ).all()
+        
+        owned = {holding.id: holding for holding in holdings}
+        for position, payload_id, investment_id in parsed:
+            holding = owned.get(investment_id)
+            if holding is None:
+                failed.append((position, {
+                    "id": payload_id,
+                    "error": "Investment not found"
+                }))
+            elif holding.last_price is not None:
+                failed.append((position, {
+                    "id": payload_id,
+                    "error": f"Price of {holding.symbol} comes from the market price feed"
+                }))
+        
+        holdings = [holding for holding in holdings if holding.last_price is None]
+        
+        if holdings:
+            prices = [(holding.id, new_prices[holding.id]) for holding in holdings]
+            InvestmentService._apply_prices(db, user_id, prices)
+            
+            # Manual value deltas per aggregate group (asset_type, platform, instrument)
+            deltas = {}
+            for holding in holdings:
+                key = (holding.asset_type, holding.platform or "", holding.instrument_id)
+                change = Decimal(str(holding.quantity)) * (
+                    new_prices[holding.id] - Decimal(str(holding.current_price))
+                )
+                deltas[key] = deltas.get(key, Decimal("0")) + change
+            PortfolioAggregateService.apply_deltas(db, [
+                (user_id, *key, 0, Decimal("0"), Decimal("0"), change)
+                for key, change in deltas.items()
+            ])
+            
+            PriceHistoryService.record_prices(db, user_id, prices)
+            InvestmentService._mark_portfolio_changed(db, user_id)
+            db.commit()
+        
+        failed.sort(key=lambda item: item[0])
+        failed_updates = [failure for _, failure in failed]
         
         return {
-            "updated_count": updated_count,
+            "updated_count": len(price_updates) - len(failed_updates),
             "failed_count": len(failed_updates),
             "failed_updates": failed_updates
         }
     
+    @staticmethod
+    def _apply_prices(db: Session, user_id: uuid.UUID, prices: List[tuple]):
+        """Set current_price for many owned holdings in one statement (call before commit)"""
+        if db.get_bind().dialect.name == "postgresql":
+            new_prices = unnest_rows("new_prices", [
+                ("id", PG_UUID(as_uuid=True)),
+                ("price", Numeric(15, 2))
+            ], prices)
+            db.execute(
+                update(Investment).where(
+                    Investment.id == new_prices.c.id,
+                    Investment.user_id == user_id
+                ).values(current_price=new_prices.c.price).execution_options(synchronize_session=False)
+            )
+        else:
+            # Other dialects (SQLite for local runs): one executemany UPDATE by primary key
+            db.execute(
+                update(Investment),
+                [{"id": investment_id, "current_price": price} for investment_id, price in prices]
+            )
+    
     #Trend Analysis
     @staticmethod
     def get_performance_trends(db: Session, user_id: uuid.UUID, days: int = 30) -> dict:
         """
-        Get investment performance trends
-        Note: This is simplified. In production, you'd track historical prices
+        Get investment performance trends for the last `days` days.
+        Market value over time comes from the recorded price history.
         """
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
+        # One row per purchase date, already in timeline order
+        daily = db.query(
+            Investment.purchase_date,
+            func.count(Investment.id),
+            func.sum(Investment.quantity * Investment.purchase_price),
+            func.sum(Investment.quantity * Investment.effective_price)
+        ).outerjoin(Investment.instrument).filter(
+            Investment.user_id == user_id
+        ).group_by(Investment.purchase_date).order_by(Investment.purchase_date).all()
         
-        if not investments:
+        if not daily:
             return {
                 "message": "No investments found",
                 "trends": []
             }
         
-        # Group by purchase date to show portfolio growth over time
-        date_investments = defaultdict(list)
-        for inv in investments:
-            date_investments[inv.purchase_date].append(inv)
+        start_date = date.today() - timedelta(days=days)
+        values = PriceHistoryService.get_portfolio_value_series(db, user_id, start_date=start_date)
+        timeline = InvestmentService.build_timeline(daily, start_date, values)
+        
+        return {
+            "start_date": start_date.isoformat(),
+            "timeline": timeline,
+            "total_data_points": len(timeline)
+        }
+    
+    @staticmethod
+    def build_timeline(daily: List[tuple], start_date: date, values: Optional[List[tuple]] = None) -> List[dict]:
+        """
+        Cumulative portfolio timeline from per-date rows
+        (purchase_date, count, invested, current_value) sorted by date.
+        
+        When a market value series [(date, value)] is given, it is merged in and
+        forward-filled as current_value; otherwise current_value is the running
+        sum of today's values of the holdings bought so far.
         
-        # Create timeline
-        sorted_dates = sorted(date_investments.keys())
+        Single pass with running (prefix) sums. Earlier history is carried into
+        an opening point on start_date rather than listed.
+        """
+        values = values if values is not None else []
+        use_market_value = bool(values)
         timeline = []
+        cumulative_count = 0
         cumulative_invested = Decimal("0")
+        cumulative_value = Decimal("0")
+        market_value = Decimal("0")
+        opened = False
+        i = j = 0
         
-        for inv_date in sorted_dates:
-            invs = date_investments[inv_date]
-            for inv in invs:
-                cumulative_invested += inv.invested_amount
-            
-            # Calculate current value at this point
-            current_value = sum(
-                inv.current_value for inv in investments
-                if inv.purchase_date <= inv_date
+        def point(on: date) -> dict:
+            return {
+                "date": on.isoformat(),
+                "invested_amount": float(cumulative_invested),
+                "current_value": float(market_value if use_market_value else cumulative_value),
+                "investments_count": cumulative_count
+            }
+        
+        while i < len(daily) or j < len(values):
+            day = min(
+                daily[i][0] if i < len(daily) else date.max,
+                values[j][0] if j < len(values) else date.max
             )
             
-            timeline.append({
-                "date": inv_date.isoformat(),
-                "invested_amount": float(cumulative_invested),
-                "investments_count": sum(len(date_investments[d]) for d in sorted_dates if d <= inv_date)
-            })
+            if not opened and day >= start_date:
+                if cumulative_count and day > start_date:
+                    timeline.append(point(start_date))
+                opened = True
+            
+            while i < len(daily) and daily[i][0] == day:
+                _, count, invested, current_value = daily[i]
+                cumulative_count += count
+                cumulative_invested += Decimal(invested or 0)
+                cumulative_value += Decimal(current_value or 0)
+                i += 1
+            
+            while j < len(values) and values[j][0] == day:
+                market_value = values[j][1]
+                j += 1
+            
+            if opened:
+                timeline.append(point(day))
         
-        return {
-            "timeline": timeline,
-            "total_data_points": len(timeline)
-        }
+        if not opened and cumulative_count:
+            timeline.append(point(start_date))
+        
+        return timeline
     
     @staticmethod
     def get_investment_statistics(db: Session, user_id: uuid.UUID) -> dict:
-        """Get detailed investment statistics"""
-        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
+        """Get detailed investment statistics (vectorized over the holdings' column arrays)"""
+        stats = PortfolioAnalytics.for_user(db, user_id).holding_stats()
+        count = stats["count"]
         
-        if not investments:
+        if not count:
             return {
                 "message": "No investments found"
             }
         
-        # Calculate various statistics
-        total_invested = sum(inv.invested_amount for inv in investments)
-        total_value = sum(inv.current_value for inv in investments)
-        total_gains = sum(inv.absolute_gain for inv in investments)
+        total_invested = stats["total_invested"]
+        total_value = stats["total_value"]
+        total_gains = total_value - total_invested
         
         # Average holding period
-        avg_days_held = sum(inv.days_held for inv in investments) / len(investments)
-        
-        # Best and worst investment
-        best_investment = max(investments, key=lambda x: x.percentage_gain)
-        worst_investment = min(investments, key=lambda x: x.percentage_gain)
-        
-        # Gains vs losses
-        profitable = [inv for inv in investments if inv.absolute_gain > 0]
-        loss_making = [inv for inv in investments if inv.absolute_gain < 0]
-        break_even = [inv for inv in investments if inv.absolute_gain == 0]
+        avg_days_held = stats["total_days_held"] / count
         
         # Asset type performance
         asset_performance = {}
-        for inv in investments:
-            if inv.asset_type not in asset_performance:
-                asset_performance[inv.asset_type] = {
-                    "count": 0,
-                    "total_invested": Decimal("0"),
-                    "total_value": Decimal("0"),
-                    "total_gains": Decimal("0")
-                }
-            
-            asset_performance[inv.asset_type]["count"] += 1
-            asset_performance[inv.asset_type]["total_invested"] += inv.invested_amount
-            asset_performance[inv.asset_type]["total_value"] += inv.current_value
-            asset_performance[inv.asset_type]["total_gains"] += inv.absolute_gain
-        
-        # Calculate percentages for each asset type
-        for asset_type, data in asset_performance.items():
-            if data["total_invested"] > 0:
-                data["percentage_gain"] = float((data["total_gains"] / data["total_invested"]) * 100)
-            else:
-                data["percentage_gain"] = 0.0
-            
-            # Convert Decimals to float
-            data["total_invested"] = float(data["total_invested"])
-            data["total_value"] = float(data["total_value"])
-            data["total_gains"] = float(data["total_gains"])
+        for asset_type, data in stats["asset_types"].items():
+            gains = data["current_value"] - data["invested"]
+            asset_performance[asset_type] = {
+                "count": data["count"],
+                "total_invested": data["invested"],
+                "total_value": data["current_value"],
+                "total_gains": gains,
+                "percentage_gain": (gains / data["invested"]) * 100 if data["invested"] > 0 else 0.0
+            }
         
         return {
             "overview": {
-                "total_investments": len(investments),
-                "total_invested": float(total_invested),
-                "total_value": float(total_value),
-                "total_gains": float(total_gains),
-                "overall_percentage": float((total_gains / total_invested * 100) if total_invested > 0 else 0),
+                "total_investments": count,
+                "total_invested": total_invested,
+                "total_value": total_value,
+                "total_gains": total_gains,
+                "overall_percentage": (total_gains / total_invested * 100) if total_invested > 0 else 0.0,
                 "average_days_held": int(avg_days_held)
             },
             "performance": {
-                "profitable_count": len(profitable),
-                "loss_making_count": len(loss_making),
-                "break_even_count": len(break_even),
-                "win_rate": float(len(profitable) / len(investments) * 100) if investments else 0
+                "profitable_count": stats["profitable_count"],
+                "loss_making_count": stats["loss_making_count"],
+                "break_even_count": stats["break_even_count"],
+                "win_rate": float(stats["profitable_count"] / count * 100)
             },
             "extremes": {
-                "best_performer": {
-                    "asset_name": best_investment.asset_name,
-                    "asset_type": best_investment.asset_type,
-                    "percentage_gain": best_investment.percentage_gain,
-                    "absolute_gain": float(best_investment.absolute_gain)
-                },
-                "worst_performer": {
-                    "asset_name": worst_investment.asset_name,
-                    "asset_type": worst_investment.asset_type,
-                    "percentage_gain": worst_investment.percentage_gain,
-                    "absolute_gain": float(worst_investment.absolute_gain)
-                }
+                "best_performer": stats["best"],
+                "worst_performer": stats["worst"]
             },
             "asset_type_performance": asset_performance
-        }
\ No newline at end of file
+        }
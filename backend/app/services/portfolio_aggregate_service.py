@@ -0,0 +1,210 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, delete, select, insert
+from app.database import upsert
+from app.models.instrument import Instrument
+from app.models.investment import Investment
+from app.models.portfolio_aggregate import PortfolioAggregate, NO_INSTRUMENT
+from app.models.user import User
+from typing import Optional, List, Iterable
+from decimal import Decimal
+import uuid
+
+class PortfolioAggregateService:
+    """Incremental maintenance of the portfolio_aggregates table"""
+
+    @staticmethod
+    def snapshot(investment: Investment) -> tuple:
+        """
+        Group key and amounts a holding contributes:
+        (asset_type, platform, instrument_id, invested, quantity, manual_value)
+        """
+        quantity = Decimal(str(investment.quantity))
+        return (
+            investment.asset_type,
+            investment.platform or "",
+            investment.instrument.id if investment.instrument is not None else NO_INSTRUMENT,
+            investment.invested_amount,
+            quantity,
+            quantity * Decimal(str(investment.current_price))
+        )
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: List[tuple]):
+        """
+        Add deltas [(user_id, asset_type, platform, instrument_id, count, invested,
+        quantity, manual_value)] to their groups in one executemany upsert, then
+        drop groups left without holdings (call before commit)
+        """
+        rows = [
+            {
+                "user_id": user_id,
+                "asset_type": asset_type,
+                "platform": platform or "",
+                "instrument_id": instrument_id or NO_INSTRUMENT,
+                "investment_count": count,
+                "invested_amount": invested,
+                "quantity": quantity,
+                "manual_value": manual_value
+            }
+            for user_id, asset_type, platform, instrument_id, count, invested, quantity, manual_value in deltas
+            if count or invested or quantity or manual_value
+        ]
+        if not rows:
+            return
+
+        stmt = upsert(db, PortfolioAggregate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                PortfolioAggregate.user_id,
+                PortfolioAggregate.asset_type,
+                PortfolioAggregate.platform,
+                PortfolioAggregate.instrument_id
+            ],
+            set_={
+                "investment_count": PortfolioAggregate.investment_count + stmt.excluded.investment_count,
+                "invested_amount": PortfolioAggregate.invested_amount + stmt.excluded.invested_amount,
+                "quantity": PortfolioAggregate.quantity + stmt.excluded.quantity,
+                "manual_value": PortfolioAggregate.manual_value + stmt.excluded.manual_value
+            }
+        )
+        db.execute(stmt, rows)
+
+        emptied = {row["user_id"] for row in rows if row["investment_count"] < 0}
+        if emptied:
+            db.execute(
+                delete(PortfolioAggregate).where(
+                    PortfolioAggregate.user_id.in_(list(emptied)),
+                    PortfolioAggregate.investment_count <= 0
+                )
+            )
+
+    @staticmethod
+    def apply_delta(
+        db: Session,
+        user_id: uuid.UUID,
+        asset_type: str,
+        platform: Optional[str],
+        instrument_id: Optional[uuid.UUID],
+        count: int,
+        invested: Decimal,
+        quantity: Decimal,
+        manual_value: Decimal
+    ):
+        """Add a delta to one group (call before commit)"""
+        PortfolioAggregateService.apply_deltas(
+            db, [(user_id, asset_type, platform, instrument_id, count, invested, quantity, manual_value)]
+        )
+
+    @staticmethod
+    def add(db: Session, user_id: uuid.UUID, snapshot: tuple):
+        asset_type, platform, instrument_id, invested, quantity, manual_value = snapshot
+        PortfolioAggregateService.apply_delta(
+            db, user_id, asset_type, platform, instrument_id, 1, invested, quantity, manual_value
+        )
+
+    @staticmethod
+    def remove(db: Session, user_id: uuid.UUID, snapshot: tuple):
+        asset_type, platform, instrument_id, invested, quantity, manual_value = snapshot
+        PortfolioAggregateService.apply_delta(
+            db, user_id, asset_type, platform, instrument_id, -1, -invested, -quantity, -manual_value
+        )
+
+    @staticmethod
+    def replace(db: Session, user_id: uuid.UUID, old: tuple, new: tuple):
+        """Move a holding's contribution from its old snapshot to its new one"""
+        if old[:3] == new[:3]:
+            if old[3:] != new[3:]:
+                PortfolioAggregateService.apply_delta(
+                    db, user_id, *new[:3], 0, new[3] - old[3], new[4] - old[4], new[5] - old[5]
+                )
+        else:
+            PortfolioAggregateService.remove(db, user_id, old)
+            PortfolioAggregateService.add(db, user_id, new)
+
+    @staticmethod
+    def get_groups(db: Session, user_id: uuid.UUID) -> list:
+        """
+        A user's totals per (asset_type, platform): investment_count, invested_amount
+        and current_value, linked holdings valued at their instrument's last_price
+        (their manual price until its first tick)
+        """
+        current_value = func.coalesce(
+            PortfolioAggregate.quantity * Instrument.last_price,
+            PortfolioAggregate.manual_value
+        )
+        return db.query(
+            PortfolioAggregate.asset_type,
+            PortfolioAggregate.platform,
+            func.sum(PortfolioAggregate.investment_count).label("investment_count"),
+            func.sum(PortfolioAggregate.invested_amount).label("invested_amount"),
+            func.sum(current_value).label("current_value")
+        ).outerjoin(
+            Instrument, Instrument.id == PortfolioAggregate.instrument_id
+        ).filter(
+            PortfolioAggregate.user_id == user_id
+        ).group_by(
+            PortfolioAggregate.asset_type, PortfolioAggregate.platform
+        ).all()
+
+    @staticmethod
+    def price_version(db: Session, user_id: uuid.UUID) -> int:
+        """
+        Sum of the tick counters of the instruments a user holds: grows with every
+        tick that revalues the portfolio, so caches stay fresh without ticks
+        writing to each holder's users row
+        """
+        return db.query(func.coalesce(func.sum(Instrument.price_version), 0)).join(
+            PortfolioAggregate, PortfolioAggregate.instrument_id == Instrument.id
+        ).filter(PortfolioAggregate.user_id == user_id).scalar()
+
+    @staticmethod
+    def rebuild(db: Session, user_ids: Optional[Iterable[uuid.UUID]] = None) -> int:
+        """
+        Recompute aggregates from the investments table, repairing any drift.
+        Rebuilds every user when user_ids is None. Returns the number of groups written.
+        """
+        platform = func.coalesce(Investment.platform, "")
+        instrument_id = func.coalesce(Investment.instrument_id, NO_INSTRUMENT)
+        source = select(
+            Investment.user_id,
+            Investment.asset_type,
+            platform,
+            instrument_id,
+            func.count(Investment.id),
+            func.sum(Investment.quantity * Investment.purchase_price),
+            func.sum(Investment.quantity),
+            func.sum(Investment.quantity * Investment.current_price)
+        ).group_by(Investment.user_id, Investment.asset_type, platform, instrument_id)
+
+        clear = delete(PortfolioAggregate)
+        bump = User.__table__.update().values(
+            portfolio_version=User.portfolio_version + 1,
+            updated_at=User.updated_at
+        )
+
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            source = source.where(Investment.user_id.in_(user_ids))
+            clear = clear.where(PortfolioAggregate.user_id.in_(user_ids))
+            bump = bump.where(User.id.in_(user_ids))
+
+        db.execute(clear)
+        result = db.execute(
+            insert(PortfolioAggregate).from_select(
+                [
+                    PortfolioAggregate.user_id,
+                    PortfolioAggregate.asset_type,
+                    PortfolioAggregate.platform,
+                    PortfolioAggregate.instrument_id,
+                    PortfolioAggregate.investment_count,
+                    PortfolioAggregate.invested_amount,
+                    PortfolioAggregate.quantity,
+                    PortfolioAggregate.manual_value
+                ],
+                source
+            )
+        )
+        # Cached summaries may have been built from drifted totals
+        db.execute(bump)
+        db.commit()
+        return result.rowcount
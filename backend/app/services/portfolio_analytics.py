@@ -0,0 +1,208 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import cast, Float
+from app.models.investment import Investment
+from app.services.portfolio_aggregate_service import PortfolioAggregateService
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+import numpy as np
+import uuid
+
+
+class PortfolioAnalytics:
+    """
+    Portfolio aggregates for one user, shared by the InvestmentService views.
+
+    Totals and the asset-type/platform breakdowns are read from the
+    portfolio_aggregates table, one row per (asset_type, platform). Holdings
+    are loaded lazily as column arrays, and only for views that need every
+    individual lot (statistics).
+    The engine is cached on the session for the lifetime of the request.
+    """
+
+    CACHE_KEY = "portfolio_analytics"
+
+    def __init__(self, db: Session, user_id: uuid.UUID):
+        self.db = db
+        self.user_id = user_id
+        self._groups = None
+        self._holdings = None
+        self._holding_stats = None
+
+    @classmethod
+    def for_user(cls, db: Session, user_id: uuid.UUID) -> "PortfolioAnalytics":
+        """Get the engine for a user, creating it at most once per session"""
+        cache = db.info.setdefault(cls.CACHE_KEY, {})
+        analytics = cache.get(user_id)
+        if analytics is None:
+            analytics = cache[user_id] = cls(db, user_id)
+        return analytics
+
+    @classmethod
+    def invalidate(cls, db: Session, user_id: uuid.UUID):
+        """Drop the cached engine after a write to the user's holdings"""
+        db.info.get(cls.CACHE_KEY, {}).pop(user_id, None)
+
+    # Grouped aggregates
+
+    @property
+    def groups(self) -> List[dict]:
+        """Per (asset_type, platform) count, invested and current value"""
+        if self._groups is None:
+            self._groups = [
+                {
+                    "asset_type": row.asset_type,
+                    "platform": row.platform or None,
+                    "count": row.investment_count,
+                    "invested": Decimal(row.invested_amount),
+                    "current_value": Decimal(row.current_value)
+                }
+                for row in PortfolioAggregateService.get_groups(self.db, self.user_id)
+            ]
+        return self._groups
+
+    def _rollup(self, key) -> dict:
+        result = {}
+        for group in self.groups:
+            name = key(group)
+            data = result.get(name)
+            if data is None:
+                data = result[name] = {
+                    "count": 0,
+                    "invested": Decimal("0"),
+                    "current_value": Decimal("0")
+                }
+            data["count"] += group["count"]
+            data["invested"] += group["invested"]
+            data["current_value"] += group["current_value"]
+        return result
+
+    @property
+    def asset_types(self) -> dict:
+        return self._rollup(lambda group: group["asset_type"])
+
+    @property
+    def platforms(self) -> dict:
+        return self._rollup(lambda group: group["platform"] or "Unknown")
+
+    @property
+    def count(self) -> int:
+        return sum(group["count"] for group in self.groups)
+
+    @property
+    def total_invested(self) -> Decimal:
+        return sum((group["invested"] for group in self.groups), Decimal("0"))
+
+    @property
+    def total_current_value(self) -> Decimal:
+        return sum((group["current_value"] for group in self.groups), Decimal("0"))
+
+    @property
+    def total_gain_loss(self) -> Decimal:
+        return self.total_current_value - self.total_invested
+
+    # Holding-level views
+
+    @property
+    def holdings(self) -> "HoldingColumns":
+        if self._holdings is None:
+            self._holdings = HoldingColumns.load(self.db, self.user_id)
+        return self._holdings
+
+    def holding_stats(self) -> dict:
+        """Totals, win/loss counts, holding period, extremes and per-type rollups over the lots"""
+        if self._holding_stats is None:
+            self._holding_stats = self.holdings.stats()
+        return self._holding_stats
+
+
+class HoldingColumns:
+    """
+    A user's holdings as NumPy column arrays, loaded with one query, so the
+    statistics are vectorized reductions instead of passes over ORM objects.
+    Amounts are float64, which is what the statistics views return anyway.
+    """
+
+    def __init__(self, rows: List[tuple], today: Optional[date] = None):
+        """rows: (id, asset_name, asset_type, quantity, purchase_price, current_price, purchase_date)"""
+        ids, names, asset_types, quantity, purchase_price, current_price, purchase_date = (
+            zip(*rows) if rows else ((),) * 7
+        )
+        self.ids = list(ids)
+        self.asset_names = list(names)
+        self.asset_type_names, codes = np.unique(np.array(asset_types, dtype=object), return_inverse=True)
+        self.asset_type_codes = codes.reshape(-1)
+        self.quantity = np.array(quantity, dtype=np.float64)
+        self.purchase_price = np.array(purchase_price, dtype=np.float64)
+        self.current_price = np.array(current_price, dtype=np.float64)
+        self.purchase_ordinal = np.fromiter((d.toordinal() for d in purchase_date), dtype=np.int64, count=len(rows))
+        self.today = today or date.today()
+
+    @classmethod
+    def load(cls, db: Session, user_id: uuid.UUID) -> "HoldingColumns":
+        rows = db.query(
+            Investment.id,
+            Investment.asset_name,
+            Investment.asset_type,
+            cast(Investment.quantity, Float),
+            cast(Investment.purchase_price, Float),
+            cast(Investment.effective_price, Float),
+            Investment.purchase_date
+        ).outerjoin(Investment.instrument).filter(
+            Investment.user_id == user_id
+        ).all()
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.asset_names)
+
+    @property
+    def days_held(self) -> np.ndarray:
+        return self.today.toordinal() - self.purchase_ordinal
+
+    def stats(self) -> dict:
+        count = len(self)
+        invested = self.quantity * self.purchase_price
+        value = self.quantity * self.current_price
+        gain = value - invested
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain_pct = np.where(invested != 0, gain / invested * 100, 0.0)
+
+        stats = {
+            "count": count,
+            "total_invested": float(invested.sum()),
+            "total_value": float(value.sum()),
+            "total_days_held": int(self.days_held.sum()),
+            # quantity > 0, so the sign of the gain is the sign of the price move
+            "profitable_count": int(np.count_nonzero(self.current_price > self.purchase_price)),
+            "loss_making_count": int(np.count_nonzero(self.current_price < self.purchase_price)),
+            "break_even_count": int(np.count_nonzero(self.current_price == self.purchase_price)),
+            "best": None,
+            "worst": None,
+            "asset_types": {}
+        }
+        if not count:
+            return stats
+
+        stats["best"] = self._extreme(int(np.argmax(gain_pct)), gain_pct, gain)
+        stats["worst"] = self._extreme(int(np.argmin(gain_pct)), gain_pct, gain)
+
+        groups = len(self.asset_type_names)
+        counts = np.bincount(self.asset_type_codes, minlength=groups)
+        invested_by_type = np.bincount(self.asset_type_codes, weights=invested, minlength=groups)
+        value_by_type = np.bincount(self.asset_type_codes, weights=value, minlength=groups)
+        for code, asset_type in enumerate(self.asset_type_names):
+            stats["asset_types"][asset_type] = {
+                "count": int(counts[code]),
+                "invested": float(invested_by_type[code]),
+                "current_value": float(value_by_type[code])
+            }
+        return stats
+
+    def _extreme(self, index: int, gain_pct: np.ndarray, gain: np.ndarray) -> dict:
+        return {
+            "asset_name": self.asset_names[index],
+            "asset_type": self.asset_type_names[self.asset_type_codes[index]],
+            "percentage_gain": float(gain_pct[index]),
+            "absolute_gain": float(gain[index])
+        }
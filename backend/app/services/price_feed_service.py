@@ -0,0 +1,162 @@
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services.instrument_service import InstrumentService
+from app.services.investment_service import InvestmentService
+from typing import Optional, Iterable, Iterator, Callable, TextIO
+from decimal import Decimal, InvalidOperation
+from datetime import datetime
+import csv
+import json
+import time
+import uuid
+
+class PriceFeedService:
+    """
+    Streaming ingestion of quote files (CSV or JSONL).
+
+    A generator pipeline reads, validates and batches one line at a time, so
+    memory stays bounded by the chunk size whatever the file length. Market
+    quotes (symbol, price[, asset_type, price_ts]) go to the instruments table;
+    per-user files (id, current_price) go through bulk_update_prices.
+    """
+
+    FORMATS = ("csv", "jsonl")
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        """Input format from the file extension (.csv, .jsonl/.ndjson)"""
+        lowered = path.lower()
+        if lowered.endswith(".csv"):
+            return "csv"
+        if lowered.endswith((".jsonl", ".ndjson")):
+            return "jsonl"
+        raise ValueError(f"Cannot detect format of {path}; pass one of: {', '.join(PriceFeedService.FORMATS)}")
+
+    @staticmethod
+    def read_records(stream: TextIO, fmt: str) -> Iterator[tuple]:
+        """Yield (line_number, record, error) for each line; record is None when the line is unreadable"""
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            for record in reader:
+                yield reader.line_num, record, None
+        elif fmt == "jsonl":
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"Invalid JSON: {e}"
+                    continue
+                if isinstance(record, dict):
+                    yield line_number, record, None
+                else:
+                    yield line_number, None, "Expected a JSON object"
+        else:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+    @staticmethod
+    def parse_quotes(records: Iterable[tuple], per_user: bool) -> Iterator[tuple]:
+        """Yield (line_number, quote, error), normalising each record to the payload the services take"""
+        for line_number, record, error in records:
+            if error:
+                yield line_number, None, error
+                continue
+            try:
+                if per_user:
+                    quote = {
+                        "id": str(uuid.UUID(str(record["id"]).strip())),
+                        "current_price": PriceFeedService._parse_price(record["current_price"])
+                    }
+                else:
+                    symbol = str(record["symbol"] or "").strip()
+                    if not symbol:
+                        raise ValueError("Symbol is required")
+                    quote = {
+                        "symbol": symbol,
+                        "price": PriceFeedService._parse_price(record["price"]),
+                        "asset_type": (record.get("asset_type") or "").strip() or None,
+                        "price_ts": None
+                    }
+                    price_ts = (record.get("price_ts") or "").strip()
+                    if price_ts:
+                        quote["price_ts"] = datetime.fromisoformat(price_ts)
+            except KeyError as e:
+                yield line_number, None, f"Missing field: {e.args[0]}"
+            except (ValueError, TypeError, AttributeError) as e:
+                yield line_number, None, str(e) or "Invalid value"
+            else:
+                yield line_number, quote, None
+
+    @staticmethod
+    def _parse_price(value) -> Decimal:
+        try:
+            price = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid price: {value!r}")
+        if not price.is_finite() or price < 0:
+            raise ValueError("Price must be a non-negative number")
+        return price
+
+    @staticmethod
+    def chunked(quotes: Iterable[tuple], size: int, on_reject: Callable) -> Iterator[list]:
+        """Group valid quotes into lists of at most `size`, passing rejected lines to on_reject"""
+        chunk = []
+        for line_number, quote, error in quotes:
+            if error:
+                on_reject(line_number, error)
+                continue
+            chunk.append(quote)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def ingest(
+        db: Session,
+        stream: TextIO,
+        fmt: str,
+        user_id: Optional[uuid.UUID] = None,
+        chunk_size: Optional[int] = None,
+        on_reject: Optional[Callable] = None
+    ) -> dict:
+        """
+        Stream a quote file into the database, one batched upsert and commit per chunk.
+        With user_id the file holds (id, current_price) rows for that user's holdings.
+        on_reject(line_number, error) is called for every rejected line or quote.
+        """
+        chunk_size = chunk_size or settings.PRICE_FEED_CHUNK_SIZE
+        stats = {"rows": 0, "updated": 0, "created": 0, "rejected": 0}
+
+        def reject(line_number: Optional[int], error: str):
+            stats["rejected"] += 1
+            if on_reject:
+                on_reject(line_number, error)
+
+        def reject_line(line_number: int, error: str):
+            stats["rows"] += 1
+            reject(line_number, error)
+
+        records = PriceFeedService.read_records(stream, fmt)
+        quotes = PriceFeedService.parse_quotes(records, per_user=user_id is not None)
+
+        started = time.perf_counter()
+        for chunk in PriceFeedService.chunked(quotes, chunk_size, reject_line):
+            stats["rows"] += len(chunk)
+            if user_id is not None:
+                result = InvestmentService.bulk_update_prices(db, user_id, chunk)
+                key = "id"
+            else:
+                result = InstrumentService.update_prices(db, chunk)
+                stats["created"] += result["created_count"]
+                key = "symbol"
+
+            stats["updated"] += result["updated_count"]
+            for failure in result["failed_updates"]:
+                reject(None, f"{failure[key]}: {failure['error']}")
+
+        stats["seconds"] = time.perf_counter() - started
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
@@ -0,0 +1,262 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import delete, exists, extract, select, literal, Date
+from app.core.config import settings
+from app.database import upsert
+from app.models.instrument import Instrument, InstrumentPrice
+from app.models.investment import Investment
+from app.models.price_history import PriceHistory
+from typing import Optional, List, Iterable
+from datetime import date, timedelta
+import heapq
+from decimal import Decimal
+import uuid
+
+class PriceHistoryService:
+
+    @staticmethod
+    def record_prices(db: Session, user_id: uuid.UUID, prices: Iterable[tuple], on: Optional[date] = None):
+        """
+        Record (investment_id, price) observations for a day (call before commit).
+        A later observation on the same day replaces the earlier one.
+        """
+        rows = [
+            {
+                "investment_id": investment_id,
+                "price_date": on or date.today(),
+                "user_id": user_id,
+                "price": price
+            }
+            for investment_id, price in prices
+        ]
+        if not rows:
+            return
+
+        stmt = upsert(db, PriceHistory)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PriceHistory.investment_id, PriceHistory.price_date],
+            set_={"price": stmt.excluded.price}
+        )
+        db.execute(stmt, rows)
+
+    @staticmethod
+    def snapshot(db: Session, on: Optional[date] = None) -> int:
+        """
+        Record the day's price of every holding and priced instrument, so risk
+        metrics see a daily point even when nothing was re-priced. Existing
+        points for the day are kept. Returns rows written.
+        """
+        on = on or date.today()
+
+        # Holdings on a manual price (no instrument, or one that has not been priced yet)
+        manual = select(
+            Investment.id,
+            literal(on, Date),
+            Investment.user_id,
+            Investment.current_price
+        ).outerjoin(Investment.instrument).where(Instrument.last_price.is_(None))
+        holdings = upsert(db, PriceHistory).from_select(
+            ["investment_id", "price_date", "user_id", "price"], manual
+        ).on_conflict_do_nothing(index_elements=[PriceHistory.investment_id, PriceHistory.price_date])
+
+        priced = select(
+            Instrument.id,
+            literal(on, Date),
+            Instrument.last_price
+        ).where(Instrument.last_price.isnot(None))
+        instruments = upsert(db, InstrumentPrice).from_select(
+            ["instrument_id", "price_date", "price"], priced
+        ).on_conflict_do_nothing(index_elements=[InstrumentPrice.instrument_id, InstrumentPrice.price_date])
+
+        written = db.execute(holdings).rowcount + db.execute(instruments).rowcount
+        db.commit()
+        return written
+
+    @staticmethod
+    def get_price_history(
+        db: Session,
+        investment_id: uuid.UUID,
+        user_id: uuid.UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[PriceHistory]:
+        """Price observations of one holding within a date range"""
+        query = db.query(PriceHistory).filter(
+            PriceHistory.investment_id == investment_id,
+            PriceHistory.user_id == user_id
+        )
+        if start_date:
+            query = query.filter(PriceHistory.price_date >= start_date)
+        if end_date:
+            query = query.filter(PriceHistory.price_date <= end_date)
+
+        return query.order_by(PriceHistory.price_date).all()
+
+    @staticmethod
+    def get_portfolio_value_series(
+        db: Session,
+        user_id: uuid.UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[tuple]:
+        """
+        Market value of the portfolio over time as (date, value), one point per
+        date on which a holding was bought or re-priced.
+
+        Holdings enter at their purchase price on their purchase date and follow
+        their recorded prices afterwards: their own observations from a range
+        scan on (user_id, price_date), plus the daily prices of the instruments
+        they are linked to. Older points are already downsampled.
+
+        With start_date, only observations from start_date on are read: holdings
+        bought earlier enter together on start_date, seeded with their last
+        price before it (one index probe per holding and instrument).
+        """
+        end_date = end_date or date.today()
+
+        holdings = db.query(
+            Investment.id,
+            Investment.quantity,
+            Investment.purchase_date,
+            Investment.purchase_price,
+            Investment.instrument_id
+        ).filter(
+            Investment.user_id == user_id,
+            Investment.purchase_date <= end_date
+        ).order_by(Investment.purchase_date).all()
+
+        holding_observations = db.query(
+            PriceHistory.price_date,
+            PriceHistory.investment_id,
+            PriceHistory.price
+        ).filter(
+            PriceHistory.user_id == user_id,
+            PriceHistory.price_date >= (start_date or date.min),
+            PriceHistory.price_date <= end_date
+        ).order_by(PriceHistory.price_date).all()
+
+        # Linked holdings per instrument; an instrument observation re-prices all of them
+        linked = {}
+        for holding in holdings:
+            if holding.instrument_id is not None:
+                linked.setdefault(holding.instrument_id, []).append(holding.id)
+
+        instrument_observations = []
+        if linked:
+            instrument_observations = db.query(
+                InstrumentPrice.price_date,
+                InstrumentPrice.instrument_id,
+                InstrumentPrice.price
+            ).filter(
+                InstrumentPrice.instrument_id.in_(list(linked)),
+                InstrumentPrice.price_date >= (start_date or date.min),
+                InstrumentPrice.price_date <= end_date
+            ).order_by(InstrumentPrice.price_date).all()
+
+        # (price_date, [investment ids], price), in date order
+        observations = list(heapq.merge(
+            ((row.price_date, [row.investment_id], row.price) for row in holding_observations),
+            ((row.price_date, linked[row.instrument_id], row.price) for row in instrument_observations),
+            key=lambda observation: observation[0]
+        ))
+
+        prices = {}
+        if start_date is not None:
+            # Carried-in prices: the later of a holding's own and its instrument's last
+            # observation before start_date (the instrument's on the same day, as merged above)
+            seeds = PriceHistoryService.last_prices_before(
+                db, Investment.id, PriceHistory, "investment_id", Investment.user_id == user_id, start_date
+            )
+            if linked:
+                instrument_seeds = PriceHistoryService.last_prices_before(
+                    db, Instrument.id, InstrumentPrice, "instrument_id", Instrument.id.in_(list(linked)), start_date
+                )
+                for instrument_id, seed in instrument_seeds.items():
+                    for investment_id in linked[instrument_id]:
+                        if investment_id not in seeds or seed[0] >= seeds[investment_id][0]:
+                            seeds[investment_id] = seed
+            prices = {investment_id: Decimal(price) for investment_id, (_, price) in seeds.items()}
+
+        def entered(holding) -> date:
+            return max(holding.purchase_date, start_date) if start_date else holding.purchase_date
+
+        quantities = {}
+        value = Decimal("0")
+        series = []
+        i = j = 0
+
+        while i < len(holdings) or j < len(observations):
+            day = min(
+                entered(holdings[i]) if i < len(holdings) else date.max,
+                observations[j][0] if j < len(observations) else date.max
+            )
+
+            # Purchases first, so a same-day observation re-prices the new holding
+            while i < len(holdings) and entered(holdings[i]) == day:
+                holding = holdings[i]
+                quantity = Decimal(holding.quantity)
+                price = prices.setdefault(holding.id, Decimal(holding.purchase_price))
+                quantities[holding.id] = quantity
+                value += quantity * price
+                i += 1
+
+            while j < len(observations) and observations[j][0] == day:
+                _, investment_ids, price = observations[j]
+                price = Decimal(price)
+                for investment_id in investment_ids:
+                    if investment_id in quantities:
+                        value += quantities[investment_id] * (price - prices[investment_id])
+                    prices[investment_id] = price
+                j += 1
+
+            series.append((day, value))
+
+        return series
+
+    @staticmethod
+    def last_prices_before(db: Session, owner_id, model, key: str, owners, before: date) -> dict:
+        """
+        {owner id: (price_date, price)} of the last observation strictly before
+        `before` for each owner (holding or instrument) matching `owners`, read
+        by one backward probe of the (key, price_date) primary key per owner
+        """
+        def last(column):
+            return select(column).where(
+                getattr(model, key) == owner_id,
+                model.price_date < before
+            ).order_by(model.price_date.desc()).limit(1).scalar_subquery()
+
+        rows = db.query(owner_id, last(model.price_date), last(model.price)).filter(owners).all()
+        return {row[0]: (row[1], row[2]) for row in rows if row[1] is not None}
+
+    @staticmethod
+    def compact(db: Session, daily_retention_days: Optional[int] = None) -> int:
+        """
+        Retention policy: keep every daily point for the retention window and only
+        the last observation of each month before it, for holding and instrument
+        prices alike. Returns rows deleted.
+        """
+        if daily_retention_days is None:
+            daily_retention_days = settings.PRICE_HISTORY_DAILY_RETENTION_DAYS
+        cutoff = date.today() - timedelta(days=daily_retention_days)
+
+        deleted = 0
+        for model, key in ((PriceHistory, "investment_id"), (InstrumentPrice, "instrument_id")):
+            later = aliased(model)
+            superseded_in_month = exists().where(
+                getattr(later, key) == getattr(model, key),
+                later.price_date > model.price_date,
+                later.price_date < cutoff,
+                extract('year', later.price_date) == extract('year', model.price_date),
+                extract('month', later.price_date) == extract('month', model.price_date)
+            )
+
+            result = db.execute(
+                delete(model).where(
+                    model.price_date < cutoff,
+                    superseded_in_month
+                ).execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+
+        db.commit()
+        return deleted
@@ -0,0 +1,150 @@
+from sqlalchemy.orm import Session
+from app.services.portfolio_analytics import PortfolioAnalytics
+from typing import Optional
+import numpy as np
+import uuid
+
+DAYS_PER_YEAR = 365.0
+
+
+class ReturnsService:
+    """
+    Time-aware returns: annualized CAGR per holding and money-weighted XIRR
+    for the portfolio and each asset type, over the holdings' column arrays.
+    """
+
+    @staticmethod
+    def cagr(invested: np.ndarray, value: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Annualized growth rate of each lot, (value / invested) ^ (365 / days) - 1.
+        NaN where it is undefined (bought today) or overflows (huge gains over a few days).
+        """
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            rate = np.power(value / invested, DAYS_PER_YEAR / days) - 1
+        return np.where((days > 0) & (invested > 0) & np.isfinite(rate), rate, np.nan)
+
+    @staticmethod
+    def xirr(
+        invested: np.ndarray,
+        years: np.ndarray,
+        groups: np.ndarray,
+        values: np.ndarray,
+        tolerance: float = 1e-10,
+        max_iterations: int = 100
+    ) -> np.ndarray:
+        """
+        Solve the XIRR of several portfolios at once.
+
+        Portfolio g bought invested[i] years[i] ago for each lot i with
+        groups[i] == g and is worth values[g] today; its rate r solves
+            f(r) = sum(invested_i * (1 + r) ^ years_i) - values[g] = 0
+        f is increasing on r > -1, so each root is bracketed and found with
+        Newton steps that fall back to bisection when they leave the bracket.
+        Every iteration is one vectorized pass over all lots of all groups.
+        -1 (a total loss) where a group is worth nothing and every invested
+        amount is an outflow; f > 0 on r > -1 there, so the limit is taken.
+        NaN where no root exists (e.g. every lot bought today).
+        """
+        n_groups = len(values)
+        lo = np.full(n_groups, -1 + 1e-9)
+        hi = np.full(n_groups, 1.0)
+
+        def f_and_slope(rate):
+            growth = np.power(1 + rate[groups], years)
+            f = np.bincount(groups, weights=invested * growth, minlength=n_groups) - values
+            slope = np.bincount(groups, weights=invested * years * growth / (1 + rate[groups]), minlength=n_groups)
+            return f, slope
+
+        # Widen the upper bracket until f(hi) >= 0 (annual rates up to ~1e12)
+        for _ in range(20):
+            f_hi, _ = f_and_slope(hi)
+            if not np.any(f_hi < 0):
+                break
+            hi = np.where(f_hi < 0, hi * 4, hi)
+        f_lo, _ = f_and_slope(lo)
+        f_hi, _ = f_and_slope(hi)
+        solvable = (f_lo <= 0) & (f_hi >= 0) & (np.bincount(groups, weights=years, minlength=n_groups) > 0)
+
+        rate = np.where(solvable, np.clip(0.1, lo, hi), 0.0)
+        active = solvable.copy()
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+            f, slope = f_and_slope(rate)
+            lo = np.where(f < 0, rate, lo)
+            hi = np.where(f > 0, rate, hi)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = rate - f / slope
+            outside = ~np.isfinite(newton) | (newton <= lo) | (newton >= hi)
+            step = np.where(outside, (lo + hi) / 2, newton)
+
+            converged = (np.abs(step - rate) < tolerance) | (f == 0)
+            rate = np.where(active, step, rate)
+            active &= ~converged
+
+        outflows_only = np.bincount(groups, weights=invested < 0, minlength=n_groups) == 0
+        total_loss = (values == 0) & outflows_only & (np.bincount(groups, weights=invested, minlength=n_groups) > 0)
+        return np.where(solvable, rate, np.where(total_loss, -1.0, np.nan))
+
+    @staticmethod
+    def get_returns(db: Session, user_id: uuid.UUID, limit: int = 20) -> dict:
+        """Portfolio and per-asset-type XIRR, and the holdings ranked by CAGR"""
+        holdings = PortfolioAnalytics.for_user(db, user_id).holdings
+
+        if not len(holdings):
+            return {
+                "message": "No investments found"
+            }
+
+        invested = holdings.quantity * holdings.purchase_price
+        value = holdings.quantity * holdings.current_price
+        days = holdings.days_held.astype(np.float64)
+        cagr = ReturnsService.cagr(invested, value, days)
+
+        # Group 0..k-1 are the asset types, group k is the whole portfolio
+        type_count = len(holdings.asset_type_names)
+        lots = len(holdings)
+        groups = np.concatenate([holdings.asset_type_codes, np.full(lots, type_count)])
+        invested_by_group = np.bincount(groups, weights=np.tile(invested, 2), minlength=type_count + 1)
+        value_by_group = np.bincount(groups, weights=np.tile(value, 2), minlength=type_count + 1)
+        xirr = ReturnsService.xirr(
+            np.tile(invested, 2), np.tile(days / DAYS_PER_YEAR, 2), groups, value_by_group
+        )
+
+        def percentage(rate) -> Optional[float]:
+            return None if np.isnan(rate) else float(rate * 100)
+
+        # Best CAGR first, undefined rates last
+        order = np.argsort(np.where(np.isnan(cagr), np.inf, -cagr), kind="stable")[:limit]
+
+        return {
+            "as_of": holdings.today.isoformat(),
+            "portfolio": {
+                "total_invested": float(invested_by_group[type_count]),
+                "total_value": float(value_by_group[type_count]),
+                "xirr_percentage": percentage(xirr[type_count])
+            },
+            "by_asset_type": [
+                {
+                    "asset_type": asset_type,
+                    "total_invested": float(invested_by_group[code]),
+                    "total_value": float(value_by_group[code]),
+                    "xirr_percentage": percentage(xirr[code])
+                }
+                for code, asset_type in enumerate(holdings.asset_type_names)
+            ],
+            "holdings": [
+                {
+                    "id": str(holdings.ids[i]),
+                    "asset_name": holdings.asset_names[i],
+                    "asset_type": holdings.asset_type_names[holdings.asset_type_codes[i]],
+                    "days_held": int(days[i]),
+                    "invested_amount": float(invested[i]),
+                    "current_value": float(value[i]),
+                    "percentage_gain": float((value[i] - invested[i]) / invested[i] * 100) if invested[i] > 0 else 0.0,
+                    "cagr_percentage": percentage(cagr[i])
+                }
+                for i in order
+            ]
+        }
@@ -0,0 +1,272 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import cast, Float
+from app.core.cache import risk_metrics_cache
+from app.core.config import settings
+from app.models.instrument import Instrument, InstrumentPrice
+from app.models.investment import Investment
+from app.models.price_history import PriceHistory
+from app.services.investment_service import InvestmentService
+from app.services.price_history_service import PriceHistoryService
+from typing import Optional, List
+from datetime import date, timedelta
+from numpy.lib.stride_tricks import sliding_window_view
+import numpy as np
+import uuid
+
+DAYS_PER_YEAR = 365  # the price grid is calendar-daily; a return spanning g days counts as g days
+MIN_OBSERVATIONS = 20  # fewer returns than this give no metrics
+
+
+class RiskService:
+    """
+    Volatility, max drawdown and Sharpe ratio per holding and for the portfolio,
+    from a date x holding price matrix built out of the stored price series.
+    Returns are taken only between recorded prices: days carried forward
+    without a price are not zero returns, and a series starts at its first
+    recorded price, not at the purchase price.
+    """
+
+    @staticmethod
+    def get_risk_metrics(db: Session, user_id: uuid.UUID, days: int = 365, window: int = 30) -> dict:
+        """Risk report as of today (cached per user and as_of date until prices or holdings change)"""
+        as_of = date.today()
+        key = (user_id, as_of, days, window)
+        version = InvestmentService.get_portfolio_version(db, user_id)
+        report = risk_metrics_cache.get(key, version)
+        if report is None:
+            report = RiskService._build_risk_metrics(db, user_id, as_of, days, window)
+            risk_metrics_cache.set(key, version, report)
+        return report
+
+    @staticmethod
+    def price_matrix(
+        start: date,
+        days: int,
+        columns: int,
+        observations: List[tuple]
+    ) -> tuple:
+        """
+        (days + 1) x columns matrices of prices from (date, column, price)
+        observations sorted by date, forward-filled, and of the day (relative
+        to start) each price was observed on. Observations before start are
+        carried in on the first row (with their negative day); cells before a
+        column's first observation are NaN in both.
+        """
+        matrix = np.full((days + 1, columns), np.nan)
+        observed = np.full((days + 1, columns), np.nan)
+        if not observations:
+            return matrix, observed
+
+        on, column, price = zip(*observations)
+        day = np.fromiter((d.toordinal() for d in on), dtype=np.int64, count=len(on)) - start.toordinal()
+        row = np.clip(day, 0, days)
+        column = np.asarray(column, dtype=np.int64)
+        price = np.asarray(price, dtype=np.float64)
+
+        # Last observation wins for each cell (input is in date order)
+        cell = row * columns + column
+        _, last = np.unique(cell[::-1], return_index=True)
+        keep = len(cell) - 1 - last
+        matrix[row[keep], column[keep]] = price[keep]
+        observed[row[keep], column[keep]] = day[keep]
+
+        # Forward fill: each cell takes the row of the latest observation at or above it
+        filled_row = np.where(np.isnan(matrix), 0, np.arange(days + 1)[:, None])
+        np.maximum.accumulate(filled_row, axis=0, out=filled_row)
+        return matrix[filled_row, np.arange(columns)], observed[filled_row, np.arange(columns)]
+
+    @staticmethod
+    def return_stats(
+        returns: np.ndarray,
+        gaps: np.ndarray,
+        risk_free_rate: float,
+        min_observations: int = MIN_OBSERVATIONS
+    ) -> tuple:
+        """
+        Annualized volatility, annualized mean return and Sharpe ratio per
+        column of a returns matrix, ignoring NaN. gaps holds the days each
+        return spans: the daily mean is the total return over the total days,
+        and a g-day return contributes variance as g daily ones would (with
+        daily prices this is the plain sample mean and variance). NaN with
+        fewer than min_observations returns.
+        """
+        valid = np.isfinite(returns)
+        n = valid.sum(axis=0)
+        gaps = np.where(valid, gaps, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(valid, returns, 0).sum(axis=0) / np.where(valid, gaps, 0).sum(axis=0)
+            variance = np.where(valid, (returns - mean * gaps) ** 2 / gaps, 0).sum(axis=0) / (n - 1)
+            volatility = np.sqrt(variance * DAYS_PER_YEAR)
+            annual_return = mean * DAYS_PER_YEAR
+            sharpe = (annual_return - risk_free_rate) / volatility
+        enough = n >= max(min_observations, 2)
+        volatility = np.where(enough, volatility, np.nan)
+        annual_return = np.where(enough, annual_return, np.nan)
+        sharpe = np.where(enough & (volatility > 0), sharpe, np.nan)
+        return volatility, annual_return, sharpe
+
+    @staticmethod
+    def max_drawdown(prices: np.ndarray) -> np.ndarray:
+        """Largest peak-to-trough fall per column (<= 0), ignoring NaN"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            peak = np.fmax.accumulate(prices, axis=0)
+            drawdown = prices / peak - 1
+        return np.fmin.reduce(np.where(np.isfinite(drawdown), drawdown, np.nan), axis=0)
+
+    @staticmethod
+    def _build_risk_metrics(db: Session, user_id: uuid.UUID, as_of: date, days: int, window: int) -> dict:
+        holdings = db.query(
+            Investment.id,
+            Investment.asset_name,
+            Investment.asset_type,
+            cast(Investment.quantity, Float),
+            cast(Investment.purchase_price, Float),
+            Investment.purchase_date,
+            Investment.instrument_id
+        ).filter(
+            Investment.user_id == user_id,
+            Investment.purchase_date <= as_of
+        ).order_by(Investment.purchase_date).all()
+
+        if not holdings:
+            return {
+                "message": "No investments found"
+            }
+
+        start = as_of - timedelta(days=days)
+        column_of = {holding.id: j for j, holding in enumerate(holdings)}
+        linked = {}
+        for j, holding in enumerate(holdings):
+            if holding.instrument_id is not None:
+                linked.setdefault(holding.instrument_id, []).append(j)
+
+        # Recorded prices only (the holding's own, or its instrument's): those from
+        # start on, and each holding's and instrument's last one before start,
+        # which price_matrix carries in on the first row
+        observations = [
+            (price_date, column_of[investment_id], float(price))
+            for investment_id, (price_date, price) in PriceHistoryService.last_prices_before(
+                db, Investment.id, PriceHistory, "investment_id", Investment.user_id == user_id, start
+            ).items()
+            if investment_id in column_of
+        ]
+        observations.extend(
+            (row.price_date, column_of[row.investment_id], row.price)
+            for row in db.query(
+                PriceHistory.price_date,
+                PriceHistory.investment_id,
+                cast(PriceHistory.price, Float).label("price")
+            ).filter(
+                PriceHistory.user_id == user_id,
+                PriceHistory.price_date >= start,
+                PriceHistory.price_date <= as_of
+            )
+            if row.investment_id in column_of
+        )
+        if linked:
+            for instrument_id, (price_date, price) in PriceHistoryService.last_prices_before(
+                db, Instrument.id, InstrumentPrice, "instrument_id", Instrument.id.in_(list(linked)), start
+            ).items():
+                observations.extend((price_date, j, float(price)) for j in linked[instrument_id])
+            for row in db.query(
+                InstrumentPrice.price_date,
+                InstrumentPrice.instrument_id,
+                cast(InstrumentPrice.price, Float).label("price")
+            ).filter(
+                InstrumentPrice.instrument_id.in_(list(linked)),
+                InstrumentPrice.price_date >= start,
+                InstrumentPrice.price_date <= as_of
+            ):
+                observations.extend((row.price_date, j, row.price) for j in linked[row.instrument_id])
+
+        observations.sort(key=lambda o: o[0])
+        prices, observed = RiskService.price_matrix(start, days, len(holdings), observations)
+
+        # Not held before the purchase date
+        rows = np.arange(days + 1)[:, None]
+        purchase_row = np.array([holding.purchase_date.toordinal() for holding in holdings]) - start.toordinal()
+        not_held = rows < purchase_row[None, :]
+        prices[not_held] = np.nan
+        observed[not_held] = np.nan
+
+        # A holding's return on each day it has a new price, since its previous
+        # price (carried forward, so the return spans the days in between)
+        risk_free_rate = settings.RISK_FREE_RATE_PERCENT / 100
+        repriced = (observed[1:] == rows[1:]) & np.isfinite(prices[:-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.where(repriced, prices[1:] / prices[:-1] - 1, np.nan)
+        returns[~np.isfinite(returns)] = np.nan
+        gaps = rows[1:] - observed[:-1]
+        volatility, _, sharpe = RiskService.return_stats(returns, gaps, risk_free_rate)
+        counts = np.isfinite(returns).sum(axis=0)
+        drawdown = np.where(counts >= MIN_OBSERVATIONS, RiskService.max_drawdown(prices), np.nan)
+
+        # Portfolio: P&L between consecutive days on which any holding has a new
+        # price, over the lots held on both, so purchases change the value without
+        # counting as a return and days without prices add nothing
+        priced_days = np.flatnonzero((observed == rows).any(axis=1))
+        quantity = np.array([holding[3] for holding in holdings])
+        before, after = prices[priced_days[:-1]], prices[priced_days[1:]]
+        held = np.isfinite(before) & np.isfinite(after)
+        pnl = np.where(held, quantity * (after - before), 0).sum(axis=1)
+        base = np.where(held, quantity * before, 0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            portfolio_returns = np.where(base > 0, pnl / base, np.nan)
+        real = np.isfinite(portfolio_returns)
+        portfolio_returns = portfolio_returns[real]
+        portfolio_gaps = np.diff(priced_days)[real]
+        return_dates = [start + timedelta(days=int(day)) for day in priced_days[1:][real]]
+
+        p_volatility, _, p_sharpe = RiskService.return_stats(
+            portfolio_returns[:, None], portfolio_gaps[:, None], risk_free_rate
+        )
+        growth = np.concatenate([[1.0], np.cumprod(1 + portfolio_returns)])
+        p_drawdown = RiskService.max_drawdown(growth[:, None])
+        if len(portfolio_returns) < MIN_OBSERVATIONS:
+            p_drawdown[:] = np.nan
+
+        rolling = []
+        if len(portfolio_returns) >= max(window, MIN_OBSERVATIONS):
+            rolling_volatility, _, _ = RiskService.return_stats(
+                sliding_window_view(portfolio_returns, window).T,
+                sliding_window_view(portfolio_gaps, window).T,
+                risk_free_rate,
+                min_observations=window
+            )
+            rolling = [
+                {"date": on.isoformat(), "volatility_percentage": RiskService._percentage(value)}
+                for on, value in zip(return_dates[window - 1:], rolling_volatility)
+            ]
+
+        return {
+            "as_of": as_of.isoformat(),
+            "start_date": start.isoformat(),
+            "risk_free_rate_percentage": settings.RISK_FREE_RATE_PERCENT,
+            "portfolio": {
+                "volatility_percentage": RiskService._percentage(p_volatility[0]),
+                "max_drawdown_percentage": RiskService._percentage(p_drawdown[0]),
+                "sharpe_ratio": RiskService._number(p_sharpe[0]),
+                "observations": len(portfolio_returns)
+            },
+            "rolling_volatility": rolling,
+            "holdings": [
+                {
+                    "id": str(holding.id),
+                    "asset_name": holding.asset_name,
+                    "asset_type": holding.asset_type,
+                    "volatility_percentage": RiskService._percentage(volatility[j]),
+                    "max_drawdown_percentage": RiskService._percentage(drawdown[j]),
+                    "sharpe_ratio": RiskService._number(sharpe[j]),
+                    "observations": int(counts[j])
+                }
+                for j, holding in enumerate(holdings)
+            ]
+        }
+
+    @staticmethod
+    def _number(value) -> Optional[float]:
+        return None if not np.isfinite(value) else float(value)
+
+    @staticmethod
+    def _percentage(value) -> Optional[float]:
+        return None if not np.isfinite(value) else float(value * 100)
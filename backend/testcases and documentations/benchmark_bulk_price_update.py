@@ -0,0 +1,104 @@
+# Benchmark: bulk_update_prices, per-row loop vs single-statement bulk path
+# Uses the database from .env (DATABASE_URL); creates and removes its own user.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_bulk_price_update.py"
+
+import random
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models.user import User
+from app.schemas.investment import InvestmentCreate
+from app.services.investment_service import InvestmentService
+
+SIZES = [50, 500]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def loop_update(db, user_id, updates):
+    """The previous implementation: one update_price call per row"""
+    updated = 0
+    for update in updates:
+        if InvestmentService.update_price(db, uuid.UUID(update["id"]), user_id, Decimal(str(update["current_price"]))):
+            updated += 1
+    return updated
+
+
+def bulk_update(db, user_id, updates):
+    return InvestmentService.bulk_update_prices(db, user_id, updates)["updated_count"]
+
+
+def measure(fn, db, user_id, updates):
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        started = time.perf_counter()
+        updated = fn(db, user_id, updates)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    assert updated == len(updates)
+    return elapsed, counter.count
+
+
+def main():
+    db = SessionLocal()
+    user = User(
+        email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local",
+        full_name="Benchmark User",
+        hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+
+    try:
+        print("💹 bulk_update_prices benchmark\n")
+        print(f"{'rows':>6} {'loop (s)':>10} {'loop stmts':>11} {'bulk (s)':>10} {'bulk stmts':>11} {'speedup':>8}")
+
+        random.seed(7)
+        for n in SIZES:
+            ids = []
+            for i in range(n):
+                investment = InvestmentService.create_investment(db, InvestmentCreate(
+                    asset_type=random.choice(["Stock", "MutualFund", "Crypto"]),
+                    asset_name=f"Bench {i}",
+                    quantity=Decimal(random.randint(1, 100)),
+                    purchase_price=Decimal("100.00"),
+                    current_price=Decimal("100.00"),
+                    purchase_date=date(2024, 1, 1),
+                    platform=random.choice(["Zerodha", "Groww"])
+                ), user.id)
+                ids.append(str(investment.id))
+
+            def payload():
+                return [{"id": i, "current_price": random.randint(50, 200)} for i in ids]
+
+            loop_seconds, loop_statements = measure(loop_update, db, user.id, payload())
+            bulk_seconds, bulk_statements = measure(bulk_update, db, user.id, payload())
+
+            print(
+                f"{n:>6} {loop_seconds:10.3f} {loop_statements:11} "
+                f"{bulk_seconds:10.3f} {bulk_statements:11} {loop_seconds / bulk_seconds:7.1f}x"
+            )
+
+        print("\n✅ Benchmark complete")
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
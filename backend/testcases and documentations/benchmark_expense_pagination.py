@@ -0,0 +1,104 @@
+# Benchmark: GET /api/expenses/ deep pages, offset (skip) vs keyset (cursor)
+# Uses the database from .env (DATABASE_URL); creates and removes its own user
+# with ROWS expenses (default 1,000,000; pass a smaller count as the first argument).
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_expense_pagination.py" [ROWS]
+
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from app.core.pagination import encode_cursor
+from app.database import SessionLocal
+from app.models.expense import Expense
+from app.models.user import User
+from app.services.expense_service import ExpenseService
+
+PAGE_SIZE = 100
+DEPTHS = [0, 0.01, 0.1, 0.5, 0.99]  # fraction of the listing already paged through
+INSERT_BATCH = 50_000
+REPEATS = 5
+
+
+def seed(db, user_id, rows):
+    random.seed(3)
+    start = date.today() - timedelta(days=3650)
+    categories = ["Food", "Transport", "Entertainment", "Shopping", "Bills", "Healthcare", "Other"]
+    for offset in range(0, rows, INSERT_BATCH):
+        db.execute(insert(Expense), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "title": f"Expense {i}",
+                "amount": random.randint(10, 5000),
+                "category": random.choice(categories),
+                "date": start + timedelta(days=random.randrange(3650))
+            }
+            for i in range(offset, min(offset + INSERT_BATCH, rows))
+        ])
+        db.commit()
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        page = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), page
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    db = SessionLocal()
+    user = User(
+        email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local",
+        full_name="Benchmark User",
+        hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+
+    try:
+        print(f"📄 Expense pagination benchmark ({rows:,} expenses, pages of {PAGE_SIZE})\n")
+        seed(db, user.id, rows)
+        db.execute(Expense.__table__.select().limit(0))  # warm the connection
+
+        print(f"{'skip':>10} {'offset (ms)':>12} {'cursor (ms)':>12} {'speedup':>8}")
+        for depth in DEPTHS:
+            skip = int(rows * depth)
+            # The cursor a client would hold after paging to this depth
+            cursor = None
+            if skip:
+                previous = ExpenseService.get_expenses(db, user.id, skip=skip - 1, limit=1)[0]
+                cursor = encode_cursor(previous.date, previous.id)
+
+            offset_seconds, by_offset = best_of(
+                lambda: ExpenseService.get_expenses(db, user.id, skip=skip, limit=PAGE_SIZE)
+            )
+            cursor_seconds, by_cursor = best_of(
+                lambda: ExpenseService.get_expenses(db, user.id, limit=PAGE_SIZE, cursor=cursor)
+            )
+            assert [e.id for e in by_offset] == [e.id for e in by_cursor]
+            db.expunge_all()
+
+            print(
+                f"{skip:>10,} {offset_seconds * 1000:12.1f} {cursor_seconds * 1000:12.1f} "
+                f"{offset_seconds / cursor_seconds:7.1f}x"
+            )
+
+        print("\n✅ Same pages; cursor latency stays flat with depth while offset grows linearly")
+    finally:
+        db.rollback()
+        db.query(Expense).filter(Expense.user_id == user.id).delete(synchronize_session=False)
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
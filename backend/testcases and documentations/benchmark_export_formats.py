@@ -0,0 +1,133 @@
+# Benchmark: expense export as CSV vs Parquet - file size, export time, peak memory and
+# the time an analyst's notebook takes to load the file into a table
+# Uses the database from .env (DATABASE_URL); creates and removes its own user. Pass
+# other sizes as arguments (default 100,000 1,000,000). Files are loaded with pyarrow
+# (pyarrow.csv is a multithreaded reader) and, if it is installed, pandas.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_export_formats.py" [ROWS ...]
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import insert
+
+from app.database import SessionLocal
+from app.models.expense import Expense
+from app.models.user import User
+from app.services.export_service import ExportService
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+INSERT_BATCH = 50_000
+LOAD_REPEATS = 3
+
+
+def seed(db, user_id, rows):
+    random.seed(7)
+    start = date.today() - timedelta(days=3650)
+    categories = ["Food", "Transport", "Entertainment", "Shopping", "Bills", "Healthcare", "Other"]
+    methods = ["UPI", "Card", "Cash", None]
+    for offset in range(0, rows, INSERT_BATCH):
+        db.execute(insert(Expense), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "title": f"Expense {i}",
+                "amount": random.randint(1000, 500000) / 100,
+                "category": random.choice(categories),
+                "payment_method": random.choice(methods),
+                "date": start + timedelta(days=random.randrange(3650)),
+                "notes": "Paid in cash" if i % 3 == 0 else None
+            }
+            for i in range(offset, min(offset + INSERT_BATCH, rows))
+        ])
+        db.commit()
+
+
+def write(chunks, path):
+    with open(path, "wb") as file:
+        for chunk in chunks:
+            file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+
+
+def export(chunks, user_id, path) -> tuple:
+    """Write an export to path, returning its time, then its peak Python memory from a second (traced) run"""
+    started = time.perf_counter()
+    write(chunks(user_id), path)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    write(chunks(user_id), path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def load_seconds(read, path) -> float:
+    if read is None:
+        return float("nan")
+    timings = []
+    for _ in range(LOAD_REPEATS):
+        started = time.perf_counter()
+        read(path)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    db = SessionLocal()
+    user = User(
+        email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local",
+        full_name="Benchmark User",
+        hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    directory = tempfile.TemporaryDirectory()
+    try:
+        print("📦 Expense export formats\n")
+        print(
+            f"{'rows':>10} {'format':>8} {'size (MB)':>10} {'export (s)':>11} "
+            f"{'peak (MB)':>10} {'pyarrow load (s)':>17} {'pandas load (s)':>16}"
+        )
+        seeded = 0
+        for rows in sizes:
+            seed(db, user_id, rows - seeded)
+            seeded = rows
+            for name, chunks, read, pandas_read in (
+                ("csv", ExportService.export_expenses_csv, pa_csv.read_csv, pd and pd.read_csv),
+                ("parquet", ExportService.export_expenses_parquet, pq.read_table, pd and pd.read_parquet),
+            ):
+                path = os.path.join(directory.name, f"expenses.{name}")
+                seconds, peak = export(chunks, user_id, path)
+                print(
+                    f"{rows:>10,} {name:>8} {os.path.getsize(path) / 2**20:10.1f} {seconds:11.2f} "
+                    f"{peak / 2**20:10.1f} {load_seconds(read, path):17.3f} "
+                    f"{load_seconds(pandas_read, path):16.3f}"
+                )
+
+        print("\n✅ Parquet is typed (decimal amounts, dates), smaller, and loads without parsing text")
+    finally:
+        directory.cleanup()
+        db.rollback()
+        db.query(Expense).filter(Expense.user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
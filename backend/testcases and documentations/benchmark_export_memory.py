@@ -0,0 +1,219 @@
+# Benchmark: expense CSV and complete JSON exports, previous (load all, render at once)
+# vs streaming chunks
+# Uses the database from .env (DATABASE_URL); creates and removes its own user with
+# INVESTMENTS holdings. Peak Python memory (tracemalloc), time and statements run are
+# measured per export size; pass other sizes as arguments (default 10,000 100,000 1,000,000).
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_export_memory.py" [ROWS ...]
+
+import asyncio
+import csv
+import io
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, insert
+
+from app.core.cache import portfolio_summary_cache
+from app.database import SessionLocal, engine
+from app.models.expense import Expense
+from app.models.investment import Investment
+from app.models.user import User
+from app.schemas.investment import InvestmentCreate
+from app.services.dashboard_service import DashboardService
+from app.services.expense_service import ExpenseService
+from app.services.export_service import ExportService
+from app.services.investment_service import InvestmentService
+
+INSERT_BATCH = 50_000
+INVESTMENTS = 1_000
+
+
+def previous_export(user_id) -> int:
+    """The previous implementation: .all(), one StringIO, and the route's second StringIO copy"""
+    db = SessionLocal()
+    try:
+        expenses = db.query(Expense).filter(Expense.user_id == user_id).order_by(Expense.date.desc()).all()
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["Date", "Title", "Amount", "Category", "Payment Method", "Notes"])
+        for expense in expenses:
+            writer.writerow([
+                expense.date.strftime("%Y-%m-%d"),
+                expense.title,
+                float(expense.amount),
+                expense.category,
+                expense.payment_method or "",
+                expense.notes or ""
+            ])
+        body = io.StringIO(output.getvalue())
+        return sum(len(chunk) for chunk in iter(lambda: body.read(4096), ""))
+    finally:
+        db.close()
+
+
+def streaming_export(user_id) -> int:
+    return sum(len(chunk) for chunk in ExportService.export_expenses_csv(user_id))
+
+
+def previous_complete(user_id) -> int:
+    """The previous complete export: both tables loaded, then every summary and the dashboard re-queried"""
+    db = SessionLocal()
+    try:
+        expenses = db.query(Expense).filter(Expense.user_id == user_id).all()
+        investments = db.query(Investment).filter(Investment.user_id == user_id).all()
+        expense_summary = {
+            "total_amount": float(ExpenseService.get_total_amount(db, user_id)),
+            "total_count": ExpenseService.get_expense_count(db, user_id),
+            "by_category": ExpenseService.get_category_summary(db, user_id)
+        }
+        portfolio_summary = InvestmentService.calculate_portfolio_summary(db, user_id)
+        dashboard_data = asyncio.run(DashboardService.get_complete_dashboard_async(user_id))
+        data = {
+            "expenses": {
+                "summary": expense_summary,
+                "data": [
+                    {
+                        "id": str(exp.id), "date": exp.date.isoformat(), "title": exp.title,
+                        "amount": float(exp.amount), "category": exp.category,
+                        "payment_method": exp.payment_method, "notes": exp.notes
+                    }
+                    for exp in expenses
+                ]
+            },
+            "investments": {
+                "summary": {"total_invested": float(portfolio_summary.total_invested)},
+                "data": [
+                    {
+                        "id": str(inv.id), "asset_name": inv.asset_name, "quantity": float(inv.quantity),
+                        "current_value": float(inv.current_value), "percentage_gain": inv.percentage_gain
+                    }
+                    for inv in investments
+                ]
+            },
+            "dashboard": dashboard_data
+        }
+        return len(JSONResponse(jsonable_encoder(data)).body)
+    finally:
+        db.close()
+
+
+def streaming_complete(user_id) -> int:
+    return sum(len(chunk.encode()) for chunk in ExportService.export_complete_portfolio(user_id))
+
+
+def seed(db, user_id, rows):
+    random.seed(6)
+    start = date.today() - timedelta(days=3650)
+    categories = ["Food", "Transport", "Entertainment", "Shopping", "Bills", "Healthcare", "Other"]
+    for offset in range(0, rows, INSERT_BATCH):
+        db.execute(insert(Expense), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "title": f"Expense {i}",
+                "amount": random.randint(10, 5000),
+                "category": random.choice(categories),
+                "date": start + timedelta(days=random.randrange(3650)),
+                "notes": "Paid in cash" if i % 3 == 0 else None
+            }
+            for i in range(offset, min(offset + INSERT_BATCH, rows))
+        ])
+        db.commit()
+
+
+def seed_investments(db, user_id):
+    random.seed(8)
+    start = date.today() - timedelta(days=1500)
+    for i in range(INVESTMENTS):
+        price = random.randint(100, 5000)
+        InvestmentService.create_investment(db, InvestmentCreate(
+            asset_type=random.choice(["Stock", "MutualFund", "FD", "Gold", "Crypto"]),
+            asset_name=f"Bench {i}",
+            quantity=random.randint(1, 100),
+            purchase_price=price,
+            current_price=price + random.randint(-50, 500),
+            purchase_date=start + timedelta(days=random.randrange(1500))
+        ), user_id)
+
+
+def measure(export, user_id):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    portfolio_summary_cache.clear()
+    event.listen(engine, "before_cursor_execute", count)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        size = export(user_id)
+    finally:
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        event.remove(engine, "before_cursor_execute", count)
+    return size, seconds, peak, len(statements)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    db = SessionLocal()
+    user = User(
+        email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local",
+        full_name="Benchmark User",
+        hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    try:
+        seed_investments(db, user_id)
+        results = {"csv": [], "complete": []}
+        seeded = 0
+        for rows in sizes:
+            seed(db, user_id, rows - seeded)
+            seeded = rows
+            for name, previous, streaming in (
+                ("csv", previous_export, streaming_export),
+                ("complete", previous_complete, streaming_complete)
+            ):
+                size, previous_seconds, previous_peak, _ = measure(previous, user_id)
+                streamed, streaming_seconds, streaming_peak, _ = measure(streaming, user_id)
+                if name == "csv":
+                    assert streamed == size
+                results[name].append((rows, streamed, previous_peak, streaming_peak, previous_seconds, streaming_seconds))
+
+        for name, title in (("csv", "Expense CSV export"), ("complete", f"Complete JSON export (+{INVESTMENTS:,} holdings)")):
+            print(f"📤 {title} (peak Python memory while exporting)\n")
+            print(f"{'rows':>10} {'size (MB)':>10} {'previous (MB)':>14} {'streaming (MB)':>15} {'previous (s)':>13} {'streaming (s)':>14}")
+            for rows, size, previous_peak, streaming_peak, previous_seconds, streaming_seconds in results[name]:
+                print(
+                    f"{rows:>10,} {size / 2**20:10.1f} {previous_peak / 2**20:14.1f} {streaming_peak / 2**20:15.1f} "
+                    f"{previous_seconds:13.2f} {streaming_seconds:14.2f}"
+                )
+            print()
+
+        *_, previous_statements = measure(previous_complete, user_id)
+        *_, streaming_statements = measure(streaming_complete, user_id)
+        print(f"Complete export statements: previous {previous_statements}, streaming {streaming_statements}\n")
+        print("✅ Streaming memory stays flat as the export grows")
+    finally:
+        db.rollback()
+        db.query(Expense).filter(Expense.user_id == user_id).delete(synchronize_session=False)
+        db.query(Investment).filter(Investment.user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Benchmark: top/worst performers, previous ranking of every holding vs index candidates
+# (manually priced holdings from their gain index, linked lots per instrument by
+# purchase_price), plus the min_gain list filter, which still reads every holding
+# Uses the database from .env (DATABASE_URL, PostgreSQL); creates and removes its own
+# users and instruments. The measured user shares the table with OTHER_USERS users of
+# the same size. Pass another holding count as the first argument (default 20,000).
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/benchmark_investment_ranking.py" [HOLDINGS]
+
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, text
+
+from app.database import SessionLocal
+from app.models.instrument import Instrument
+from app.models.investment import Investment
+from app.models.user import User
+from app.services.investment_service import InvestmentService
+
+INSTRUMENTS = 300
+OTHER_USERS = 4
+MANUAL_SHARE = 0.25
+RUNS = 30
+LIMIT = 5
+
+
+def previous_ranked(db, user_id, limit, best):
+    """The previous implementation: order every holding by percentage_gain"""
+    order = Investment.percentage_gain.desc() if best else Investment.percentage_gain.asc()
+    return InvestmentService._holdings_query(db, user_id).order_by(order).limit(limit).all()
+
+
+def seed(db, user_ids, holdings):
+    random.seed(9)
+    prefix = uuid.uuid4().hex[:6].upper()
+    instruments = [
+        {"id": uuid.uuid4(), "symbol": f"B{prefix}{i}", "asset_type": "Stock", "last_price": Decimal(random.randint(50, 5000))}
+        for i in range(INSTRUMENTS)
+    ]
+    db.execute(insert(Instrument), instruments)
+    start = date.today() - timedelta(days=1500)
+    for user_id in user_ids:
+        rows = []
+        for i in range(holdings):
+            instrument = None if random.random() < MANUAL_SHARE else random.choice(instruments)
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "asset_type": "FD" if instrument is None else "Stock",
+                "asset_name": f"Holding {i}",
+                "symbol": None if instrument is None else instrument["symbol"],
+                "instrument_id": None if instrument is None else instrument["id"],
+                "quantity": random.randint(1, 100),
+                "purchase_price": Decimal(random.randint(5000, 500000)) / 100,
+                "current_price": Decimal(random.randint(5000, 500000)) / 100,
+                "purchase_date": start + timedelta(days=random.randrange(1500))
+            })
+        db.execute(insert(Investment), rows)
+        db.commit()
+    # What autovacuum would have done by now (index-only scans need the visibility map)
+    with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE investments"))
+        connection.execute(text("VACUUM ANALYZE instruments"))
+    return [instrument["id"] for instrument in instruments]
+
+
+def median_ms(fn) -> float:
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    holdings = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    db = SessionLocal()
+    users = [
+        User(email=f"bench-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Benchmark User", hashed_password="x")
+        for _ in range(1 + OTHER_USERS)
+    ]
+    db.add_all(users)
+    db.commit()
+    user_ids = [user.id for user in users]
+    user_id = user_ids[0]
+    instrument_ids = []
+
+    try:
+        instrument_ids = seed(db, user_ids, holdings)
+        print(
+            f"🏆 Performer ranking ({holdings:,} holdings, {MANUAL_SHARE:.0%} manually priced, "
+            f"{INSTRUMENTS} instruments, top {LIMIT})\n"
+        )
+
+        for best in (True, False):
+            previous = [inv.percentage_gain for inv in previous_ranked(db, user_id, LIMIT, best)]
+            current = [inv.percentage_gain for inv in InvestmentService._ranked(db, user_id, LIMIT, best)]
+            assert previous == current, (best, previous, current)
+        print("✅ Same gains as ranking every holding (top and worst)\n")
+
+        print(f"{'query':>22} {'previous (ms)':>14} {'indexed (ms)':>13}")
+        for name, best in (("top performers", True), ("worst performers", False)):
+            print(
+                f"{name:>22} {median_ms(lambda: previous_ranked(db, user_id, LIMIT, best)):14.2f} "
+                f"{median_ms(lambda: InvestmentService._ranked(db, user_id, LIMIT, best)):13.2f}"
+            )
+        # Gain range filters compare each holding's joined price: no index serves them
+        print(
+            f"{'min_gain list':>22} {median_ms(lambda: InvestmentService.get_investments(db, user_id, min_gain=50)):14.2f} {'-':>13}"
+        )
+        print(
+            f"{'min_gain count':>22} {median_ms(lambda: InvestmentService.get_investment_count(db, user_id, min_gain=50)):14.2f} {'-':>13}"
+        )
+
+        query = InvestmentService._holdings_query(db, user_id).filter(
+            Investment.id.in_(InvestmentService._ranking_candidates(user_id, LIMIT, True))
+        ).order_by(Investment.percentage_gain.desc()).limit(LIMIT)
+        compiled = query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+        print("\nTop performers plan:")
+        for (line,) in db.execute(text(f"EXPLAIN (ANALYZE, COSTS OFF) {compiled}")):
+            print(f"  {line}")
+    finally:
+        db.rollback()
+        db.query(Investment).filter(Investment.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(Instrument).filter(Instrument.id.in_(instrument_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Load test: mixed read/write traffic against a running API server
+# Each virtual client loops over a weighted mix of endpoints for DURATION seconds;
+# throughput and per-endpoint latency percentiles show how well one worker
+# overlaps requests (a query blocking the event loop stalls all of them).
+#
+# Start the server first (one worker, so the numbers are per event loop):
+#   uvicorn app.main:app --port 8000
+# Run from backend/:
+#   PYTHONPATH=. python "testcases and documentations/load_test.py" --url http://127.0.0.1:8000 --clients 50 --duration 20
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+EMAIL = "loadtest@example.com"
+PASSWORD = "LoadTest123!"
+
+# (weight, name, method, path)
+MIX = [
+    (30, "me", "GET", "/api/auth/me"),
+    (20, "expenses", "GET", "/api/expenses/?limit=20"),
+    (15, "investments", "GET", "/api/investments/?limit=20&include_summary=false"),
+    (10, "dashboard", "GET", "/api/dashboard/"),
+    (10, "statistics", "GET", "/api/investments/analytics/statistics"),
+    (10, "by-month", "GET", "/api/expenses/summary/by-month"),
+    (5, "add-expense", "POST", "/api/expenses/"),
+]
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    """Log in as the load-test user, creating and seeding it on first use"""
+    response = await client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD})
+    if response.status_code == 401:
+        (await client.post(
+            "/api/auth/register", json={"email": EMAIL, "full_name": "Load Test", "password": PASSWORD}
+        )).raise_for_status()
+        response = await client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        await seed(client, headers)
+        return headers
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(client: httpx.AsyncClient, headers: dict):
+    random.seed(9)
+    today = date.today()
+    for i in range(500):
+        await client.post("/api/expenses/", headers=headers, json=expense_body(today - timedelta(days=random.randrange(730))))
+    for i in range(100):
+        price = random.randint(100, 5000)
+        await client.post("/api/investments/", headers=headers, json={
+            "asset_type": random.choice(["Stock", "MutualFund", "FD", "Gold", "Crypto"]),
+            "asset_name": f"Load {i}",
+            "quantity": random.randint(1, 100),
+            "purchase_price": price,
+            "current_price": price + random.randint(-100, 300),
+            "purchase_date": (today - timedelta(days=random.randrange(1, 730))).isoformat()
+        })
+
+
+def expense_body(on: date) -> dict:
+    return {
+        "title": "Load test expense",
+        "amount": random.randint(10, 5000),
+        "category": random.choice(["Food", "Transport", "Bills", "Shopping", "Other"]),
+        "date": on.isoformat()
+    }
+
+
+async def virtual_client(client, headers, deadline, latencies, errors):
+    weights = [weight for weight, *_ in MIX]
+    while time.perf_counter() < deadline:
+        _, name, method, path = random.choices(MIX, weights)[0]
+        started = time.perf_counter()
+        try:
+            if method == "POST":
+                response = await client.post(path, headers=headers, json=expense_body(date.today()))
+            else:
+                response = await client.get(path, headers=headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        latencies[name].append(time.perf_counter() - started)
+        if not ok:
+            errors[name] += 1
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Mixed-traffic load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent virtual clients")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of load")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        headers = await login(client)
+
+        latencies = {name: [] for _, name, _, _ in MIX}
+        errors = {name: 0 for _, name, _, _ in MIX}
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            virtual_client(client, headers, deadline, latencies, errors)
+            for _ in range(args.clients)
+        ])
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"🚦 {args.clients} clients for {elapsed:.1f}s against {args.url}\n")
+    print(f"{'endpoint':>12} {'requests':>9} {'errors':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for _, name, _, _ in MIX:
+        values = latencies[name]
+        if not values:
+            continue
+        print(
+            f"{name:>12} {len(values):9} {errors[name]:7} {statistics.median(values) * 1000:9.1f} "
+            f"{percentile(values, 0.95) * 1000:9.1f} {percentile(values, 0.99) * 1000:9.1f}"
+        )
+    every = [value for values in latencies.values() for value in values]
+    print(
+        f"\n✅ {total / elapsed:,.0f} requests/s, overall p50 {statistics.median(every) * 1000:.1f} ms, "
+        f"p95 {percentile(every, 0.95) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+# Behaviour of the closed-month summary cache: repeated summaries are served from the
+# cache, and a backdated write (create, update or delete in a past month) or a rebuild
+# changes the very next summary. Each read uses a fresh session, as a request would.
+# Uses the database from .env (DATABASE_URL); creates and removes its own user.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/test_closed_months_cache.py"
+
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.core.cache import closed_months_cache
+from app.database import SessionLocal
+from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseMonthlyRollup
+from app.models.user import User
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate
+from app.services.expense_rollup_service import ExpenseRollupService
+from app.services.expense_service import ExpenseService
+
+
+def summary(user_id) -> tuple:
+    """(monthly summary as {month: total}, cache hits, cache misses) from a request-like session"""
+    hits, misses = closed_months_cache.hits, closed_months_cache.misses
+    db = SessionLocal()
+    try:
+        months = {
+            date(row["year"], row["month"], 1): row["total_amount"]
+            for row in ExpenseService.get_monthly_summary(db, user_id)
+        }
+    finally:
+        db.close()
+    return months, closed_months_cache.hits - hits, closed_months_cache.misses - misses
+
+
+def raw_months(db, user_id) -> dict:
+    months = {}
+    for expense_date, amount in db.query(Expense.date, Expense.amount).filter(Expense.user_id == user_id):
+        months[expense_date.replace(day=1)] = months.get(expense_date.replace(day=1), 0.0) + float(amount)
+    return months
+
+
+def expense(db, user_id, amount, on, category="Food"):
+    return ExpenseService.create_expense(
+        db, ExpenseCreate(title="Cache test", amount=Decimal(amount), category=category, date=on), user_id
+    )
+
+
+def test_closed_months_cache():
+    db = SessionLocal()
+    user = User(email=f"closed-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Cache Test", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    try:
+        print("🧪 Testing Closed-Month Summary Cache\n")
+        current_month = date.today().replace(day=1)
+        last_month = (current_month - timedelta(days=1)).replace(day=1)
+        older_month = (last_month - timedelta(days=1)).replace(day=1)
+
+        print("1. Repeated summaries come from the cache...")
+        backdated = expense(db, user_id, "100.00", last_month + timedelta(days=3))
+        expense(db, user_id, "40.00", older_month + timedelta(days=9), "Bills")
+        expense(db, user_id, "7.00", current_month)
+        months, _, misses = summary(user_id)
+        assert misses == 1 and months == raw_months(db, user_id), (months, misses)
+        months, hits, misses = summary(user_id)
+        assert (hits, misses) == (1, 0), (hits, misses)
+        print(f"✅ Second summary is a cache hit: {months}")
+
+        print("\n2. A current-month write keeps the cache and still shows...")
+        expense(db, user_id, "3.00", date.today())
+        months, hits, misses = summary(user_id)
+        assert (hits, misses) == (1, 0) and months == raw_months(db, user_id), (months, hits, misses)
+        print(f"✅ Current month {months[current_month]} read live, closed months still cached")
+
+        print("\n3. A backdated create changes the next summary...")
+        expense(db, user_id, "25.00", last_month + timedelta(days=10))
+        months, hits, misses = summary(user_id)
+        assert misses == 1 and months == raw_months(db, user_id) and months[last_month] == 125.0, months
+        print(f"✅ Last month {months[last_month]}")
+
+        print("\n4. A backdated update moving an expense out of a closed month...")
+        ExpenseService.update_expense(db, backdated.id, user_id, ExpenseUpdate(date=current_month + timedelta(days=1)))
+        months, hits, misses = summary(user_id)
+        assert misses == 1 and months == raw_months(db, user_id) and months[last_month] == 25.0, months
+        print(f"✅ Last month {months[last_month]}, current month {months[current_month]}")
+
+        print("\n5. ...and back into one, then a backdated delete...")
+        ExpenseService.update_expense(db, backdated.id, user_id, ExpenseUpdate(date=older_month, amount=Decimal("60.00")))
+        months, _, misses = summary(user_id)
+        assert misses == 1 and months == raw_months(db, user_id) and months[older_month] == 100.0, months
+        assert ExpenseService.delete_expense(db, backdated.id, user_id)
+        months, _, misses = summary(user_id)
+        assert misses == 1 and months == raw_months(db, user_id) and months[older_month] == 40.0, months
+        print(f"✅ {months}")
+
+        print("\n6. A rebuild invalidates the cache...")
+        summary(user_id)
+        db.query(ExpenseMonthlyRollup).filter(ExpenseMonthlyRollup.user_id == user_id).delete(synchronize_session=False)
+        db.commit()
+        months, hits, _ = summary(user_id)
+        assert hits == 1 and months[older_month] == 40.0  # still served from the cache
+        ExpenseRollupService.rebuild(db, [user_id])
+        months, _, misses = summary(user_id)
+        assert misses == 1 and months == raw_months(db, user_id), months
+        print("✅ Rebuilt history is read on the next summary")
+
+        print("\n✅ All closed-month cache tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.rollback()
+        db.query(Expense).filter(Expense.user_id == user_id).delete(synchronize_session=False)
+        db.query(ExpenseMonthlyRollup).filter(ExpenseMonthlyRollup.user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    test_closed_months_cache()
@@ -0,0 +1,171 @@
+# Behaviour of the monthly expense rollup: after creates, updates and deletes it must
+# match a raw scan of expenses (and a rebuild), and so must the summaries read from it
+# Uses the database from .env (DATABASE_URL); creates and removes its own user.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/test_expense_rollup.py"
+
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.database import SessionLocal
+from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseMonthlyRollup
+from app.models.user import User
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate
+from app.services.expense_rollup_service import ExpenseRollupService
+from app.services.expense_service import ExpenseService
+
+CATEGORIES = ["Food", "Transport", "Bills", "Shopping"]
+STEPS = 300
+
+
+def rollup_rows(db, user_id) -> dict:
+    rows = db.query(
+        ExpenseMonthlyRollup.year_month,
+        ExpenseMonthlyRollup.category,
+        ExpenseMonthlyRollup.total,
+        ExpenseMonthlyRollup.count
+    ).filter(ExpenseMonthlyRollup.user_id == user_id)
+    return {(year_month, category): (Decimal(total), count) for year_month, category, total, count in rows}
+
+
+def raw_scan(db, user_id, start_date=None, end_date=None) -> dict:
+    """{(year_month, category): (total, count)} summed in Python from every expense row"""
+    groups = {}
+    for expense_date, category, amount in db.query(Expense.date, Expense.category, Expense.amount).filter(
+        Expense.user_id == user_id
+    ):
+        if (start_date and expense_date < start_date) or (end_date and expense_date > end_date):
+            continue
+        total, count = groups.get((expense_date.replace(day=1), category), (Decimal("0"), 0))
+        groups[(expense_date.replace(day=1), category)] = (total + amount, count + 1)
+    return groups
+
+
+def random_day(today):
+    return today - timedelta(days=random.randrange(-20, 500))
+
+
+def check_summaries(db, user_id, today):
+    """Summaries over random ranges (whole and partial months, open ends) against the raw scan"""
+    for _ in range(25):
+        start_date, end_date = sorted([random_day(today), random_day(today)])
+        start_date = random.choice([None, start_date, start_date.replace(day=1)])
+        end_date = random.choice([None, end_date])
+        raw = raw_scan(db, user_id, start_date, end_date)
+
+        by_category = {}
+        for (_, category), (total, count) in raw.items():
+            previous_total, previous_count = by_category.get(category, (Decimal("0"), 0))
+            by_category[category] = (previous_total + total, previous_count + count)
+        summary = ExpenseService.get_category_summary(db, user_id, start_date, end_date)
+        assert {row["category"]: (row["total_amount"], row["expense_count"]) for row in summary} == {
+            category: (float(total), count) for category, (total, count) in by_category.items()
+        }, (start_date, end_date, summary, by_category)
+
+        totals = ExpenseService.get_period_totals(db, user_id, {"range": (start_date, end_date)})
+        assert totals["range"] == (
+            sum((total for total, _ in raw.values()), Decimal("0.00")),
+            sum(count for _, count in raw.values())
+        ), (start_date, end_date, totals, raw)
+
+    for year in {today.year - 1, today.year}:
+        raw = raw_scan(db, user_id, date(year, 1, 1), date(year, 12, 31))
+        by_month = {}
+        for (year_month, _), (total, count) in raw.items():
+            previous_total, previous_count = by_month.get(year_month, (Decimal("0"), 0))
+            by_month[year_month] = (previous_total + total, previous_count + count)
+        assert {
+            date(row["year"], row["month"], 1): (row["total_amount"], row["expense_count"])
+            for row in ExpenseService.get_monthly_summary(db, user_id, year)
+        } == {year_month: (float(total), count) for year_month, (total, count) in by_month.items()}
+
+
+def test_expense_rollup():
+    db = SessionLocal()
+    user = User(email=f"rollup-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Rollup Test", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    try:
+        print("🧪 Testing Expense Monthly Rollup\n")
+        random.seed(21)
+        today = date.today()
+        expense_ids = []
+
+        print(f"1. {STEPS} random creates, updates and deletes...")
+        operations = {"create": 0, "update": 0, "delete": 0}
+        for step in range(STEPS):
+            operation = random.choices(["create", "update", "delete"], [5, 3, 2])[0] if expense_ids else "create"
+            if operation == "create":
+                expense = ExpenseService.create_expense(db, ExpenseCreate(
+                    title=f"Expense {step}",
+                    amount=Decimal(random.randint(100, 99999)) / 100,
+                    category=random.choice(CATEGORIES),
+                    date=random_day(today)
+                ), user_id)
+                expense_ids.append(expense.id)
+            elif operation == "update":
+                # Any mix of amount, category and date (which may move it to another month)
+                changes = random.sample(["amount", "category", "date"], random.randint(1, 3))
+                ExpenseService.update_expense(db, random.choice(expense_ids), user_id, ExpenseUpdate(**{
+                    "amount": Decimal(random.randint(100, 99999)) / 100,
+                    "category": random.choice(CATEGORIES),
+                    "date": random_day(today)
+                } if len(changes) == 3 else {
+                    field: value for field, value in (
+                        ("amount", Decimal(random.randint(100, 99999)) / 100),
+                        ("category", random.choice(CATEGORIES)),
+                        ("date", random_day(today))
+                    ) if field in changes
+                }))
+            else:
+                expense_id = expense_ids.pop(random.randrange(len(expense_ids)))
+                assert ExpenseService.delete_expense(db, expense_id, user_id)
+            operations[operation] += 1
+
+            if step % 50 == 49:
+                assert rollup_rows(db, user_id) == raw_scan(db, user_id), f"rollup drifted at step {step}"
+        print(f"✅ {operations}: rollup equals the raw scan throughout ({len(rollup_rows(db, user_id))} groups)")
+
+        print("\n2. Summaries read from the rollup...")
+        check_summaries(db, user_id, today)
+        print("✅ Category, period and monthly summaries equal the raw scan over random ranges")
+
+        print("\n3. Rebuild...")
+        incremental = rollup_rows(db, user_id)
+        groups = ExpenseRollupService.rebuild(db, [user_id])
+        assert rollup_rows(db, user_id) == incremental and groups == len(incremental)
+        print(f"✅ Rebuild writes the same {groups} groups")
+
+        print("\n4. Rebuild repairs drift...")
+        db.query(ExpenseMonthlyRollup).filter(ExpenseMonthlyRollup.user_id == user_id).update(
+            {ExpenseMonthlyRollup.total: ExpenseMonthlyRollup.total + 1}, synchronize_session=False
+        )
+        db.commit()
+        assert rollup_rows(db, user_id) != incremental
+        ExpenseRollupService.rebuild(db, [user_id])
+        assert rollup_rows(db, user_id) == incremental
+        check_summaries(db, user_id, today)
+        print("✅ Drifted totals are restored, and summaries served after the rebuild are correct")
+
+        print("\n✅ All rollup tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.rollback()
+        db.query(Expense).filter(Expense.user_id == user_id).delete(synchronize_session=False)
+        db.query(ExpenseMonthlyRollup).filter(ExpenseMonthlyRollup.user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    test_expense_rollup()
@@ -0,0 +1,156 @@
+# Price ticks and portfolio aggregates: a tick writes only the instruments row (no
+# aggregate or users rows, whatever the number of holders), yet the next portfolio
+# summary values linked holdings at the new price and stays equal to a rebuild.
+# Each read uses a fresh session, as a request would.
+# Uses the database from .env (DATABASE_URL); creates and removes its own users and instrument.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/test_instrument_ticks.py"
+
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event, func
+
+from app.core.cache import portfolio_summary_cache
+from app.database import SessionLocal, engine
+from app.models.instrument import Instrument, InstrumentPrice
+from app.models.investment import Investment
+from app.models.portfolio_aggregate import PortfolioAggregate
+from app.models.user import User
+from app.schemas.investment import InvestmentCreate
+from app.services.dashboard_service import DashboardService
+from app.services.instrument_service import InstrumentService
+from app.services.investment_service import InvestmentService
+from app.services.portfolio_aggregate_service import PortfolioAggregateService
+
+HOLDERS = 3
+
+
+class StatementLog:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+
+def summary(user_id) -> tuple:
+    """(total current value, cache misses) from a request-like session"""
+    misses = portfolio_summary_cache.misses
+    db = SessionLocal()
+    try:
+        total = InvestmentService.calculate_portfolio_summary(db, user_id).total_current_value
+    finally:
+        db.close()
+    return total, portfolio_summary_cache.misses - misses
+
+
+def raw_total(db, user_id) -> Decimal:
+    """Current value straight from the holdings joined to their instruments"""
+    return db.query(func.sum(Investment.quantity * Investment.effective_price)).outerjoin(
+        Investment.instrument
+    ).filter(Investment.user_id == user_id).scalar()
+
+
+def groups(db, user_id) -> list:
+    return sorted(
+        (row.asset_type, row.platform, row.investment_count, Decimal(row.invested_amount), Decimal(row.current_value))
+        for row in PortfolioAggregateService.get_groups(db, user_id)
+    )
+
+
+def holding(db, user_id, symbol, quantity, price, asset_type="Stock"):
+    return InvestmentService.create_investment(db, InvestmentCreate(
+        asset_type=asset_type,
+        asset_name=f"Tick test {symbol}",
+        symbol=symbol,
+        quantity=Decimal(quantity),
+        purchase_price=Decimal("100.00"),
+        current_price=Decimal(price),
+        purchase_date=date(2024, 1, 1),
+        platform="Zerodha"
+    ), user_id)
+
+
+def test_instrument_ticks():
+    db = SessionLocal()
+    users = [
+        User(email=f"ticks-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Tick Test", hashed_password="x")
+        for _ in range(HOLDERS)
+    ]
+    db.add_all(users)
+    db.commit()
+    user_ids = [user.id for user in users]
+    user_id = user_ids[0]
+    symbol = f"TK{uuid.uuid4().hex[:6].upper()}"
+
+    try:
+        print("🧪 Testing Price Ticks and Portfolio Aggregates\n")
+
+        print("1. The first tick of a new symbol links existing holdings...")
+        for i, holder in enumerate(user_ids):
+            holding(db, holder, symbol, 10 + i, "90.00")
+            holding(db, holder, symbol, 5, "95.00")
+        fixed_deposit = holding(db, user_id, None, 1, "1000.00", asset_type="FD")
+        result = InstrumentService.update_prices(db, [{"symbol": symbol, "price": 120, "asset_type": "Stock"}])
+        assert result["created_count"] == 1 and result["updated_count"] == 1, result
+        total, _ = summary(user_id)
+        assert total == raw_total(db, user_id) == Decimal(15 * 120 + 1000), total
+        print(f"✅ Holdings linked, portfolio valued at {total}")
+
+        print("\n2. A later tick writes no aggregate or users rows...")
+        summary(user_id)
+        versions = dict(db.query(User.id, User.portfolio_version).filter(User.id.in_(user_ids)).all())
+        dashboard_version = DashboardService.cache_version(db, db.get(User, user_id), date.today())
+        log = StatementLog()
+        event.listen(engine, "before_cursor_execute", log)
+        try:
+            InstrumentService.update_prices(db, [{"symbol": symbol, "price": 150}])
+        finally:
+            event.remove(engine, "before_cursor_execute", log)
+        writes = [s for s in log.statements if not s.lstrip().upper().startswith("SELECT")]
+        assert not [s for s in writes if "portfolio_aggregates" in s or "UPDATE users" in s], writes
+        db.expire_all()
+        assert dict(db.query(User.id, User.portfolio_version).filter(User.id.in_(user_ids)).all()) == versions
+        print(f"✅ {len(writes)} write statements for {HOLDERS} holders, none on portfolio_aggregates or users")
+
+        print("\n3. ...yet the next summary values linked holdings at the new price...")
+        total, misses = summary(user_id)
+        assert misses == 1 and total == raw_total(db, user_id) == Decimal(15 * 150 + 1000), (total, misses)
+        assert DashboardService.cache_version(db, db.get(User, user_id), date.today()) != dashboard_version
+        total, misses = summary(user_id)
+        assert misses == 0
+        print(f"✅ Portfolio valued at {total}; dashboard cache version moved too")
+
+        print("\n4. Manual price updates and deletes keep the aggregates exact...")
+        InvestmentService.bulk_update_prices(db, user_id, [{"id": str(fixed_deposit.id), "current_price": 1100}])
+        linked = db.query(Investment).filter(Investment.user_id == user_id, Investment.symbol == symbol).first()
+        assert InvestmentService.delete_investment(db, linked.id, user_id)
+        total, _ = summary(user_id)
+        assert total == raw_total(db, user_id), total
+        maintained = groups(db, user_id)
+        PortfolioAggregateService.rebuild(db, user_ids)
+        assert groups(db, user_id) == maintained, (maintained, groups(db, user_id))
+        print(f"✅ Maintained groups equal a rebuild: {maintained}")
+
+        print("\n✅ All price tick tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.rollback()
+        db.query(Investment).filter(Investment.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(PortfolioAggregate).filter(PortfolioAggregate.user_id.in_(user_ids)).delete(synchronize_session=False)
+        instrument_ids = [row.id for row in db.query(Instrument.id).filter(Instrument.symbol == symbol)]
+        db.query(InstrumentPrice).filter(InstrumentPrice.instrument_id.in_(instrument_ids)).delete(synchronize_session=False)
+        db.query(Instrument).filter(Instrument.id.in_(instrument_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    test_instrument_ticks()
@@ -0,0 +1,123 @@
+# Behaviour of the annualized returns (XIRR, CAGR) on cash flows with known rates
+# The solver cases need no database; the service cases use the database from .env
+# (DATABASE_URL) and create and remove their own user.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/test_returns_service.py"
+
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from app.database import SessionLocal
+from app.models.investment import Investment
+from app.models.user import User
+from app.schemas.investment import InvestmentCreate
+from app.services.investment_service import InvestmentService
+from app.services.returns_service import DAYS_PER_YEAR, ReturnsService
+
+
+def solve(invested, years, values, groups=None):
+    invested = np.asarray(invested, dtype=np.float64)
+    groups = np.zeros(len(invested), dtype=np.int64) if groups is None else np.asarray(groups)
+    return ReturnsService.xirr(invested, np.asarray(years, dtype=np.float64), groups, np.asarray(values, dtype=np.float64))
+
+
+def close(actual, expected, tolerance=1e-6):
+    return actual is not None and abs(actual - expected) < tolerance
+
+
+def test_xirr_solver():
+    print("1. XIRR of known cash flows...")
+
+    rate = solve([1000], [1.0], [1100])[0]
+    assert close(rate, 0.10), rate
+    print(f"✅ 1000 for a year, worth 1100: {rate:.4%}")
+
+    rate = solve([1000, 1000], [2.0, 1.0], [2310])[0]
+    assert close(rate, 0.10), rate
+    print(f"✅ 1000 two years ago and 1000 a year ago, worth 2310: {rate:.4%}")
+
+    # Spreadsheet XIRR reference: -10000 on 2008-01-01, then 2750 (2008-03-01),
+    # 4250 (2008-10-30), 3250 (2009-02-15) and 2750 (2009-04-01) -> 0.373362535.
+    # Each flow is carried to the last date; inflows are negative amounts invested.
+    end = date(2009, 4, 1)
+    flows = [(date(2008, 1, 1), 10000), (date(2008, 3, 1), -2750), (date(2008, 10, 30), -4250), (date(2009, 2, 15), -3250)]
+    rate = solve(
+        [amount for _, amount in flows],
+        [(end - on).days / DAYS_PER_YEAR for on, _ in flows],
+        [2750]
+    )[0]
+    assert close(rate, 0.373362535), rate
+    print(f"✅ Spreadsheet reference flows: {rate:.9f} (expected 0.373362535)")
+
+    rates = solve([1000, 500, 2000], [1.0, 0.5, 0.0], [0, 0, 2000], groups=[0, 1, 2])
+    assert rates[0] == -1.0 and rates[1] == -1.0, rates
+    assert np.isnan(rates[2]), rates
+    print("✅ Worth nothing: -100%; bought today: undefined")
+
+    cagr = ReturnsService.cagr(np.array([1000.0, 1000.0, 1000.0]), np.array([1210.0, 0.0, 1500.0]), np.array([730.0, 365.0, 0.0]))
+    assert close(cagr[0], 0.10) and cagr[1] == -1.0 and np.isnan(cagr[2]), cagr
+    print(f"✅ CAGR: 1000 -> 1210 over two years {cagr[0]:.4%}, total loss {cagr[1]:.0%}, bought today undefined")
+
+
+def test_returns_service():
+    db = SessionLocal()
+    user = User(email=f"returns-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Returns Test", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    try:
+        print("\n2. Returns of a user's holdings...")
+        today = date.today()
+        for asset_type, name, purchase_price, current_price, days_ago in (
+            ("Stock", "Grower", "100", "110", 365),
+            ("Stock", "Older grower", "100", "121", 730),
+            ("Crypto", "Total loss", "100", "0", 365),
+        ):
+            InvestmentService.create_investment(db, InvestmentCreate(
+                asset_type=asset_type,
+                asset_name=name,
+                quantity=Decimal("10"),
+                purchase_price=Decimal(purchase_price),
+                current_price=Decimal(current_price),
+                purchase_date=today - timedelta(days=days_ago)
+            ), user_id)
+
+        returns = ReturnsService.get_returns(db, user_id)
+        by_type = {group["asset_type"]: group for group in returns["by_asset_type"]}
+        holdings = {holding["asset_name"]: holding for holding in returns["holdings"]}
+
+        assert close(by_type["Stock"]["xirr_percentage"], 10.0, 1e-4), by_type["Stock"]
+        assert by_type["Crypto"]["xirr_percentage"] == -100.0, by_type["Crypto"]
+        assert close(holdings["Grower"]["cagr_percentage"], 10.0, 1e-4), holdings["Grower"]
+        assert close(holdings["Older grower"]["cagr_percentage"], 10.0, 1e-4), holdings["Older grower"]
+        assert holdings["Total loss"]["cagr_percentage"] == -100.0, holdings["Total loss"]
+        assert [holding["asset_name"] for holding in returns["holdings"]][-1] == "Total loss"
+        print(f"✅ Stock XIRR {by_type['Stock']['xirr_percentage']:.4f}%, Crypto XIRR {by_type['Crypto']['xirr_percentage']:.0f}%")
+
+        # Every lot together: 1000 two years ago and 2 x 1000 a year ago, worth 1210 + 1100 + 0
+        expected = solve([1000, 1000, 1000], [1.0, 2.0, 1.0], [2310])[0] * 100
+        assert close(returns["portfolio"]["xirr_percentage"], expected, 1e-4), returns["portfolio"]
+        print(f"✅ Portfolio XIRR {returns['portfolio']['xirr_percentage']:.4f}%")
+
+    finally:
+        db.rollback()
+        db.query(Investment).filter(Investment.user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Returns Service\n")
+    try:
+        test_xirr_solver()
+        test_returns_service()
+        print("\n✅ All returns tests passed!")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,185 @@
+# Behaviour of the risk metrics (volatility, max drawdown, Sharpe) on known price series
+# Uses the database from .env (DATABASE_URL); creates and removes its own user.
+#
+# Run from backend/: PYTHONPATH=. python "testcases and documentations/test_risk_metrics.py"
+
+import math
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import event, insert
+
+from app.database import SessionLocal, engine
+from app.models.instrument import Instrument, InstrumentPrice
+from app.models.investment import Investment
+from app.models.user import User
+from app.schemas.investment import InvestmentCreate
+from app.services.instrument_service import InstrumentService
+from app.services.investment_service import InvestmentService
+from app.services.price_history_service import PriceHistoryService
+from app.services.risk_service import DAYS_PER_YEAR, MIN_OBSERVATIONS, RiskService
+
+
+def holding(db, user_id, name, asset_type, purchase_price, current_price, days_ago):
+    return InvestmentService.create_investment(db, InvestmentCreate(
+        asset_type=asset_type,
+        asset_name=name,
+        quantity=Decimal("10"),
+        purchase_price=Decimal(purchase_price),
+        current_price=Decimal(current_price),
+        purchase_date=date.today() - timedelta(days=days_ago)
+    ), user_id)
+
+
+def record(db, user_id, investment, prices):
+    """prices: {days ago: price}"""
+    for days_ago, price in prices.items():
+        PriceHistoryService.record_prices(
+            db, user_id, [(investment.id, Decimal(str(round(price, 2))))], on=date.today() - timedelta(days=days_ago)
+        )
+    db.commit()
+
+
+class PriceQueryLog:
+    """Statements and parameters of every query reading price_history or instrument_prices"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, conn, cursor, statement, parameters, *args):
+        if "price_history" in statement or "instrument_prices" in statement:
+            self.queries.append((statement, parameters))
+
+
+def report_for(db, user_id, days=365):
+    return RiskService._build_risk_metrics(db, user_id, date.today(), days, 30)
+
+
+def test_risk_metrics():
+    db = SessionLocal()
+    user = User(email=f"risk-{uuid.uuid4().hex[:8]}@wealthtrack.local", full_name="Risk Test", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    symbol = f"RK{uuid.uuid4().hex[:6].upper()}"
+
+    try:
+        print("🧪 Testing Risk Metrics\n")
+
+        print("1. Holdings without recorded prices have no metrics...")
+        fd = holding(db, user_id, "Bank FD", "FD", "100000", "106000", 300)
+        stock = holding(db, user_id, "Stock", "Stock", "50", "100", 250)
+        report = report_for(db, user_id)
+        assert report["portfolio"]["observations"] == 0, report["portfolio"]
+        assert report["portfolio"]["volatility_percentage"] is None
+        assert report["portfolio"]["sharpe_ratio"] is None
+        assert all(h["volatility_percentage"] is None for h in report["holdings"]), report["holdings"]
+        print("✅ No purchase-to-first-price jump, no metrics from a single price")
+
+        print("\n2. Daily prices alternating +1% / -1%...")
+        prices = {200: 100.0}
+        for days_ago in range(199, -1, -1):
+            prices[days_ago] = prices[days_ago + 1] * (1.01 if days_ago % 2 else 0.99)
+        record(db, user_id, stock, prices)
+        record(db, user_id, fd, {days_ago: 106000 for days_ago in range(200, -1, -1)})
+
+        series = np.array([float(round(prices[days_ago], 2)) for days_ago in range(200, -1, -1)])
+        expected = np.std(series[1:] / series[:-1] - 1, ddof=1) * math.sqrt(DAYS_PER_YEAR) * 100
+        expected_drawdown = (series / np.maximum.accumulate(series) - 1).min() * 100
+        report = report_for(db, user_id)
+        stock_report, fd_report = (
+            next(h for h in report["holdings"] if h["asset_name"] == name) for name in ("Stock", "Bank FD")
+        )
+        assert stock_report["observations"] == 200, stock_report
+        assert abs(stock_report["volatility_percentage"] - expected) < 0.01, (stock_report, expected)
+        assert abs(stock_report["max_drawdown_percentage"] - expected_drawdown) < 1e-6, stock_report
+        print(f"✅ Stock volatility {stock_report['volatility_percentage']:.2f}% (expected {expected:.2f}%)")
+        assert fd_report["volatility_percentage"] == 0.0 and fd_report["sharpe_ratio"] is None, fd_report
+        print("✅ FD with a constant price has 0% volatility")
+        assert report["portfolio"]["observations"] == 200, report["portfolio"]
+        assert len(report["rolling_volatility"]) == 200 - 30 + 1
+        print(f"✅ Portfolio: {report['portfolio']}")
+
+        print("\n3. Weekly prices count as weekly returns, not as daily ones...")
+        weekly = holding(db, user_id, "Weekly", "MutualFund", "100", "100", 400)
+        step = 0.01 * math.sqrt(7)
+        prices = {364: 100.0}
+        for week in range(1, 53):
+            prices[364 - 7 * week] = prices[364 - 7 * (week - 1)] * (1 + step if week % 2 else 1 - step)
+        record(db, user_id, weekly, prices)
+        weekly_report = next(h for h in report_for(db, user_id)["holdings"] if h["asset_name"] == "Weekly")
+        assert weekly_report["observations"] == 52, weekly_report
+        assert abs(weekly_report["volatility_percentage"] - expected) < 1.0, (weekly_report, expected)
+        print(f"✅ Weekly series volatility {weekly_report['volatility_percentage']:.2f}% (daily equivalent {expected:.2f}%)")
+
+        print(f"\n4. Fewer than {MIN_OBSERVATIONS} returns give no metrics...")
+        sparse = holding(db, user_id, "Sparse", "Gold", "100", "100", 100)
+        record(db, user_id, sparse, {days_ago: 100 + days_ago for days_ago in range(MIN_OBSERVATIONS - 1, -1, -1)})
+        sparse_report = next(h for h in report_for(db, user_id)["holdings"] if h["asset_name"] == "Sparse")
+        assert sparse_report["observations"] == MIN_OBSERVATIONS - 1, sparse_report
+        assert sparse_report["volatility_percentage"] is None and sparse_report["max_drawdown_percentage"] is None
+        print(f"✅ {sparse_report}")
+
+        print("\n5. Rows older than the carried-in price are never read...")
+        InvestmentService.create_investment(db, InvestmentCreate(
+            asset_type="Stock",
+            asset_name="Linked",
+            symbol=symbol,
+            quantity=Decimal("10"),
+            purchase_price=Decimal("100"),
+            current_price=Decimal("100"),
+            purchase_date=date.today() - timedelta(days=500)
+        ), user_id)
+        InstrumentService.update_prices(db, [{"symbol": symbol, "price": 100, "asset_type": "Stock"}])
+        instrument_id = db.query(Instrument.id).filter(Instrument.symbol == symbol).scalar()
+        db.execute(insert(InstrumentPrice), [
+            {"instrument_id": instrument_id, "price_date": date.today() - timedelta(days=days_ago), "price": 100 + days_ago % 7}
+            for days_ago in range(60, 0, -1)
+        ] + [{"instrument_id": instrument_id, "price_date": date.today() - timedelta(days=380), "price": 90}])
+        record(db, user_id, stock, {370: 95.0})  # the seeds: last prices before the 365-day window
+        report = report_for(db, user_id)
+
+        old_days = [date.today() - timedelta(days=days_ago) for days_ago in range(700, 381, -7)]
+        db.execute(insert(InstrumentPrice), [
+            {"instrument_id": instrument_id, "price_date": on, "price": 1} for on in old_days
+        ])
+        record(db, user_id, stock, {(date.today() - on).days: 1.0 for on in old_days})
+        log = PriceQueryLog()
+        event.listen(engine, "before_cursor_execute", log)
+        try:
+            assert report_for(db, user_id) == report
+        finally:
+            event.remove(engine, "before_cursor_execute", log)
+
+        # Replay each price query: no row it returns is from before the seeds
+        old_dates = {on.isoformat() for on in old_days}
+        returned = 0
+        with engine.connect() as connection:
+            for statement, parameters in log.queries:
+                for row in connection.exec_driver_sql(statement, parameters):
+                    returned += 1
+                    assert not old_dates.intersection(str(value)[:10] for value in row), row
+        assert log.queries and returned, log.queries
+        print(f"✅ {len(log.queries)} price queries returned {returned} rows, none older than the seeds; report unchanged")
+
+        print("\n✅ All risk metric tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.rollback()
+        db.query(Investment).filter(Investment.user_id == user_id).delete(synchronize_session=False)
+        instrument_ids = [row.id for row in db.query(Instrument.id).filter(Instrument.symbol == symbol)]
+        db.query(InstrumentPrice).filter(InstrumentPrice.instrument_id.in_(instrument_ids)).delete(synchronize_session=False)
+        db.query(Instrument).filter(Instrument.id.in_(instrument_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    test_risk_metrics()